@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Check that the lxml/XPath extraction engine (and the Harrods text-scan fast
+path) produce exactly the same products as the BeautifulSoup engine, and time
+and measure each of them.
+
+The parity check runs Harrods end to end with its fetch and notifications
+patched out. Timings call the page parser and the extraction step directly
+on the same HTML, with no mocks in the timed loop.
+Usage:
+    python benchmarks/extraction_parity.py                               # Synthetic pages
+    python benchmarks/extraction_parity.py --html page.html --retailer end  # A saved page
+"""
+
+import sys
+import os
+import argparse
+import contextlib
+import io
+import time
+import tracemalloc
+import logging
+from dataclasses import asdict
+from unittest import mock
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from benchmarks.parsing_benchmark import _harrods_page, _end_page
+from scrapers.end_clothing import EndClothingScraper
+from scrapers.harrods import HarrodsScraper
+from scrapers.extraction import lxml_available
+
+
+def _end_products(scraper, html):
+    products, _ = scraper._parse_products_from_html(html, 1)
+    return products
+
+
+def _harrods_products(scraper, html):
+    # Serve the page once, then an empty response to end pagination
+    with mock.patch.object(scraper, 'get_page', side_effect=[html, None]), \
+         mock.patch.object(scraper, '_send_notifications', return_value=True):
+        return scraper.scrape_products()
+
+
+# Stages timed per retailer: label -> call on (scraper, html)
+END_STAGES = {
+    'parse': lambda scraper, html: scraper._parse_products_from_html(html, 1),
+}
+HARRODS_STAGES = {
+    'parse': lambda scraper, html: scraper._parse_page(html, 1),
+    'extract': lambda scraper, html: scraper._extract_page(html),
+}
+
+RETAILERS = {
+    'end': (_end_page, EndClothingScraper, _end_products, END_STAGES, ['lxml']),
+    'harrods': (_harrods_page, HarrodsScraper, _harrods_products, HARRODS_STAGES, ['lxml', 'fast']),
+}
+
+
+def _comparable(products):
+    """Product fields minus the scrape timestamp."""
+    return [{k: v for k, v in asdict(p).items() if k != 'scraped_at'} for p in products]
+
+
+def run_engine(scraper_class, extract, stages, engine: str, html: str, repeats: int):
+    """
+    Return (products, {stage: avg seconds}, peak bytes) for one engine.
+    
+    Peak memory is traced Python allocations of one page parse only; lxml's
+    C-level tree is not counted, so it understates the lxml engine.
+    """
+    scraper = scraper_class()
+    # "fast" is the Harrods text scan; it only falls back to DOM parsing
+    scraper.use_fast_path = engine == 'fast'
+    scraper.extraction_engine = 'bs4' if engine == 'fast' else engine
+    
+    # Progress prints go to a throwaway buffer rather than a mock
+    with contextlib.redirect_stdout(io.StringIO()):
+        products = extract(scraper, html)
+        
+        tracemalloc.start()
+        stages['parse'](scraper, html)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        
+        timings = {}
+        for label, stage in stages.items():
+            start_time = time.perf_counter()
+            for _ in range(repeats):
+                stage(scraper, html)
+            timings[label] = (time.perf_counter() - start_time) / repeats
+    return products, timings, peak
+
+
+def _describe(timings) -> str:
+    return "  ".join(f"{label} {seconds * 1000:7.2f} ms" for label, seconds in timings.items())
+
+
+def _speedup(before: float, after: float) -> str:
+    if after <= before:
+        return f"{before / max(after, 1e-12):.1f}x faster"
+    return f"{after / max(before, 1e-12):.1f}x slower"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare extraction engines against bs4')
+    parser.add_argument('--retailer', choices=sorted(RETAILERS), action='append',
+                       help='Retailer(s) to check (default: all)')
+    parser.add_argument('--html', help='Saved page HTML to use instead of a synthetic page')
+    parser.add_argument('--cards', type=int, default=60, help='Product cards per synthetic page (default: 60)')
+    parser.add_argument('--repeats', type=int, default=20, help='Timed iterations (default: 20)')
+    args = parser.parse_args()
+    
+    if not lxml_available():
+        print("❌ lxml is not installed - nothing to compare")
+        return 1
+    
+    # Scraper logging would drown out the report
+    logging.disable(logging.WARNING)
+    
+    retailers = args.retailer or sorted(RETAILERS)
+    if args.html and len(retailers) != 1:
+        parser.error('--html needs exactly one --retailer')
+    
+    print("🔬 Extraction engine parity (baseline: bs4)")
+    print("=" * 60)
+    
+    mismatches = 0
+    for retailer in retailers:
+        build_page, scraper_class, extract, stages, engines = RETAILERS[retailer]
+        if args.html:
+            with open(args.html, 'r', encoding='utf-8') as f:
+                html = f.read()
+        else:
+            html = build_page(args.cards)
+        
+        print(f"\n🏪 {retailer} ({len(html) / 1024:.0f} KB page)")
+        baseline, base_times, base_peak = run_engine(scraper_class, extract, stages, 'bs4', html, args.repeats)
+        print(f"   bs4:  {_describe(base_times)}  peak {base_peak / 1024:6.0f} KB  {len(baseline)} products")
+        
+        engine_times = {}
+        for engine in engines:
+            products, timings, peak = run_engine(scraper_class, extract, stages, engine, html, args.repeats)
+            engine_times[engine] = timings
+            print(f"   {engine + ':':5} {_describe(timings)}  peak {peak / 1024:6.0f} KB  {len(products)} products  "
+                  f"⚡ parse {_speedup(base_times['parse'], timings['parse'])} than bs4")
+            
+            if _comparable(baseline) == _comparable(products):
+                print(f"   ✅ {engine}: identical products")
+            else:
+                mismatches += 1
+                print(f"   ❌ {engine}: products differ")
+                for before, after in zip(_comparable(baseline), _comparable(products)):
+                    if before != after:
+                        print(f"      bs4:  {before}")
+                        print(f"      {engine}: {after}")
+                        break
+        
+        if 'fast' in engine_times and 'lxml' in engine_times:
+            # The fast path's own claim: regex scan against lxml on identical input
+            for label in stages:
+                print(f"   ⚡ fast vs lxml {label}: "
+                      f"{_speedup(engine_times['lxml'][label], engine_times['fast'][label])}")
+    
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Measure cold-start import cost per retailer with ``python -X importtime``.
+Each measurement runs in a fresh interpreter, so nothing is cached between them.
+Usage:
+    python benchmarks/import_time.py                  # Every retailer, plus all of them together
+    python benchmarks/import_time.py --retailer harvey --top 15
+"""
+
+import sys
+import os
+import argparse
+import subprocess
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from scrapers.registry import RETAILERS
+
+
+def import_profile(statement: str):
+    """
+    Run ``statement`` under ``-X importtime`` in a fresh interpreter.
+
+    Returns:
+        List of (cumulative microseconds, module) for top-level imports
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=project_root, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line[len('import time:'):].split('|')
+        # Nested imports are indented under the module that triggered them
+        if not module[1:].startswith(' '):
+            imports.append((int(cumulative), module.strip()))
+    return imports
+
+
+def report(label: str, statement: str, top: int) -> None:
+    """Print total import time and the heaviest top-level imports."""
+    try:
+        imports = import_profile(statement)
+    except RuntimeError as e:
+        print(f"\n❌ {label}: {e}")
+        return
+
+    total_ms = sum(us for us, _ in imports) / 1000
+    print(f"\n🏪 {label}: {total_ms:.0f} ms")
+    for us, module in sorted(imports, reverse=True)[:top]:
+        print(f"   {us / 1000:7.1f} ms  {module}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark scraper import time')
+    parser.add_argument('--retailer', choices=[retailer.key for retailer in RETAILERS], action='append',
+                       help='Retailer(s) to measure (default: all)')
+    parser.add_argument('--top', type=int, default=8, help='Heaviest imports to list (default: 8)')
+    args = parser.parse_args()
+
+    print("📊 Import time benchmark (python -X importtime, cold interpreter)")
+    print("=" * 60)
+
+    # Baseline: what run_scrapers.py loads before any scraper is selected
+    report("run_scrapers.py startup", "import run_scrapers", args.top)
+
+    for retailer in RETAILERS:
+        if args.retailer and retailer.key not in args.retailer:
+            continue
+        statement = f"import run_scrapers; import {retailer.module}"
+        report(f"--{retailer.key}", statement, args.top)
+
+    if not args.retailer:
+        # Every scraper module, as run_scrapers.py used to import them all up front
+        statement = "import run_scrapers; from scrapers.registry import RETAILERS; [r.load() for r in RETAILERS]"
+        report("all retailers", statement, args.top)
+
+
+if __name__ == "__main__":
+    main()
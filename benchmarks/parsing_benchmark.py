@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark full-page html.parser parsing against lxml + SoupStrainer partial parsing.
+Usage:
+    python benchmarks/parsing_benchmark.py                               # Synthetic pages
+    python benchmarks/parsing_benchmark.py --html page.html --retailer end  # A saved page
+"""
+
+import sys
+import os
+import argparse
+import time
+import tracemalloc
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from bs4 import BeautifulSoup
+
+from scrapers.parsing import (
+    parse_html, HTML_PARSER, HARRODS_STRAINER, END_CLOTHING_STRAINER, SELFRIDGES_STRAINER
+)
+
+
+# Padding that stands in for navigation, footers and inline scripts on real pages
+FILLER = (
+    '<nav><ul>' + ''.join(f'<li><a href="/c/{i}">Category {i}</a></li>' for i in range(200)) + '</ul></nav>'
+    '<script>' + 'window.__STATE__ = ' + '{"k": "v"}, ' * 2000 + '{};</script>'
+    '<footer>' + ''.join(f'<div class="f"><p>Footer text {i}</p></div>' for i in range(300)) + '</footer>'
+)
+
+
+def _harrods_page(cards: int) -> str:
+    items = ','.join(
+        f'{{"@type":"ListItem","item":{{"sku":"{i}","name":"Item {i}","url":"https://www.harrods.com/p/{i}",'
+        f'"offers":{{"priceSpecification":{{"price":"{30 + i}"}}}}}}}}' for i in range(cards)
+    )
+    articles = ''.join(
+        f'<article data-test-id="product-item" data-product-card-id="{i}"><h3>Brand</h3>'
+        f'<p>Item {i}</p><span>£{300 + i}</span><span>£{30 + i}</span></article>' for i in range(cards)
+    )
+    json_ld = f'<script type="application/ld+json">{{"@type":"ItemList","itemListElement":[{items}]}}</script>'
+    return f'<html><head>{json_ld}</head><body>{FILLER}{articles}{FILLER}</body></html>'
+
+
+def _end_page(cards: int) -> str:
+    anchors = ''.join(
+        f'<a data-test-id="ProductCard__ProductCardSC" href="/gb/p/{i}"><img src="/i/{i}.jpg"/>'
+        f'<span>Product name number {i}</span><span class="styles__DiscountSC-sc-d3b68a1e-7">80% off</span>'
+        f'<span>£{200 + i}</span><span>£{40 + i}</span></a>' for i in range(cards)
+    )
+    return f'<html><body>{FILLER}<div>{anchors}</div>{FILLER}</body></html>'
+
+
+def _selfridges_page(cards: int) -> str:
+    items = ''.join(
+        f'<li data-analytics-link-target="product_card_link"><h2>Brand</h2><a href="/GB/en/p/{i}">Item {i}</a>'
+        f'<ul><li data-testid="product-price">Discount price: £{20 + i}</li>'
+        f'<li data-testid="product-price">Previous price: £{200 + i}</li></ul><img src="//img/{i}.jpg"/></li>'
+        for i in range(cards)
+    )
+    return f'<html><body>{FILLER}<ul>{items}</ul>{FILLER}</body></html>'
+
+
+RETAILERS = {
+    'harrods': (_harrods_page, HARRODS_STRAINER, lambda soup: soup.find_all('article', {'data-test-id': 'product-item'})),
+    'end': (_end_page, END_CLOTHING_STRAINER, lambda soup: soup.find_all('a', {'data-test-id': 'ProductCard__ProductCardSC'})),
+    'selfridges': (_selfridges_page, SELFRIDGES_STRAINER, lambda soup: soup.find_all('li', {'data-analytics-link-target': 'product_card_link'})),
+}
+
+
+def measure(parse, html: str, find_cards, repeats: int):
+    """Return (avg seconds, peak bytes, cards found) for a parse function."""
+    # Peak memory from a single traced run
+    tracemalloc.start()
+    soup = parse(html)
+    cards = len(find_cards(soup))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del soup
+
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        find_cards(parse(html))
+    elapsed = (time.perf_counter() - start_time) / repeats
+    return elapsed, peak, cards
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HTML parsing strategies')
+    parser.add_argument('--retailer', choices=sorted(RETAILERS), action='append',
+                       help='Retailer(s) to benchmark (default: all)')
+    parser.add_argument('--html', help='Saved page HTML to use instead of a synthetic page')
+    parser.add_argument('--cards', type=int, default=60, help='Product cards per synthetic page (default: 60)')
+    parser.add_argument('--repeats', type=int, default=20, help='Timed iterations (default: 20)')
+    args = parser.parse_args()
+
+    retailers = args.retailer or sorted(RETAILERS)
+    if args.html and len(retailers) != 1:
+        parser.error('--html needs exactly one --retailer')
+
+    print(f"📊 Parsing benchmark (optimized backend: {HTML_PARSER})")
+    print("=" * 60)
+
+    for retailer in retailers:
+        build_page, strainer, find_cards = RETAILERS[retailer]
+        if args.html:
+            with open(args.html, 'r', encoding='utf-8') as f:
+                html = f.read()
+        else:
+            html = build_page(args.cards)
+
+        before = measure(lambda h: BeautifulSoup(h, 'html.parser'), html, find_cards, args.repeats)
+        after = measure(lambda h: parse_html(h, strainer), html, find_cards, args.repeats)
+
+        print(f"\n🏪 {retailer} ({len(html) / 1024:.0f} KB page)")
+        print(f"   Before (html.parser, full page): {before[0] * 1000:7.1f} ms  peak {before[1] / 1024:8.0f} KB  {before[2]} cards")
+        print(f"   After  ({HTML_PARSER} + strainer):     {after[0] * 1000:7.1f} ms  peak {after[1] / 1024:8.0f} KB  {after[2]} cards")
+        if after[0] > 0:
+            print(f"   ⚡ {before[0] / after[0]:.1f}x faster, {before[1] / max(after[1], 1):.1f}x less peak memory")
+        if before[2] != after[2]:
+            print(f"   ⚠️  Card counts differ ({before[2]} vs {after[2]})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Compare the per-product parse-and-filter path the scrapers used before
+ProductBatch with the columnar batch path, one listing page at a time.
+Pages are synthetic Harvey Nichols API responses with unique names and URLs;
+peak memory is traced Python allocations while one page is filtered.
+Usage:
+    python benchmarks/product_batch_benchmark.py --pages 500 --page-size 60
+"""
+
+import sys
+import os
+import argparse
+import random
+import time
+import tracemalloc
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from scrapers.base import Product, HIGH_DISCOUNT_THRESHOLD
+from scrapers.product_batch import ProductBatch
+from scrapers import pricing
+
+
+def make_page(page: int, page_size: int) -> list:
+    """One API page of products; every name and URL is distinct, like a real listing."""
+    rng = random.Random(page)
+    products = []
+    for i in range(page_size):
+        original = float(rng.randrange(80, 3000))
+        sale = round(original * rng.uniform(0.1, 0.95), 2)
+        code = f"{page:04d}{i:03d}{rng.getrandbits(32):08x}"
+        products.append({
+            'brand': f"Brand {rng.randrange(400)}",
+            'name': f"Item {code}",
+            'priceGBP': original,
+            'salePriceGBP': sale,
+            'productUrl': f"/product/item-{code}",
+            'itemImage': f"/images/{code}.jpg",
+        })
+    return products
+
+
+def _fields(product_data: dict):
+    """The field extraction both paths share."""
+    brand = product_data.get('brand', '').strip()
+    name = product_data.get('name', '').strip()
+    full_name = f"{brand} {name}".strip() if brand else name
+    return (full_name, float(product_data['priceGBP']), float(product_data['salePriceGBP']),
+            'https://www.harveynichols.com' + product_data['productUrl'],
+            'https://www.harveynichols.com' + product_data['itemImage'])
+
+
+def filter_per_product(page: list) -> list:
+    """Before: compute each discount and build a Product only for rows that pass."""
+    products = []
+    for product_data in page:
+        name, original, sale, url, image_url = _fields(product_data)
+        if not (original > 0 and sale > 0 and original > sale):
+            continue
+        discount = round((original - sale) / original * 100, 2)
+        if discount < HIGH_DISCOUNT_THRESHOLD:
+            continue
+        products.append(Product(name=name, original_price=original, sale_price=sale,
+                                discount_percentage=discount, url=url, image_url=image_url,
+                                retailer="Harvey Nichols"))
+    return products
+
+
+def filter_batch(page: list) -> list:
+    """After: append the page to a ProductBatch and filter it over its columns."""
+    batch = ProductBatch("Harvey Nichols")
+    for product_data in page:
+        name, original, sale, url, image_url = _fields(product_data)
+        if not (original > 0 and sale > 0 and original > sale):
+            continue
+        batch.append(name=name, original_price=original, sale_price=sale, url=url, image_url=image_url)
+    return batch.high_discount_products()
+
+
+def measure(strategy, pages: list):
+    """Return (seconds per page, peak bytes for one page, high discount rows)."""
+    found = sum(len(strategy(page)) for page in pages)
+
+    start_time = time.perf_counter()
+    for page in pages:
+        strategy(page)
+    per_page = (time.perf_counter() - start_time) / len(pages)
+
+    tracemalloc.start()
+    strategy(pages[0])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return per_page, peak, found
+
+
+def ratio(before: float, after: float, less: str, more: str) -> str:
+    """Describe ``after`` relative to ``before`` without hiding a regression."""
+    if after <= before:
+        return f"{before / max(after, 1e-12):.2f}x {less}"
+    return f"{after / max(before, 1e-12):.2f}x {more}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark per-product filtering against ProductBatch columns')
+    parser.add_argument('--pages', type=int, default=500, help='Pages to filter (default: 500)')
+    parser.add_argument('--page-size', type=int, default=60, help='Products per page (default: 60, as the scrapers fetch)')
+    args = parser.parse_args()
+
+    pages = [make_page(page, args.page_size) for page in range(args.pages)]
+
+    print(f"📊 Page filtering benchmark ({args.pages} pages x {args.page_size} products)")
+    print("=" * 60)
+
+    before = measure(filter_per_product, pages)
+    after = measure(filter_batch, pages)
+
+    print(f"   Before (per product):  {before[0] * 1e6:8.1f} µs/page  peak {before[1] / 1024:7.1f} KB  {before[2]} high discount")
+    print(f"   After  (ProductBatch): {after[0] * 1e6:8.1f} µs/page  peak {after[1] / 1024:7.1f} KB  {after[2]} high discount")
+    print(f"   ⏱️  Batch is {ratio(before[0], after[0], 'faster', 'slower')} per page")
+    print(f"   💾 Batch uses {ratio(before[1], after[1], 'less', 'more')} peak memory per page")
+    if before[2] != after[2]:
+        print(f"   ⚠️  High discount counts differ ({before[2]} vs {after[2]})")
+
+    print(f"\n💷 Pricing stage (discounts + mask over one {args.page_size}-product page)")
+    batch = ProductBatch("Harvey Nichols")
+    for product_data in pages[0]:
+        name, original, sale, url, image_url = _fields(product_data)
+        batch.append(name=name, original_price=original, sale_price=sale, url=url)
+
+    def time_pricing(repeats: int = 2000) -> float:
+        start_time = time.perf_counter()
+        for _ in range(repeats):
+            discounts = pricing.compute_discounts(batch.original_prices, batch.sale_prices, batch.discounts)
+            pricing.high_discount_mask(batch.original_prices, batch.sale_prices, discounts)
+        return (time.perf_counter() - start_time) / repeats
+
+    # Force the plain Python path for the comparison
+    numpy_module = pricing._numpy()
+    pricing._np = None
+    scalar = time_pricing()
+    pricing._np = numpy_module
+    print(f"   Python loop: {scalar * 1e6:8.1f} µs")
+    if pricing.numpy_available():
+        vectorized = time_pricing()
+        print(f"   NumPy:       {vectorized * 1e6:8.1f} µs  ({ratio(scalar, vectorized, 'faster', 'slower')})")
+    else:
+        print("   NumPy:       not installed")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,10 +4,17 @@ Discord webhook notification system for high-discount alerts.
 
 import requests
 import logging
-from typing import List, Optional
+from typing import Callable, List, Optional
 from datetime import datetime
 from scrapers.base import Product
-from .notification_tracker import NotificationTracker
+from .notification_tracker import BaseNotificationTracker, NotificationTracker, product_fingerprint
+from .webhook_scheduler import WebhookScheduler
+
+
+# Discord webhook limits
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+MAX_EMBED_TITLE_CHARS = 256
 
 
 class DiscordNotifier:
@@ -18,14 +25,26 @@ class DiscordNotifier:
     products have high discounts (>70%).
     """
     
-    def __init__(self, webhook_url: str, enable_idempotency: bool = True):
+    def __init__(self, webhook_url: str, enable_idempotency: bool = True,
+                 tracker: Optional[BaseNotificationTracker] = None,
+                 max_embeds_per_message: int = MAX_EMBEDS_PER_MESSAGE,
+                 on_delivered: Optional[Callable[[List[Product]], None]] = None):
         self.webhook_url = webhook_url
+        # Called with products once Discord has accepted their alerts (or already had)
+        self.on_delivered = on_delivered
+        # 1 sends one message per product; capped at Discord's limit of 10
+        self.max_embeds_per_message = max(1, min(max_embeds_per_message, MAX_EMBEDS_PER_MESSAGE))
         self.logger = logging.getLogger("discord_notifier")
         self.enable_idempotency = enable_idempotency
         
+        # One HTTP session for every webhook POST in the run
+        self.session = requests.Session()
+        # Paces sends from Discord's rate-limit headers and retries 429s
+        self.scheduler = WebhookScheduler(self.session)
+        
         # Initialize notification tracker for idempotency
         if self.enable_idempotency:
-            self.tracker = NotificationTracker()
+            self.tracker = tracker if tracker is not None else NotificationTracker()
             self.logger.info("Idempotency enabled - duplicate notifications will be prevented")
         else:
             self.tracker = None
@@ -33,7 +52,14 @@ class DiscordNotifier:
         
     def send_high_discount_alerts(self, products: List[Product]) -> bool:
         """
-        Send Discord alerts for products with >70% discount.
+        Send Discord alerts for high discount products.
+        
+        Products are expected to have passed their scraper's discount
+        threshold (see ``scrapers.pricing.get_discount_threshold``), which
+        may be below the 70% default, so they are not filtered again here.
+        New products are grouped into messages of up to
+        ``max_embeds_per_message`` embeds (within Discord's size limits).
+        Each product is marked as sent only once its message is accepted.
         
         Args:
             products: List of products to check and potentially alert on
@@ -41,31 +67,61 @@ class DiscordNotifier:
         Returns:
             bool: True if all alerts sent successfully, False otherwise
         """
-        high_discount_products = [p for p in products if p.is_high_discount]
-        
-        if not high_discount_products:
-            self.logger.info("No high discount products found")
-            return True
-            
-        self.logger.info(f"Found {len(high_discount_products)} high discount products")
-        
-        success = True
-        for product in high_discount_products:
-            if not self._send_product_alert(product):
-                success = False
-                
-        return success
+        return not self.send_alerts(products)
     
-    def _send_product_alert(self, product: Product) -> bool:
+    def send_alerts(self, products: List[Product]) -> List[Product]:
         """
-        Send individual product alert to Discord.
+        Send alerts like ``send_high_discount_alerts`` but report what failed.
         
         Args:
-            product: Product to send alert for
+            products: High discount products to alert on
             
         Returns:
-            bool: True if sent successfully, False otherwise
+            List of products whose message could not be delivered
         """
+        if not products:
+            self.logger.info("No high discount products found")
+            return []
+            
+        self.logger.info(f"Found {len(products)} high discount products")
+        
+        # A product listed twice in one call gets a single embed
+        pending = []
+        delivered = []
+        seen = set()
+        for product in products:
+            fingerprint = product_fingerprint(
+                product.url, product.retailer, product.discount_percentage, product.name
+            )
+            if fingerprint in seen:
+                continue
+            seen.add(fingerprint)
+            if self._is_duplicate(product):
+                delivered.append(product)
+            else:
+                pending.append(product)
+        
+        failed = []
+        for batch in self._build_batches(pending):
+            if self._send_batch(batch):
+                delivered.extend(batch)
+            else:
+                failed.extend(batch)
+        
+        self._report_delivered(delivered)
+        return failed
+    
+    def _report_delivered(self, products: List[Product]) -> None:
+        """Pass delivered products to ``on_delivered``; a failing callback never fails the send."""
+        if not products or self.on_delivered is None:
+            return
+        try:
+            self.on_delivered(products)
+        except Exception as e:
+            self.logger.error(f"Delivery callback failed for {len(products)} products: {str(e)}")
+    
+    def _is_duplicate(self, product: Product) -> bool:
+        """Check whether an alert for this product was already sent."""
         # Check for duplicate notifications if idempotency is enabled
         if self.enable_idempotency and self.tracker:
             if self.tracker.has_been_sent(
@@ -75,37 +131,87 @@ class DiscordNotifier:
                 product.name
             ):
                 self.logger.info(f"Skipping duplicate notification for {product.name}")
-                return True  # Return True since we "successfully" handled it (by skipping)
+                return True
+        return False
+    
+    @staticmethod
+    def _embed_size(embed: dict) -> int:
+        """Count the characters Discord counts towards the per-message embed limit."""
+        size = len(embed.get("title", "")) + len(embed.get("description", ""))
+        size += len(embed.get("footer", {}).get("text", ""))
+        size += len(embed.get("author", {}).get("name", ""))
+        for field in embed.get("fields", []):
+            size += len(field.get("name", "")) + len(field.get("value", ""))
+        return size
+    
+    def _build_batches(self, products: List[Product]) -> List[List[Product]]:
+        """
+        Group products into batches that fit in one webhook message.
+        
+        Args:
+            products: Products to send
+            
+        Returns:
+            List of batches, each within the embed count and character limits
+        """
+        batches = []
+        current_batch = []
+        current_size = 0
         
+        for product in products:
+            size = self._embed_size(self._create_product_embed(product))
+            if current_batch and (len(current_batch) >= self.max_embeds_per_message
+                                  or current_size + size > MAX_EMBED_CHARS_PER_MESSAGE):
+                batches.append(current_batch)
+                current_batch = []
+                current_size = 0
+            current_batch.append(product)
+            current_size += size
+        
+        if current_batch:
+            batches.append(current_batch)
+        return batches
+    
+    def _send_batch(self, products: List[Product]) -> bool:
+        """
+        Send one webhook message with an embed per product.
+        
+        Args:
+            products: Products to include in the message
+            
+        Returns:
+            bool: True if sent successfully, False otherwise
+        """
         try:
-            embed = self._create_product_embed(product)
             payload = {
                 "username": "Fashion Discount Bot",
                 "avatar_url": "https://cdn.discordapp.com/attachments/123/456/fashion-bot-avatar.png",
-                "embeds": [embed]
+                "embeds": [self._create_product_embed(product) for product in products]
             }
             
-            response = requests.post(
+            response = self.scheduler.post(
                 self.webhook_url,
-                json=payload,
+                payload,
                 timeout=10
             )
             response.raise_for_status()
             
             # Mark as sent if idempotency is enabled
             if self.enable_idempotency and self.tracker:
-                self.tracker.mark_as_sent(
-                    product.url, 
-                    product.retailer, 
-                    product.discount_percentage, 
-                    product.name
-                )
+                for product in products:
+                    self.tracker.mark_as_sent(
+                        product.url, 
+                        product.retailer, 
+                        product.discount_percentage, 
+                        product.name
+                    )
             
-            self.logger.info(f"Successfully sent alert for {product.name}")
+            self.logger.info(f"Successfully sent alert for {len(products)} products: "
+                             f"{', '.join(p.name for p in products)}")
             return True
             
         except Exception as e:
-            self.logger.error(f"Failed to send Discord alert for {product.name}: {str(e)}")
+            self.logger.error(f"Failed to send Discord alert for {len(products)} products: {str(e)}")
             return False
     
     def _create_product_embed(self, product: Product) -> dict:
@@ -125,7 +231,7 @@ class DiscordNotifier:
         savings_str = f"£{savings:.2f}"
         
         embed = {
-            "title": f"🔥 {product.discount_percentage}% OFF - {product.name}",
+            "title": f"🔥 {product.discount_percentage}% OFF - {product.name}"[:MAX_EMBED_TITLE_CHARS],
             "url": product.url,
             "color": 0xFF0000,  # Red color for high discounts
             "fields": [
@@ -217,9 +323,9 @@ class DiscordNotifier:
                 "embeds": [embed]
             }
             
-            response = requests.post(
+            response = self.scheduler.post(
                 self.webhook_url,
-                json=payload,
+                payload,
                 timeout=10
             )
             response.raise_for_status()
@@ -244,9 +350,9 @@ class DiscordNotifier:
                 "content": "🧪 Webhook test - Fashion Discount Notifier is online!"
             }
             
-            response = requests.post(
+            response = self.scheduler.post(
                 self.webhook_url,
-                json=payload,
+                payload,
                 timeout=10
             )
             response.raise_for_status()
@@ -258,6 +364,12 @@ class DiscordNotifier:
             self.logger.error(f"Webhook test failed: {str(e)}")
             return False
     
+    def close(self) -> None:
+        """Flush the tracker to disk and close the HTTP session."""
+        if self.tracker:
+            self.tracker.close()
+        self.session.close()
+    
     def get_notification_stats(self) -> dict:
         """
         Get statistics about sent notifications.
@@ -266,6 +378,8 @@ class DiscordNotifier:
             dict: Statistics about notification tracking
         """
         if self.enable_idempotency and self.tracker:
-            return self.tracker.get_stats()
+            stats = self.tracker.get_stats()
         else:
-            return {"idempotency_enabled": False}
+            stats = {"idempotency_enabled": False}
+        stats['webhook'] = self.scheduler.get_stats()
+        return stats
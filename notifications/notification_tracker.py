@@ -3,78 +3,212 @@ Notification tracking system to prevent duplicate notifications.
 Implements idempotency for product discount alerts.
 """
 
+import atexit
 import json
 import hashlib
 import os
+import re
+import threading
+from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
 from typing import Set, Dict, Any
 from pathlib import Path
 import logging
 
 
-class NotificationTracker:
+FINGERPRINT_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+def product_fingerprint(product_url: str, retailer: str,
+                        discount_percentage: float, product_name: str) -> str:
+    """Hash the attributes that identify one alert (URL, retailer, discount, name)."""
+    fingerprint_data = f"{product_url}|{retailer}|{discount_percentage:.1f}|{product_name.strip()}"
+    return hashlib.md5(fingerprint_data.encode()).hexdigest()
+
+
+class BaseNotificationTracker(ABC):
+    """
+    Interface shared by the notification stores DiscordNotifier can dedupe with.
+    
+    Subclasses set ``self.logger`` and implement the lookup, marking and
+    housekeeping methods; fingerprinting is common to all of them.
+    """
+    
+    def create_product_fingerprint(self, product_url: str, retailer: str, 
+                                 discount_percentage: float, product_name: str) -> str:
+        """
+        Create a unique fingerprint for a product.
+        
+        Args:
+            product_url: Product URL
+            retailer: Retailer name
+            discount_percentage: Discount percentage
+            product_name: Product name
+            
+        Returns:
+            str: Unique fingerprint hash
+        """
+        # Create hash of key product attributes for a consistent, short identifier
+        fingerprint = product_fingerprint(product_url, retailer, discount_percentage, product_name)
+        
+        self.logger.debug(f"Created fingerprint for {product_name}: {fingerprint}")
+        return fingerprint
+    
+    @abstractmethod
+    def has_been_sent(self, product_url: str, retailer: str, 
+                     discount_percentage: float, product_name: str) -> bool:
+        """Check if a notification for this product has already been sent."""
+    
+    @abstractmethod
+    def mark_as_sent(self, product_url: str, retailer: str, 
+                    discount_percentage: float, product_name: str) -> None:
+        """Mark a product notification as sent."""
+    
+    @abstractmethod
+    def cleanup_old_notifications(self, days_to_keep: int = 30) -> None:
+        """Forget notifications older than ``days_to_keep`` days, where the store supports it."""
+    
+    @abstractmethod
+    def get_stats(self) -> Dict[str, Any]:
+        """Get statistics about sent notifications."""
+    
+    @abstractmethod
+    def close(self) -> None:
+        """Persist pending state and release resources (safe to call twice)."""
+
+
+class NotificationTracker(BaseNotificationTracker):
     """
     Tracks sent notifications to prevent duplicates.
     
     Uses product fingerprinting to create unique identifiers
     and stores them persistently to ensure idempotency.
+    
+    Storage is a JSON snapshot plus an append-only journal with one
+    fingerprint per line. Marking a notification as sent only appends to the
+    journal; the journal is folded into the snapshot once it grows past
+    ``compact_threshold`` entries and when the tracker is closed.
     """
     
-    def __init__(self, storage_file: str = "notifications_sent.json"):
+    def __init__(self, storage_file: str = "notifications_sent.json",
+                 fsync_every: int = 1, compact_threshold: int = 1000):
+        """
+        Args:
+            storage_file: Path of the JSON snapshot
+            fsync_every: fsync the journal after this many appends
+                (1 = every mark, 0 = never, leave it to the OS)
+            compact_threshold: Journal entries that trigger a compaction
+        """
         self.storage_file = Path(storage_file)
+        self.journal_file = self.storage_file.with_suffix('.journal')
+        self.fsync_every = fsync_every
+        self.compact_threshold = compact_threshold
         self.logger = logging.getLogger("notification_tracker")
         self.sent_notifications: Set[str] = set()
+        # Scrapers may share one tracker across threads
+        self._lock = threading.RLock()
+        self._journal = None
+        self._journal_entries = 0
+        self._unsynced_entries = 0
+        self._closed = False
         self._load_sent_notifications()
+        atexit.register(self.close)
     
     def _load_sent_notifications(self) -> None:
-        """Load previously sent notifications from storage."""
+        """Load previously sent notifications from the snapshot and journal."""
         try:
             if self.storage_file.exists():
                 with open(self.storage_file, 'r') as f:
                     data = json.load(f)
                     self.sent_notifications = set(data.get('sent_notifications', []))
-                    self.logger.info(f"Loaded {len(self.sent_notifications)} previously sent notifications")
+            
+            if self.journal_file.exists():
+                with open(self.journal_file, 'r') as f:
+                    for line in f:
+                        fingerprint = line.strip()
+                        # A crash mid-append can leave a torn last line
+                        if FINGERPRINT_PATTERN.match(fingerprint):
+                            self.sent_notifications.add(fingerprint)
+                            self._journal_entries += 1
+            
+            if self.sent_notifications:
+                self.logger.info(f"Loaded {len(self.sent_notifications)} previously sent notifications")
             else:
                 self.logger.info("No previous notifications found, starting fresh")
         except Exception as e:
             self.logger.error(f"Failed to load notification history: {str(e)}")
             self.sent_notifications = set()
     
+    def _open_journal(self):
+        """Open the journal for appending, starting on a fresh line."""
+        journal = open(self.journal_file, 'a')
+        if journal.tell() > 0:
+            with open(self.journal_file, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                # A crash mid-append left a torn last line; don't glue the next entry onto it
+                if f.read(1) != b'\n':
+                    journal.write('\n')
+        return journal
+    
+    def _append_to_journal(self, fingerprint: str) -> None:
+        """Append one fingerprint to the journal, fsyncing per ``fsync_every``."""
+        try:
+            if self._journal is None:
+                self._journal = self._open_journal()
+            self._journal.write(fingerprint + '\n')
+            self._journal.flush()
+            self._journal_entries += 1
+            self._unsynced_entries += 1
+            
+            if self.fsync_every and self._unsynced_entries >= self.fsync_every:
+                os.fsync(self._journal.fileno())
+                self._unsynced_entries = 0
+        except Exception as e:
+            self.logger.error(f"Failed to append to notification journal: {str(e)}")
+    
     def _save_sent_notifications(self) -> None:
-        """Save sent notifications to storage."""
+        """Write a full snapshot and truncate the journal (compaction)."""
         try:
             data = {
                 'sent_notifications': list(self.sent_notifications),
                 'last_updated': datetime.now().isoformat()
             }
-            with open(self.storage_file, 'w') as f:
+            # Write atomically so a crash never leaves a half-written snapshot
+            temp_file = self.storage_file.with_suffix('.tmp')
+            with open(temp_file, 'w') as f:
                 json.dump(data, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, self.storage_file)
+            
+            # Snapshot now holds everything in the journal
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            if self.journal_file.exists():
+                self.journal_file.unlink()
+            self._journal_entries = 0
+            self._unsynced_entries = 0
             self.logger.debug(f"Saved {len(self.sent_notifications)} sent notifications")
         except Exception as e:
             self.logger.error(f"Failed to save notification history: {str(e)}")
     
-    def create_product_fingerprint(self, product_url: str, retailer: str, 
-                                 discount_percentage: float, product_name: str) -> str:
-        """
-        Create a unique fingerprint for a product.
-        
-        Args:
-            product_url: Product URL
-            retailer: Retailer name
-            discount_percentage: Discount percentage
-            product_name: Product name
-            
-        Returns:
-            str: Unique fingerprint hash
-        """
-        # Create a unique identifier based on key product attributes
-        fingerprint_data = f"{product_url}|{retailer}|{discount_percentage:.1f}|{product_name.strip()}"
-        
-        # Create hash for consistent, short identifier
-        fingerprint = hashlib.md5(fingerprint_data.encode()).hexdigest()
-        
-        self.logger.debug(f"Created fingerprint for {product_name}: {fingerprint}")
-        return fingerprint
+    def compact(self) -> None:
+        """Fold the journal into the snapshot."""
+        with self._lock:
+            if self._journal_entries:
+                self._save_sent_notifications()
+    
+    def close(self) -> None:
+        """Compact the journal and release the file handle (safe to call twice)."""
+        with self._lock:
+            if self._closed:
+                return
+            self.compact()
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            self._closed = True
     
     def has_been_sent(self, product_url: str, retailer: str, 
                      discount_percentage: float, product_name: str) -> bool:
@@ -94,7 +228,8 @@ class NotificationTracker:
             product_url, retailer, discount_percentage, product_name
         )
         
-        has_sent = fingerprint in self.sent_notifications
+        with self._lock:
+            has_sent = fingerprint in self.sent_notifications
         
         if has_sent:
             self.logger.info(f"Notification already sent for {product_name} ({discount_percentage:.0f}% off)")
@@ -118,8 +253,12 @@ class NotificationTracker:
             product_url, retailer, discount_percentage, product_name
         )
         
-        self.sent_notifications.add(fingerprint)
-        self._save_sent_notifications()
+        with self._lock:
+            if fingerprint not in self.sent_notifications:
+                self.sent_notifications.add(fingerprint)
+                self._append_to_journal(fingerprint)
+                if self._journal_entries >= self.compact_threshold:
+                    self._save_sent_notifications()
         
         self.logger.info(f"Marked notification as sent for {product_name}")
     
@@ -154,5 +293,7 @@ class NotificationTracker:
         return {
             'total_sent_notifications': len(self.sent_notifications),
             'storage_file': str(self.storage_file),
-            'file_exists': self.storage_file.exists()
+            'file_exists': self.storage_file.exists(),
+            'journal_file': str(self.journal_file),
+            'journal_entries': self._journal_entries
         }
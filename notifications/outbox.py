@@ -0,0 +1,193 @@
+"""
+Durable outbox for notification delivery.
+Alerts are persisted before sending so a crash or failed POST never loses them.
+"""
+
+import atexit
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import List, Dict, Any
+from pathlib import Path
+import logging
+
+from scrapers.base import Product
+from .notification_tracker import product_fingerprint
+
+
+PENDING = 'pending'
+SENDING = 'sending'
+SENT = 'sent'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    fingerprint TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    name TEXT NOT NULL,
+    original_price REAL NOT NULL,
+    sale_price REAL NOT NULL,
+    discount_percentage REAL NOT NULL,
+    url TEXT NOT NULL,
+    image_url TEXT,
+    retailer TEXT,
+    scraped_at TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_state ON outbox (state);
+"""
+
+
+class NotificationOutbox:
+    """
+    Persistent pending -> sending -> sent log of alerts.
+
+    Products are written as ``pending`` before they are queued. The sender
+    moves a batch to ``sending`` before the POST, then to ``sent`` or back to
+    ``pending`` depending on the result. On startup, ``pending`` rows and any
+    rows left in ``sending`` by a crash are replayed. Delivery is therefore
+    at-least-once; the NotificationTracker dedupe stops a replay from sending
+    anything that was already recorded as sent.
+    """
+
+    def __init__(self, storage_file: str = "notifications_outbox.db", keep_sent_days: int = 7):
+        """
+        Args:
+            storage_file: Path of the SQLite database
+            keep_sent_days: Days to keep ``sent`` rows before purging them
+        """
+        self.storage_file = Path(storage_file)
+        self.logger = logging.getLogger("notification_outbox")
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.conn = sqlite3.connect(str(self.storage_file), timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+        self._purge_sent(keep_sent_days)
+        atexit.register(self.close)
+
+    @staticmethod
+    def key(product: Product) -> str:
+        """Outbox key for a product (same fingerprint as the tracker)."""
+        return product_fingerprint(product.url, product.retailer, product.discount_percentage, product.name)
+
+    def _purge_sent(self, keep_sent_days: int) -> None:
+        cutoff = (datetime.now() - timedelta(days=keep_sent_days)).isoformat()
+        with self._lock, self.conn:
+            deleted = self.conn.execute(
+                "DELETE FROM outbox WHERE state = ? AND updated_at < ?", (SENT, cutoff)
+            ).rowcount
+        if deleted:
+            self.logger.info(f"Purged {deleted} delivered notifications from outbox")
+
+    def add(self, products: List[Product]) -> List[Product]:
+        """
+        Record products as pending.
+
+        A product whose row is already ``sent`` goes back to ``pending``, so a
+        product that comes back is handed to the notifier again. The tracker
+        still dedupes the alert, and delivery callbacks such as the change
+        detection price update still run.
+
+        Args:
+            products: Products about to be queued for sending
+
+        Returns:
+            Products that were added or re-added (ones still pending or in flight are skipped)
+        """
+        now = datetime.now().isoformat()
+        added = []
+        with self._lock, self.conn:
+            for product in products:
+                cursor = self.conn.execute(
+                    "INSERT INTO outbox (fingerprint, state, name, original_price, sale_price, "
+                    "discount_percentage, url, image_url, retailer, scraped_at, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (fingerprint) DO UPDATE SET state = excluded.state, "
+                    "original_price = excluded.original_price, sale_price = excluded.sale_price, "
+                    "image_url = excluded.image_url, scraped_at = excluded.scraped_at, "
+                    "updated_at = excluded.updated_at WHERE outbox.state = ?",
+                    (self.key(product), PENDING, product.name, product.original_price, product.sale_price,
+                     product.discount_percentage, product.url, product.image_url, product.retailer,
+                     product.scraped_at.isoformat() if product.scraped_at else None, now, now, SENT)
+                )
+                if cursor.rowcount:
+                    added.append(product)
+        return added
+
+    def _set_state(self, products: List[Product], state: str, error: str = None) -> None:
+        if not products:
+            return
+        now = datetime.now().isoformat()
+        attempts_increment = 1 if state == SENDING else 0
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "UPDATE outbox SET state = ?, updated_at = ?, attempts = attempts + ?, "
+                "last_error = COALESCE(?, last_error) WHERE fingerprint = ?",
+                [(state, now, attempts_increment, error, self.key(product)) for product in products]
+            )
+
+    def mark_sending(self, products: List[Product]) -> None:
+        """Mark products as in flight, just before the webhook POST."""
+        self._set_state(products, SENDING)
+
+    def mark_sent(self, products: List[Product]) -> None:
+        """Mark products as delivered."""
+        self._set_state(products, SENT)
+
+    def mark_failed(self, products: List[Product], error: str = "delivery failed") -> None:
+        """Return products to pending so they are retried (now or on the next run)."""
+        self._set_state(products, PENDING, error)
+
+    def replay(self) -> List[Product]:
+        """
+        Load products that were never confirmed as delivered.
+
+        Returns:
+            Products in ``pending`` or ``sending`` state, oldest first
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT name, original_price, sale_price, discount_percentage, url, image_url, "
+                "retailer, scraped_at FROM outbox WHERE state IN (?, ?) ORDER BY created_at",
+                (PENDING, SENDING)
+            ).fetchall()
+
+        products = []
+        for name, original_price, sale_price, discount_percentage, url, image_url, retailer, scraped_at in rows:
+            products.append(Product(
+                name=name,
+                original_price=original_price,
+                sale_price=sale_price,
+                discount_percentage=discount_percentage,
+                url=url,
+                image_url=image_url,
+                retailer=retailer or "",
+                scraped_at=datetime.fromisoformat(scraped_at) if scraped_at else None
+            ))
+        if products:
+            self.logger.info(f"Replaying {len(products)} undelivered notifications from outbox")
+        return products
+
+    def close(self) -> None:
+        """Close the database (safe to call twice)."""
+        with self._lock:
+            if not self._closed:
+                self.conn.close()
+                self._closed = True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get outbox statistics.
+
+        Returns:
+            dict: Row counts per state
+        """
+        with self._lock:
+            counts = dict(self.conn.execute("SELECT state, COUNT(*) FROM outbox GROUP BY state").fetchall())
+        return {state: counts.get(state, 0) for state in (PENDING, SENDING, SENT)}
@@ -0,0 +1,272 @@
+"""
+Background notification pipeline.
+Scrapers enqueue products; a dedicated worker thread batches and sends them.
+"""
+
+import queue
+import threading
+import time
+import logging
+from typing import List, Optional, Dict, Any
+
+from scrapers.base import Product
+from .discord_notifier import DiscordNotifier, MAX_EMBEDS_PER_MESSAGE
+from .outbox import NotificationOutbox
+
+
+# Queue marker telling the worker to finish
+_STOP = object()
+
+
+class NotificationPipeline:
+    """
+    Producer/consumer wrapper around DiscordNotifier.
+
+    Offers the same ``send_high_discount_alerts`` call as the notifier, but
+    it only enqueues the products and returns straight away, so a slow
+    webhook POST never stalls page fetching. A single worker drains the
+    bounded queue in batches and retries failed batches with backoff. When
+    the queue is full, producers wait up to ``put_timeout`` seconds, which
+    slows scrapers down instead of growing memory without limit. If the
+    worker is gone or the queue stays full, products are sent inline instead.
+    
+    With an outbox, products are persisted before they are queued and their
+    delivery state is tracked, so anything queued but not sent when the
+    process dies is replayed by ``replay_outbox`` on the next run.
+    """
+
+    # Lets scrapers tell queued alerts apart from ones that were sent inline
+    background = True
+
+    @property
+    def guarantees_delivery(self) -> bool:
+        """Whether a queued alert survives a failed send (the outbox replays it next run)."""
+        return self.outbox is not None
+
+    def __init__(self, notifier: DiscordNotifier, max_queue_size: int = 1000,
+                 batch_size: int = MAX_EMBEDS_PER_MESSAGE, batch_wait: float = 1.0,
+                 max_retries: int = 3, retry_delay: float = 2.0,
+                 outbox: Optional[NotificationOutbox] = None, put_timeout: float = 30.0):
+        """
+        Args:
+            notifier: Notifier that performs the actual sends
+            max_queue_size: Products buffered before producers block
+            batch_size: Maximum products per send
+            batch_wait: Seconds to wait for a batch to fill before sending
+            max_retries: Retries for a failed batch
+            retry_delay: Initial delay between retries (doubles each attempt)
+            outbox: Durable outbox recording delivery state (optional)
+            put_timeout: Seconds a producer waits on a full queue before sending inline
+        """
+        self.notifier = notifier
+        self.outbox = outbox
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.put_timeout = put_timeout
+        self.logger = logging.getLogger("notification_pipeline")
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue_size)
+        self._worker: Optional[threading.Thread] = None
+        self._deadline: Optional[float] = None
+
+        # Statistics
+        self.enqueued = 0
+        self.sent_batches = 0
+        self.failed_products = 0
+        self.dropped_products = 0
+        self.inline_products = 0
+        self.replayed = 0
+
+    def start(self) -> "NotificationPipeline":
+        """Start the sender worker."""
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="notification-sender", daemon=True)
+            self._worker.start()
+        return self
+
+    def send_high_discount_alerts(self, products: List[Product]) -> bool:
+        """
+        Enqueue products for sending.
+
+        Args:
+            products: Products to alert on
+
+        Returns:
+            bool: True once the products are queued (or, if they had to be
+            sent inline, True only if they were delivered)
+        """
+        if self.outbox is not None:
+            # Persist first; products already in the outbox are in flight or replayed
+            products = self.outbox.add(products)
+        
+        return self._enqueue(products)
+
+    def _enqueue(self, products: List[Product]) -> bool:
+        """Queue products for the worker, sending inline whatever cannot be queued."""
+        for index, product in enumerate(products):
+            if self._worker is None or not self._worker.is_alive():
+                return self._send_inline(products[index:], "sender worker is not running")
+            try:
+                self._queue.put(product, timeout=self.put_timeout)
+            except queue.Full:
+                return self._send_inline(products[index:], f"queue still full after {self.put_timeout:.0f}s")
+            self.enqueued += 1
+        return True
+
+    def _send_inline(self, products: List[Product], reason: str) -> bool:
+        """Send products on the caller's thread when the worker cannot take them."""
+        self.logger.warning(f"Sending {len(products)} notifications inline: {reason}")
+        self.inline_products += len(products)
+        try:
+            failed = self._deliver(products)
+        except Exception as e:
+            self.logger.error(f"Error sending notifications inline: {str(e)}")
+            return False
+        self.failed_products += len(failed)
+        return not failed
+
+    def replay_outbox(self) -> int:
+        """
+        Queue undelivered products left in the outbox by a previous run.
+        
+        Returns:
+            int: Number of products replayed
+        """
+        if self.outbox is None:
+            return 0
+        
+        products = self.outbox.replay()
+        self._enqueue(products)
+        self.replayed += len(products)
+        return len(products)
+    
+    def _next_batch(self, first: Product) -> List[Product]:
+        """Collect up to ``batch_size`` products, waiting at most ``batch_wait``."""
+        batch = [first]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=max(remaining, 0)) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                # Put the marker back so the main loop sees it after this batch
+                self._queue.put(item)
+                break
+            batch.append(item)
+        return batch
+
+    def _past_deadline(self) -> bool:
+        return self._deadline is not None and time.monotonic() >= self._deadline
+
+    def _deliver(self, products: List[Product]) -> List[Product]:
+        """
+        Send products once, recording the outcome in the outbox.
+
+        Returns:
+            List of products that were not delivered
+        """
+        if self.outbox is not None:
+            self.outbox.mark_sending(products)
+        
+        try:
+            failed = self.notifier.send_alerts(products)
+        except Exception as e:
+            self.logger.error(f"Error sending notification batch: {str(e)}")
+            failed = products
+        
+        if self.outbox is not None:
+            failed_ids = {id(product) for product in failed}
+            self.outbox.mark_sent([p for p in products if id(p) not in failed_ids])
+            self.outbox.mark_failed(failed)
+        return failed
+
+    def _send_with_retries(self, batch: List[Product]) -> None:
+        """Send a batch, retrying whatever failed until retries or the deadline run out."""
+        pending = batch
+        for attempt in range(self.max_retries + 1):
+            pending = self._deliver(pending)
+
+            if not pending:
+                self.sent_batches += 1
+                return
+
+            if attempt < self.max_retries and not self._past_deadline():
+                wait_time = self.retry_delay * (2 ** attempt)
+                self.logger.warning(f"{len(pending)} notifications failed, retrying in {wait_time:.1f}s")
+                time.sleep(wait_time)
+            else:
+                break
+
+        self.failed_products += len(pending)
+        self.logger.error(f"Giving up on {len(pending)} notifications: {', '.join(p.name for p in pending)}")
+
+    def _run(self) -> None:
+        """Worker loop: drain the queue in batches until told to stop."""
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            batch = self._next_batch(item)
+            if self._past_deadline():
+                self.dropped_products += len(batch)
+                continue
+            try:
+                self._send_with_retries(batch)
+            except Exception as e:
+                # e.g. the outbox database is locked; keep the worker alive for the next batch
+                self.failed_products += len(batch)
+                self.logger.error(f"Error handling notification batch of {len(batch)}: {str(e)}")
+
+    def shutdown(self, timeout: float = 60.0) -> None:
+        """
+        Flush queued notifications and stop the worker.
+
+        Args:
+            timeout: Seconds allowed for the flush; anything still queued
+                after that is dropped (and logged), and stays pending in the
+                outbox if there is one
+        """
+        if self._worker is None:
+            return
+
+        self._deadline = time.monotonic() + timeout
+        stop_queued = False
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+            stop_queued = True
+            self._worker.join(max(self._deadline - time.monotonic(), 0))
+        except queue.Full:
+            self.logger.error(f"Could not signal the notification worker to stop: queue still full after {timeout:.0f}s")
+
+        if self._worker.is_alive() or self.dropped_products:
+            queued = self._queue.qsize() - (1 if stop_queued and self._worker.is_alive() else 0)
+            unsent = max(queued, 0) + self.dropped_products
+            if self.outbox is not None:
+                outcome = "they stay in the outbox and will be replayed on the next run"
+            else:
+                outcome = "they are lost (no outbox)"
+            self.logger.error(f"Notification queue not flushed within {timeout:.0f}s "
+                              f"({unsent} notifications unsent; {outcome})")
+        self._worker = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get pipeline statistics.
+
+        Returns:
+            dict: Products enqueued, batches sent, failures and queue depth
+        """
+        return {
+            'enqueued': self.enqueued,
+            'sent_batches': self.sent_batches,
+            'failed_products': self.failed_products,
+            'dropped_products': self.dropped_products,
+            'inline_products': self.inline_products,
+            'queued': self._queue.qsize(),
+            'replayed': self.replayed,
+        }
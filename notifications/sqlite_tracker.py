@@ -0,0 +1,229 @@
+"""
+SQLite-backed notification tracking.
+Indexed fingerprint lookups with real timestamps, so old entries can expire.
+"""
+
+import atexit
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Tuple
+from pathlib import Path
+import logging
+
+from .notification_tracker import BaseNotificationTracker
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sent_notifications (
+    fingerprint TEXT PRIMARY KEY,
+    retailer TEXT,
+    first_sent_at TEXT NOT NULL,
+    last_seen_at TEXT NOT NULL,
+    discount_percentage REAL
+);
+CREATE INDEX IF NOT EXISTS idx_sent_notifications_last_seen ON sent_notifications (last_seen_at);
+CREATE INDEX IF NOT EXISTS idx_sent_notifications_retailer ON sent_notifications (retailer);
+"""
+
+
+class SQLiteNotificationTracker(BaseNotificationTracker):
+    """
+    Drop-in replacement for NotificationTracker backed by SQLite.
+
+    Lookups hit the fingerprint primary key instead of an in-memory set, so
+    memory stays flat however long the history grows. The database runs in
+    WAL mode with a busy timeout so overlapping cron runs can share it.
+    ``mark_as_sent`` commits straight away, so other processes see the row
+    at once and a crash cannot lose it. Only the ``last_seen_at`` touches
+    made by lookups are buffered and written in batches of ``batch_size``.
+    """
+
+    def __init__(self, storage_file: str = "notifications_sent.db", batch_size: int = 25,
+                 legacy_json_file: str = "notifications_sent.json"):
+        """
+        Args:
+            storage_file: Path of the SQLite database
+            batch_size: Pending last-seen updates that trigger a flush
+            legacy_json_file: JSON history imported once into an empty database
+        """
+        self.storage_file = Path(storage_file)
+        self.batch_size = batch_size
+        self.logger = logging.getLogger("notification_tracker")
+        self._lock = threading.RLock()
+        self._pending_touches: Dict[str, str] = {}
+        self._closed = False
+
+        self.conn = sqlite3.connect(str(self.storage_file), timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+        self._import_legacy_json(Path(legacy_json_file))
+        self.logger.info(f"Using SQLite notification store: {self.storage_file} ({self._count()} notifications)")
+        atexit.register(self.close)
+
+    def _count(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM sent_notifications").fetchone()[0]
+
+    def _import_legacy_json(self, legacy_file: Path) -> None:
+        """Seed an empty database with fingerprints from notifications_sent.json."""
+        try:
+            if not legacy_file.exists() or self._count() > 0:
+                return
+
+            with open(legacy_file, 'r') as f:
+                fingerprints = json.load(f).get('sent_notifications', [])
+
+            journal_file = legacy_file.with_suffix('.journal')
+            if journal_file.exists():
+                with open(journal_file, 'r') as f:
+                    fingerprints.extend(line.strip() for line in f if line.strip())
+
+            if fingerprints:
+                # No timestamps in the JSON history; treat it as seen now
+                now = datetime.now().isoformat()
+                with self._lock, self.conn:
+                    self.conn.executemany(
+                        "INSERT OR IGNORE INTO sent_notifications VALUES (?, NULL, ?, ?, NULL)",
+                        [(fingerprint, now, now) for fingerprint in fingerprints]
+                    )
+                self.logger.info(f"Imported {len(fingerprints)} notifications from {legacy_file}")
+        except Exception as e:
+            self.logger.error(f"Failed to import legacy notification history: {str(e)}")
+
+    def flush(self) -> None:
+        """Write pending last-seen updates in one transaction."""
+        with self._lock:
+            if not self._pending_touches:
+                return
+            try:
+                with self.conn:
+                    self.conn.executemany(
+                        "UPDATE sent_notifications SET last_seen_at = ? WHERE fingerprint = ?",
+                        [(seen_at, fingerprint) for fingerprint, seen_at in self._pending_touches.items()]
+                    )
+                self.logger.debug(f"Flushed {len(self._pending_touches)} last-seen updates")
+                self._pending_touches.clear()
+            except Exception as e:
+                self.logger.error(f"Failed to flush notification store: {str(e)}")
+
+    def _maybe_flush(self) -> None:
+        if len(self._pending_touches) >= self.batch_size:
+            self.flush()
+
+    def has_been_sent(self, product_url: str, retailer: str,
+                     discount_percentage: float, product_name: str) -> bool:
+        """
+        Check if a notification for this product has already been sent.
+
+        A hit also refreshes the row's ``last_seen_at`` so products that stay
+        on sale don't expire and get re-notified.
+
+        Args:
+            product_url: Product URL
+            retailer: Retailer name
+            discount_percentage: Discount percentage
+            product_name: Product name
+
+        Returns:
+            bool: True if notification was already sent, False otherwise
+        """
+        fingerprint = self.create_product_fingerprint(
+            product_url, retailer, discount_percentage, product_name
+        )
+
+        with self._lock:
+            has_sent = self.conn.execute(
+                "SELECT 1 FROM sent_notifications WHERE fingerprint = ?", (fingerprint,)
+            ).fetchone() is not None
+
+            if has_sent:
+                self._pending_touches[fingerprint] = datetime.now().isoformat()
+                self._maybe_flush()
+
+        if has_sent:
+            self.logger.info(f"Notification already sent for {product_name} ({discount_percentage:.0f}% off)")
+        else:
+            self.logger.info(f"New notification for {product_name} ({discount_percentage:.0f}% off)")
+
+        return has_sent
+
+    def mark_as_sent(self, product_url: str, retailer: str,
+                    discount_percentage: float, product_name: str) -> None:
+        """
+        Mark a product notification as sent.
+
+        Args:
+            product_url: Product URL
+            retailer: Retailer name
+            discount_percentage: Discount percentage
+            product_name: Product name
+        """
+        fingerprint = self.create_product_fingerprint(
+            product_url, retailer, discount_percentage, product_name
+        )
+
+        now = datetime.now().isoformat()
+        try:
+            # Committed at once so parallel runs see it and a crash cannot lose it
+            with self._lock, self.conn:
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO sent_notifications VALUES (?, ?, ?, ?, ?)",
+                    (fingerprint, retailer, now, now, discount_percentage)
+                )
+        except Exception as e:
+            self.logger.error(f"Failed to record notification for {product_name}: {str(e)}")
+            return
+
+        self.logger.info(f"Marked notification as sent for {product_name}")
+
+    def cleanup_old_notifications(self, days_to_keep: int = 30) -> None:
+        """
+        Delete notifications whose product hasn't been seen for ``days_to_keep`` days.
+
+        Args:
+            days_to_keep: Number of days to keep notification history
+        """
+        cutoff = (datetime.now() - timedelta(days=days_to_keep)).isoformat()
+        try:
+            self.flush()
+            with self._lock, self.conn:
+                deleted = self.conn.execute(
+                    "DELETE FROM sent_notifications WHERE last_seen_at < ?", (cutoff,)
+                ).rowcount
+            self.logger.info(f"Notification cleanup: removed {deleted} notifications older than {days_to_keep} days")
+        except Exception as e:
+            self.logger.error(f"Failed to cleanup old notifications: {str(e)}")
+
+    def close(self) -> None:
+        """Flush pending writes and close the database (safe to call twice)."""
+        with self._lock:
+            if self._closed:
+                return
+            self.flush()
+            self.conn.close()
+            self._closed = True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get statistics about sent notifications.
+
+        Returns:
+            dict: Statistics about notification tracking
+        """
+        with self._lock:
+            by_retailer: List[Tuple[str, int]] = self.conn.execute(
+                "SELECT COALESCE(retailer, 'unknown'), COUNT(*) FROM sent_notifications GROUP BY retailer"
+            ).fetchall()
+        return {
+            'total_sent_notifications': self._count(),
+            'storage_file': str(self.storage_file),
+            'file_exists': self.storage_file.exists(),
+            'backend': 'sqlite',
+            'by_retailer': dict(by_retailer),
+            'pending_writes': len(self._pending_touches)
+        }
@@ -0,0 +1,135 @@
+"""
+Rate-limit aware scheduler for Discord webhook POSTs.
+Follows Discord's bucket headers and retries 429s after the advertised delay.
+"""
+
+import threading
+import time
+import logging
+from typing import Dict, Any
+
+
+class WebhookScheduler:
+    """
+    Serialises webhook sends and paces them from Discord's rate-limit headers.
+
+    After every response the bucket state is read from ``X-RateLimit-Remaining``
+    and ``X-RateLimit-Reset-After``, and the remaining sends are spread evenly
+    over the reset window: the next send waits ``reset_after / max(remaining, 1)``
+    seconds, so an empty bucket waits for the full reset instead of provoking
+    a 429. If a 429 still comes back, the send is retried after ``retry_after``
+    seconds rather than dropped.
+    Callers queue on a lock, so concurrent scrapers share one budget.
+    """
+
+    def __init__(self, session, max_retries: int = 5):
+        """
+        Args:
+            session: requests.Session used for the POSTs
+            max_retries: 429 retries per message before giving up
+        """
+        self.session = session
+        self.max_retries = max_retries
+        self.logger = logging.getLogger("webhook_scheduler")
+        self._send_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+
+        # Earliest time the next send may go out, from the last response's bucket state
+        self._next_send_at = 0.0
+
+        # Statistics
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.sends = 0
+        self.rate_limited = 0
+        self.throttled_time = 0.0
+
+    def _update_bucket(self, response) -> None:
+        """Space the next send from the rate-limit headers."""
+        headers = response.headers
+        if 'X-RateLimit-Remaining' not in headers or 'X-RateLimit-Reset-After' not in headers:
+            return
+        try:
+            remaining = int(headers['X-RateLimit-Remaining'])
+            reset_after = float(headers['X-RateLimit-Reset-After'])
+        except (TypeError, ValueError):
+            self.logger.debug(f"Unparseable rate-limit headers: {dict(headers)}")
+            return
+        self._next_send_at = time.monotonic() + reset_after / max(remaining, 1)
+
+    def _throttle(self, seconds: float, reason: str) -> None:
+        if seconds <= 0:
+            return
+        self.logger.info(f"Discord rate limit: waiting {seconds:.2f}s ({reason})")
+        self.throttled_time += seconds
+        time.sleep(seconds)
+
+    def _retry_after(self, response) -> float:
+        """Seconds to wait after a 429, from the body or the Retry-After header."""
+        try:
+            body = response.json()
+            if isinstance(body, dict) and body.get('retry_after') is not None:
+                return float(body['retry_after'])
+        except Exception:
+            pass
+        try:
+            return float(response.headers.get('Retry-After', 1))
+        except (TypeError, ValueError):
+            return 1.0
+
+    def post(self, url: str, payload: dict, timeout: float = 10):
+        """
+        Send a webhook message, waiting out rate limits as needed.
+
+        Args:
+            url: Webhook URL
+            payload: JSON payload
+            timeout: Request timeout in seconds
+
+        Returns:
+            The final response (callers should still ``raise_for_status``)
+        """
+        with self._state_lock:
+            self.queue_depth += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+        with self._send_lock:
+            with self._state_lock:
+                self.queue_depth -= 1
+
+            for attempt in range(self.max_retries + 1):
+                # Spread the bucket's remaining sends over its reset window
+                self._throttle(self._next_send_at - time.monotonic(), "pacing")
+
+                response = self.session.post(url, json=payload, timeout=timeout)
+                self.sends += 1
+                self._update_bucket(response)
+
+                if response.status_code != 429:
+                    return response
+
+                self.rate_limited += 1
+                retry_after = self._retry_after(response)
+                self.logger.warning(f"Discord returned 429 (attempt {attempt + 1}/{self.max_retries + 1}), "
+                                    f"retrying after {retry_after:.2f}s")
+                if attempt < self.max_retries:
+                    self._throttle(retry_after, "429 retry_after")
+                    # retry_after already covers the wait; don't pace on top of it
+                    self._next_send_at = 0.0
+
+            return response
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get send and throttling statistics.
+
+        Returns:
+            dict: Sends, 429 responses, seconds throttled and queue depth
+        """
+        return {
+            'sends': self.sends,
+            'rate_limited': self.rate_limited,
+            'throttled_time': self.throttled_time,
+            'queue_depth': self.queue_depth,
+            'max_queue_depth': self.max_queue_depth,
+        }
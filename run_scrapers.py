@@ -2,27 +2,35 @@
 """
 Unified script to run all scrapers.
 Usage: 
-    python run_scrapers.py           # Use production webhook
-    python run_scrapers.py --dev     # Use development webhook
+    python run_scrapers.py              # Use production webhook
+    python run_scrapers.py --dev        # Use development webhook
+    python run_scrapers.py --parallel 3 # Run up to 3 retailers at once
 """
 
 import sys
 import os
+import io
 import argparse
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import time
 import logging
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 # Add the project root to Python path
 project_root = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, project_root)
 
-from scrapers.flannels_vps import FlannelsVPSScraper
-from scrapers.harrods import HarrodsScraper
-from scrapers.harvey_nichols import HarveyNicholsScraper
-from scrapers.selfridges_vps import SelfridgesVpsScraper
-from scrapers.end_clothing import EndClothingScraper
+from scrapers.registry import RETAILERS
+
+if TYPE_CHECKING:
+    from notifications.discord_notifier import DiscordNotifier
+
+# Scraper modules are imported on demand through scrapers.registry, and the
+# notifier and opt-in stores only once main() knows they are needed
 
 
 def setup_logging():
@@ -64,7 +72,70 @@ def setup_webhook_url(use_dev: bool = False):
     os.environ['DISCORD_WEBHOOK_URL'] = webhook_url
 
 
-def run_scraper(scraper_class, scraper_name):
+def create_notifier(enable_idempotency: bool = True, tracker_backend: str = "json",
+                    ttl_days: int = 30) -> "DiscordNotifier":
+    """Create the single notifier (and tracker) shared by every scraper in the run."""
+    from notifications.discord_notifier import DiscordNotifier
+    
+    tracker = None
+    if not enable_idempotency:
+        print("⚠️  Idempotency disabled - duplicate notifications will be sent")
+    elif tracker_backend == "sqlite":
+        from notifications.sqlite_tracker import SQLiteNotificationTracker
+        tracker = SQLiteNotificationTracker()
+        tracker.cleanup_old_notifications(days_to_keep=ttl_days)
+    else:
+        from notifications.notification_tracker import NotificationTracker
+        tracker = NotificationTracker()
+    
+    # With --changes-only, a product's prices are only recorded once its alert is delivered
+    from scrapers.product_state import get_product_state
+    product_state = get_product_state()
+    
+    return DiscordNotifier(
+        os.environ['DISCORD_WEBHOOK_URL'],
+        enable_idempotency=enable_idempotency,
+        tracker=tracker,
+        on_delivered=product_state.mark_delivered if product_state is not None else None
+    )
+
+
+class ThreadBufferedStdout(io.TextIOBase):
+    """
+    stdout proxy that lets worker threads buffer their own output.
+    
+    Scrapers print progress as they go; when several run side by side the
+    lines would interleave. Each worker captures into its own buffer and the
+    main thread prints it as one block once that retailer finishes.
+    
+    The buffer lives in a context variable, so threads a scraper starts with
+    the caller's context (see HarveyNicholsScraper._iter_remaining_pages)
+    write into the same buffer.
+    """
+    
+    def __init__(self, stream):
+        self._stream = stream
+        self._buffer = contextvars.ContextVar('stdout_buffer', default=None)
+    
+    def start_capture(self) -> None:
+        self._buffer.set(io.StringIO())
+    
+    def stop_capture(self) -> str:
+        buffer = self._buffer.get()
+        self._buffer.set(None)
+        return buffer.getvalue() if buffer else ""
+    
+    def write(self, text: str) -> int:
+        buffer = self._buffer.get()
+        if buffer is not None:
+            return buffer.write(text)
+        return self._stream.write(text)
+    
+    def flush(self) -> None:
+        self._stream.flush()
+
+
+def run_scraper(scraper_class, scraper_name, notifier=None):
     """Run a single scraper and return results."""
     print(f"\n{'='*60}")
     print(f"🔍 Running {scraper_name}")
@@ -73,28 +144,35 @@ def run_scraper(scraper_class, scraper_name):
     start_time = time.time()
     
     try:
-        scraper = scraper_class()
-        products = scraper.scrape_products()
+        scraper = scraper_class(notifier=notifier)
+        
+        # Consume the stream; only the count and a short preview are kept
+        product_count = 0
+        preview = []
+        for product in scraper.iter_products():
+            product_count += 1
+            if len(preview) < 5:
+                preview.append(product)
         
         end_time = time.time()
         duration = end_time - start_time
         
         print(f"✅ {scraper_name}: Completed in {duration:.1f}s")
-        print(f"📦 {scraper_name}: Found {len(products)} high discount products")
+        print(f"📦 {scraper_name}: Found {product_count} high discount products")
         
-        if products:
-            print(f"🔥 {scraper_name}: Products with ≥70% discount:")
-            for i, product in enumerate(products[:5], 1):  # Show first 5
+        if preview:
+            print(f"🔥 {scraper_name}: Products with ≥{scraper.discount_threshold:.0f}% discount:")
+            for i, product in enumerate(preview, 1):  # Show first 5
                 print(f"   {i}. {product.name[:60]}... ({product.discount_percentage:.0f}% off)")
-            if len(products) > 5:
-                print(f"   ... and {len(products) - 5} more")
+            if product_count > 5:
+                print(f"   ... and {product_count - 5} more")
         else:
             print(f"❌ {scraper_name}: No high discount products found")
             
         return {
             'scraper': scraper_name,
             'success': True,
-            'products': len(products),
+            'products': product_count,
             'duration': duration,
             'error': None
         }
@@ -115,25 +193,96 @@ def run_scraper(scraper_class, scraper_name):
         }
 
 
+def run_scrapers_parallel(scrapers, max_workers: int, logger, notifier=None):
+    """
+    Run scrapers side by side in a thread pool.
+    
+    Each retailer gets its own scraper instance and its own stdout buffer,
+    so a failure or slow page in one retailer does not affect the others.
+    Results are returned in the same order as ``scrapers``.
+    
+    Args:
+        scrapers: List of (scraper_class, scraper_name) tuples
+        max_workers: Maximum number of retailers to run at once
+        logger: Logger for run progress
+        notifier: Shared DiscordNotifier passed to every scraper
+        
+    Returns:
+        List of result dicts as produced by run_scraper
+    """
+    real_stdout = sys.stdout
+    buffered_stdout = ThreadBufferedStdout(real_stdout)
+    print_lock = threading.Lock()
+    
+    def _run_isolated(scraper_class, scraper_name):
+        buffered_stdout.start_capture()
+        try:
+            logger.info(f"Starting scraper: {scraper_name}")
+            return run_scraper(scraper_class, scraper_name, notifier)
+        finally:
+            output = buffered_stdout.stop_capture()
+            # Print each retailer's output as one block
+            with print_lock:
+                real_stdout.write(output)
+                real_stdout.flush()
+    
+    # Console log lines go through the same per-retailer buffers
+    console_handlers = [
+        handler for handler in logging.getLogger().handlers
+        if isinstance(handler, logging.StreamHandler) and getattr(handler, 'stream', None) is real_stdout
+    ]
+    for handler in console_handlers:
+        handler.setStream(buffered_stdout)
+    
+    sys.stdout = buffered_stdout
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scraper") as executor:
+            futures = [
+                executor.submit(_run_isolated, scraper_class, scraper_name)
+                for scraper_class, scraper_name in scrapers
+            ]
+            results = []
+            for future, (_, scraper_name) in zip(futures, scrapers):
+                result = future.result()
+                results.append(result)
+                logger.info(f"Completed scraper: {scraper_name} - Success: {result['success']}, Products: {result['products']}")
+    finally:
+        sys.stdout = real_stdout
+        for handler in console_handlers:
+            handler.setStream(real_stdout)
+    
+    return results
+
+
 def main():
     """Main function to run all scrapers."""
     parser = argparse.ArgumentParser(description='Run discount scrapers')
     parser.add_argument('--dev', action='store_true', 
                        help='Use development webhook instead of production')
     
-    # Individual scraper flags
-    parser.add_argument('--flannel', action='store_true',
-                       help='Run only Flannels scraper')
-    parser.add_argument('--harrods', action='store_true',
-                       help='Run only Harrods scraper')
-    parser.add_argument('--harvey', action='store_true',
-                       help='Run only Harvey Nichols scraper')
-    parser.add_argument('--selfridges', action='store_true',
-                       help='Run only Selfridges scraper')
-    parser.add_argument('--end', action='store_true',
-                       help='Run only END Clothing scraper')
+    # Individual scraper flags (--flannel, --harrods, ...), one per registered retailer
+    for retailer in RETAILERS:
+        parser.add_argument(f'--{retailer.key}', action='store_true',
+                           help=f'Run only {retailer.name} scraper')
     parser.add_argument('--no-idempotency', action='store_true',
                        help='Disable idempotency (send all notifications, including duplicates)')
+    parser.add_argument('--tracker', choices=['json', 'sqlite'], default='json',
+                       help='Notification dedupe store (default: json)')
+    parser.add_argument('--tracker-ttl-days', type=int, default=30, metavar='DAYS',
+                       help='With --tracker sqlite, forget products not seen for DAYS days (default: 30)')
+    parser.add_argument('--inline-notifications', action='store_true',
+                       help='Send notifications from inside the scrape loop instead of a background sender')
+    parser.add_argument('--notification-flush-timeout', type=float, default=60.0, metavar='SECONDS',
+                       help='Max seconds to flush queued notifications at shutdown (default: 60)')
+    parser.add_argument('--parallel', type=int, default=1, metavar='N',
+                       help='Run up to N retailers concurrently (default: 1, sequential); '
+                            'each retailer\'s output is printed as one block when it finishes')
+    parser.add_argument('--http-cache', action='store_true',
+                       help='Skip listing pages that are unchanged since the last run (same as HTTP_CACHE=1)')
+    parser.add_argument('--page-fingerprints', action='store_true',
+                       help='Reuse last run\'s products for pages whose product cards are unchanged (same as PAGE_FINGERPRINTS=1)')
+    parser.add_argument('--changes-only', action='store_true',
+                       help='Only pass on products that are new or repriced since the last run (same as CHANGES_ONLY=1)')
     
     args = parser.parse_args()
     
@@ -143,58 +292,92 @@ def main():
     # Setup webhook
     setup_webhook_url(args.dev)
     
-    # Define all available scrapers (VPS-optimized versions)
-    all_scrapers = [
-        (FlannelsVPSScraper, "Flannels VPS", "flannel"),
-        (HarrodsScraper, "Harrods", "harrods"),
-        (HarveyNicholsScraper, "Harvey Nichols", "harvey"),
-        (SelfridgesVpsScraper, "Selfridges VPS", "selfridges"),
-        (EndClothingScraper, "END Clothing", "end")
-    ]
+    # Scrapers pick the cache up from the environment when they are created
+    if args.http_cache:
+        os.environ['HTTP_CACHE'] = '1'
+    if args.page_fingerprints:
+        os.environ['PAGE_FINGERPRINTS'] = '1'
+    if args.changes_only:
+        os.environ['CHANGES_ONLY'] = '1'
     
-    # Determine which scrapers to run based on arguments
-    scrapers_to_run = []
-    
-    # Check if any specific scraper flags are set
-    specific_scrapers = [
-        (args.flannel, "flannel"),
-        (args.harrods, "harrods"),
-        (args.harvey, "harvey"),
-        (args.selfridges, "selfridges"),
-        (args.end, "end")
-    ]
+    # One notifier/tracker for the whole run
+    notifier = create_notifier(
+        enable_idempotency=not args.no_idempotency,
+        tracker_backend=args.tracker,
+        ttl_days=args.tracker_ttl_days
+    )
     
-    if any(flag for flag, _ in specific_scrapers):
-        # Run only the specified scrapers
-        for flag, scraper_key in specific_scrapers:
-            if flag:
-                for scraper_class, scraper_name, key in all_scrapers:
-                    if key == scraper_key:
-                        scrapers_to_run.append((scraper_class, scraper_name))
-                        break
+    # Scrapers push products to a background sender unless asked not to
+    if args.inline_notifications:
+        scraper_notifier = notifier
     else:
-        # Run all scrapers if no specific flags are set
-        scrapers_to_run = [(scraper_class, scraper_name) for scraper_class, scraper_name, _ in all_scrapers]
+        from notifications.pipeline import NotificationPipeline
+        from notifications.outbox import NotificationOutbox
+        
+        # The outbox relies on the tracker to dedupe replays, so it needs idempotency
+        outbox = NotificationOutbox() if not args.no_idempotency else None
+        pipeline = NotificationPipeline(notifier, outbox=outbox).start()
+        replayed = pipeline.replay_outbox()
+        if replayed:
+            print(f"📬 Replaying {replayed} undelivered notifications from the previous run")
+        scraper_notifier = pipeline
+    
+    # Run only the specified scrapers, or all of them if no specific flags are set
+    selected = [retailer for retailer in RETAILERS if getattr(args, retailer.key)] or RETAILERS
     
-    scrapers = scrapers_to_run
+    # Import only the selected scraper modules; a missing dependency fails that retailer only
+    scrapers = []
+    import_failures = []
+    for retailer in selected:
+        try:
+            scrapers.append((retailer.load(), retailer.name))
+        except ImportError as e:
+            print(f"❌ {retailer.name}: Could not import scraper - {str(e)}")
+            logger.error(f"Could not import {retailer.module}: {str(e)}")
+            import_failures.append({
+                'scraper': retailer.name,
+                'success': False,
+                'products': 0,
+                'duration': 0.0,
+                'error': f"Import failed: {str(e)}"
+            })
     
     # Update title based on what we're running
-    if len(scrapers) == 1:
-        print(f"🚀 Discount Notifier - {scrapers[0][1]} Scraper")
+    if len(selected) == 1:
+        print(f"🚀 Discount Notifier - {selected[0].name} Scraper")
     else:
         print("🚀 Discount Notifier - Full Scraping Run")
     print("="*60)
     print(f"⏰ Started at: {datetime.now().strftime('%H:%M:%S on %d/%m/%Y')}")
     
-    results = []
+    results = list(import_failures)
     total_start_time = time.time()
     
-    # Run each scraper
-    for scraper_class, scraper_name in scrapers:
-        logger.info(f"Starting scraper: {scraper_name}")
-        result = run_scraper(scraper_class, scraper_name)
-        results.append(result)
-        logger.info(f"Completed scraper: {scraper_name} - Success: {result['success']}, Products: {result['products']}")
+    if args.parallel > 1 and len(scrapers) > 1:
+        # Run retailers side by side
+        max_workers = min(args.parallel, len(scrapers))
+        print(f"⚡ Running {len(scrapers)} scrapers with up to {max_workers} in parallel")
+        logger.info(f"Parallel mode: {max_workers} workers for {len(scrapers)} scrapers")
+        results += run_scrapers_parallel(scrapers, max_workers, logger, scraper_notifier)
+    else:
+        # Run each scraper
+        for scraper_class, scraper_name in scrapers:
+            logger.info(f"Starting scraper: {scraper_name}")
+            result = run_scraper(scraper_class, scraper_name, scraper_notifier)
+            results.append(result)
+            logger.info(f"Completed scraper: {scraper_name} - Success: {result['success']}, Products: {result['products']}")
+    
+    # Flush queued notifications, then compact the journal and close the webhook session
+    if scraper_notifier is not notifier:
+        print(f"\n📲 Flushing {scraper_notifier.get_stats()['queued']} queued notifications...")
+        scraper_notifier.shutdown(timeout=args.notification_flush_timeout)
+        logger.info(f"Notification pipeline stats: {scraper_notifier.get_stats()}")
+        if scraper_notifier.outbox is not None:
+            outbox_stats = scraper_notifier.outbox.get_stats()
+            if outbox_stats['pending'] or outbox_stats['sending']:
+                print(f"📬 {outbox_stats['pending'] + outbox_stats['sending']} notifications left in outbox for the next run")
+            scraper_notifier.outbox.close()
+    notifier.close()
     
     total_end_time = time.time()
     total_duration = total_end_time - total_start_time
@@ -208,7 +391,7 @@ def main():
     failed_scrapers = [r for r in results if not r['success']]
     total_products = sum(r['products'] for r in results)
     
-    print(f"✅ Successful scrapers: {len(successful_scrapers)}/{len(scrapers)}")
+    print(f"✅ Successful scrapers: {len(successful_scrapers)}/{len(results)}")
     print(f"❌ Failed scrapers: {len(failed_scrapers)}")
     print(f"📦 Total high discount products: {total_products}")
     print(f"⏰ Total runtime: {total_duration:.1f}s")
@@ -223,6 +406,49 @@ def main():
         for result in failed_scrapers:
             print(f"   ❌ {result['scraper']}: {result['error'][:100]}...")
     
+    webhook_stats = notifier.scheduler.get_stats()
+    if webhook_stats['sends']:
+        print(f"\n📲 DISCORD WEBHOOK:")
+        print(f"   📤 Messages sent: {webhook_stats['sends']} (429 responses: {webhook_stats['rate_limited']})")
+        print(f"   ⏳ Time throttled: {webhook_stats['throttled_time']:.1f}s (max queue depth: {webhook_stats['max_queue_depth']})")
+        logger.info(f"Webhook stats: {webhook_stats}")
+    
+    from scrapers.rate_limiter import get_rate_limiter
+    rate_limit_stats = get_rate_limiter().get_stats()
+    if rate_limit_stats:
+        print(f"\n⏳ RATE LIMIT WAITS:")
+        for host, stats in rate_limit_stats.items():
+            print(f"   ⏳ {host}: {stats['wait_time']:.1f}s over {stats['waits']}/{stats['requests']} requests")
+        logger.info(f"Rate limit stats: {rate_limit_stats}")
+    
+    from scrapers.http_cache import get_http_cache
+    http_cache = get_http_cache()
+    if http_cache is not None:
+        cache_stats = http_cache.get_stats()
+        print(f"\n♻️  HTTP CACHE:")
+        print(f"   ♻️  Unchanged pages skipped: {cache_stats['not_modified'] + cache_stats['same_body']} "
+              f"(304: {cache_stats['not_modified']}, same body: {cache_stats['same_body']})")
+        print(f"   📄 Changed pages parsed: {cache_stats['changed']}")
+        logger.info(f"HTTP cache stats: {cache_stats}")
+    
+    from scrapers.page_fingerprint import get_page_fingerprints
+    page_fingerprints = get_page_fingerprints()
+    fingerprint_stats = page_fingerprints.get_stats() if page_fingerprints is not None else {}
+    if fingerprint_stats:
+        print(f"\n♻️  PAGE FINGERPRINTS:")
+        for retailer, stats in fingerprint_stats.items():
+            print(f"   ♻️  {retailer}: {stats['hit_rate']:.0%} of pages reused ({stats['hits']}/{stats['hits'] + stats['misses']})")
+        logger.info(f"Page fingerprint stats: {fingerprint_stats}")
+    
+    from scrapers.product_state import get_product_state
+    product_state = get_product_state()
+    change_stats = product_state.get_stats() if product_state is not None else {}
+    if change_stats:
+        print(f"\n🔁 CHANGE DETECTION:")
+        for retailer, stats in change_stats.items():
+            print(f"   🔁 {retailer}: {stats['new']} new, {stats['changed']} repriced, {stats['unchanged']} unchanged (skipped)")
+        logger.info(f"Change detection stats: {change_stats}")
+    
     print(f"\n⏰ Completed at: {datetime.now().strftime('%H:%M:%S on %d/%m/%Y')}")
     
     # Log final summary
@@ -5,14 +5,27 @@ Provides abstract interfaces for extensible scraper implementations.
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import List, Optional, Dict, Any
+from typing import Callable, Iterator, List, Optional, Dict, Any, Tuple
 import logging
 from datetime import datetime
 
+from scrapers.rate_limiter import get_rate_limiter
+from scrapers.http_cache import get_http_cache, NOT_MODIFIED
+from scrapers.notifying import NotifyingMixin
 
-@dataclass
+
+# Discount (in percent) at which a product is worth an alert
+HIGH_DISCOUNT_THRESHOLD = 70.0
+
+
+@dataclass(slots=True)
 class Product:
-    """Data class representing a scraped product."""
+    """
+    Data class representing a scraped product.
+    
+    Slotted (no per-instance ``__dict__``) to keep large catalogs compact;
+    see ``scrapers.product_batch.ProductBatch`` for page-level columnar storage.
+    """
     name: str
     original_price: float
     sale_price: float
@@ -28,11 +41,11 @@ class Product:
     
     @property
     def is_high_discount(self) -> bool:
-        """Check if product has 70% or more discount."""
-        return self.discount_percentage >= 70.0
+        """Check if product has at least the default 70% discount (scrapers may use their own threshold)."""
+        return self.discount_percentage >= HIGH_DISCOUNT_THRESHOLD
 
 
-class BaseScraper(ABC):
+class BaseScraper(NotifyingMixin, ABC):
     """
     Abstract base class for all retailer scrapers.
     
@@ -40,13 +53,38 @@ class BaseScraper(ABC):
     ensuring consistency and making it easy to add new retailers.
     """
     
-    def __init__(self, name: str, base_url: str):
+    def __init__(self, name: str, base_url: str, notifier=None):
         self.name = name
         self.base_url = base_url
         self.logger = logging.getLogger(f"scraper.{name}")
         self.session = None
+        # Shared DiscordNotifier injected by run_scrapers (created lazily if absent)
+        self.notifier = notifier
+        # Shared per-host pacing; unconfigured hosts default to 1 request/second
+        self.rate_limiter = get_rate_limiter()
+        # Opt-in conditional GET cache (HTTP_CACHE=1); None when disabled
+        self.http_cache = get_http_cache()
+        # Opt-in reuse of last run's products for unchanged pages (PAGE_FINGERPRINTS=1)
+        from scrapers.page_fingerprint import get_page_fingerprints
+        self.page_fingerprints = get_page_fingerprints()
+        # Opt-in change detection (CHANGES_ONLY=1): only new or repriced products go downstream
+        from scrapers.product_state import get_product_state
+        self.product_state = get_product_state()
         
     @abstractmethod
+    def iter_products(self) -> Iterator[Product]:
+        """
+        Scrape products from the retailer's sale page, page by page.
+        
+        Products are yielded as each page is parsed, and the page's HTML is
+        released before moving on, so memory stays flat however many pages
+        a sale has.
+        
+        Yields:
+            Product: Scraped products with discount information
+        """
+        pass
+    
     def scrape_products(self) -> List[Product]:
         """
         Scrape products from the retailer's sale page.
@@ -54,7 +92,7 @@ class BaseScraper(ABC):
         Returns:
             List[Product]: List of scraped products with discount information
         """
-        pass
+        return list(self.iter_products())
     
     @abstractmethod
     def parse_product_data(self, product_element) -> Optional[Product]:
@@ -110,12 +148,15 @@ class BaseScraper(ABC):
         """
         Fetch page content with error handling.
         
+        With the HTTP cache enabled the request is conditional, and a page
+        that is unchanged since it was last stored comes back as ``NOT_MODIFIED``.
+        
         Args:
             url: URL to fetch
             **kwargs: Additional arguments for requests
             
         Returns:
-            str: Page content or None if fetch fails
+            str: Page content, ``NOT_MODIFIED``, or None if fetch fails
         """
         if not self.session:
             self.setup_session()
@@ -123,17 +164,57 @@ class BaseScraper(ABC):
         try:
             self.logger.info(f"Fetching page: {url}")
             
-            # Add a small delay to be respectful
-            import time
-            time.sleep(1)
+            # Wait for this host's request budget to be respectful
+            self.rate_limiter.acquire(url)
+            
+            if self.http_cache is not None:
+                kwargs['headers'] = {**kwargs.get('headers', {}), **self.http_cache.conditional_headers(url)}
             
             response = self.session.get(url, timeout=30, **kwargs)
+            if self.http_cache is not None and self.http_cache.is_unchanged(
+                url, response.status_code, response.headers, response.content
+            ):
+                self.logger.info(f"Unchanged since last run: {url}")
+                return NOT_MODIFIED
             response.raise_for_status()
             return response.text
         except Exception as e:
             self.logger.error(f"Failed to fetch {url}: {str(e)}")
             return None
     
+    def parse_page(self, page_key: Any, html_content: str, region: Callable[[str], str],
+                   parse: Callable[[], Tuple[List[Product], int]]) -> Tuple[List[Product], int]:
+        """
+        Parse a page, or reuse last run's products if its cards are unchanged.
+        
+        Args:
+            page_key: Identifies the page within the retailer (e.g. its number)
+            html_content: Raw page HTML
+            region: Returns the product-card markup of a page
+                (see ``scrapers.page_fingerprint.card_region``)
+            parse: Parses the page; returns (high discount products, cards scanned)
+            
+        Returns:
+            tuple: (high discount products, cards scanned)
+        """
+        if self.page_fingerprints is None:
+            return parse()
+        
+        from scrapers.page_fingerprint import page_digest
+        cards = region(html_content)
+        if not cards:
+            return parse()
+        
+        digest = page_digest(cards, getattr(self, 'discount_threshold', None))
+        cached = self.page_fingerprints.lookup(self.name, page_key, digest)
+        if cached is not None:
+            print(f"♻️  Page {page_key}: Cards unchanged since last run, reusing {len(cached[0])} high discount products")
+            return cached
+        
+        products, scanned = parse()
+        self.page_fingerprints.save(self.name, page_key, digest, products, scanned)
+        return products, scanned
+    
     def calculate_discount_percentage(self, original_price: float, sale_price: float) -> float:
         """Calculate discount percentage."""
         if original_price <= 0:
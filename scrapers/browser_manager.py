@@ -0,0 +1,133 @@
+"""
+Browser lifecycle management for Selenium-based scrapers.
+Keeps one warm Chrome driver for a whole scrape instead of launching per page.
+"""
+
+import time
+import logging
+from contextlib import contextmanager
+from typing import Callable, Dict, Any
+
+
+class BrowserManager:
+    """
+    Keeps a single warm WebDriver alive across page loads.
+
+    The driver is launched lazily on first use, recycled after a fixed
+    number of pages (to keep Chrome memory in check on small VPS boxes)
+    and relaunched whenever a page load raises, since a crashed or hung
+    driver is rarely usable afterwards.
+    """
+
+    def __init__(self, driver_factory: Callable[[], Any], max_pages_per_browser: int = 20,
+                 name: str = "browser"):
+        """
+        Args:
+            driver_factory: Callable returning a new, configured WebDriver
+            max_pages_per_browser: Pages to serve before relaunching the driver
+                (0 or None disables recycling)
+            name: Label used in log messages
+        """
+        self.driver_factory = driver_factory
+        self.max_pages_per_browser = max_pages_per_browser
+        self.logger = logging.getLogger(f"browser_manager.{name}")
+
+        self._driver = None
+        self._pages_on_driver = 0
+
+        # Timing statistics
+        self.launches = 0
+        self.launch_time = 0.0
+        self.navigations = 0
+        self.navigation_time = 0.0
+        self.crashes = 0
+
+    def _launch(self) -> Any:
+        """Start a new driver and record how long it took."""
+        start_time = time.time()
+        driver = self.driver_factory()
+        elapsed = time.time() - start_time
+
+        self.launches += 1
+        self.launch_time += elapsed
+        self._pages_on_driver = 0
+        self.logger.info(f"Launched browser #{self.launches} in {elapsed:.1f}s")
+        return driver
+
+    def _quit_driver(self) -> None:
+        """Quit the current driver, ignoring errors from an already dead browser."""
+        if self._driver is not None:
+            try:
+                self._driver.quit()
+            except Exception:
+                pass
+            self._driver = None
+            self._pages_on_driver = 0
+
+    def get_driver(self) -> Any:
+        """
+        Return a warm driver, launching or recycling it as needed.
+
+        Returns:
+            WebDriver instance ready for navigation
+        """
+        if (self._driver is not None and self.max_pages_per_browser
+                and self._pages_on_driver >= self.max_pages_per_browser):
+            self.logger.info(f"Recycling browser after {self._pages_on_driver} pages")
+            self._quit_driver()
+
+        if self._driver is None:
+            self._driver = self._launch()
+
+        return self._driver
+
+    @contextmanager
+    def page(self):
+        """
+        Context manager wrapping a single page load.
+
+        Yields the warm driver and times everything done inside the block as
+        navigation. If the block raises, the driver is discarded so the next
+        page starts on a fresh browser.
+        """
+        driver = self.get_driver()
+        start_time = time.time()
+        try:
+            yield driver
+        except Exception:
+            self.crashes += 1
+            self.logger.warning("Page load failed, discarding browser")
+            self._quit_driver()
+            raise
+        finally:
+            self.navigations += 1
+            self.navigation_time += time.time() - start_time
+            if self._driver is not None:
+                self._pages_on_driver += 1
+
+    def close(self) -> None:
+        """Shut down the managed driver."""
+        self._quit_driver()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get launch and navigation timing statistics.
+
+        Returns:
+            dict: Launch/navigation counts and total seconds spent on each
+        """
+        return {
+            "launches": self.launches,
+            "launch_time": self.launch_time,
+            "avg_launch_time": self.launch_time / self.launches if self.launches else 0.0,
+            "navigations": self.navigations,
+            "navigation_time": self.navigation_time,
+            "avg_navigation_time": self.navigation_time / self.navigations if self.navigations else 0.0,
+            "crashes": self.crashes,
+        }
+
+    def __enter__(self) -> "BrowserManager":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
@@ -0,0 +1,161 @@
+"""
+Persistent cache of resolved Chrome and ChromeDriver paths.
+Avoids re-probing the filesystem and calling ChromeDriverManager on every run.
+"""
+
+import json
+import os
+import re
+import subprocess
+import threading
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional, Dict, Any
+
+
+class ChromePathCache:
+    """
+    Version-keyed cache of the Chrome binary and matching ChromeDriver.
+
+    Resolution happens at most once per process. Across processes the result
+    is kept in a small JSON file: the Chrome entry is trusted while the binary's
+    size and mtime are unchanged, and driver paths are keyed by Chrome version
+    so a browser upgrade triggers a fresh ChromeDriverManager lookup.
+    """
+
+    def __init__(self, storage_file: Optional[str] = None):
+        self.storage_file = Path(storage_file or os.environ.get('CHROME_PATH_CACHE', 'chrome_paths.json'))
+        self.logger = logging.getLogger("chrome_path_cache")
+        self._lock = threading.Lock()
+        self._data: Optional[Dict[str, Any]] = None
+
+        # Per-process results
+        self._chrome_resolved = False
+        self.chrome_path: Optional[str] = None
+        self.chrome_version: Optional[str] = None
+        self.driver_path: Optional[str] = None
+
+    def _load(self) -> Dict[str, Any]:
+        """Load the cache file once per process."""
+        if self._data is None:
+            try:
+                if self.storage_file.exists():
+                    with open(self.storage_file, 'r') as f:
+                        self._data = json.load(f)
+                else:
+                    self._data = {}
+            except Exception as e:
+                self.logger.warning(f"Failed to load Chrome path cache: {str(e)}")
+                self._data = {}
+        return self._data
+
+    def _save(self) -> None:
+        """Write the cache file."""
+        try:
+            self._data['last_updated'] = datetime.now().isoformat()
+            with open(self.storage_file, 'w') as f:
+                json.dump(self._data, f, indent=2)
+        except Exception as e:
+            self.logger.warning(f"Failed to save Chrome path cache: {str(e)}")
+
+    @staticmethod
+    def _binary_signature(path: str) -> Optional[Dict[str, float]]:
+        """Size and mtime of a binary, used to detect upgrades without running it."""
+        try:
+            # Follow symlinks so /usr/bin/google-chrome reflects the real binary
+            stat = os.stat(os.path.realpath(path))
+            return {'size': stat.st_size, 'mtime': stat.st_mtime}
+        except OSError:
+            return None
+
+    def _read_version(self, chrome_path: str) -> Optional[str]:
+        """Ask the Chrome binary for its version string."""
+        try:
+            result = subprocess.run([chrome_path, '--version'], capture_output=True, text=True, timeout=10)
+            match = re.search(r'(\d+(?:\.\d+)+)', result.stdout)
+            if match:
+                return match.group(1)
+        except Exception as e:
+            self.logger.debug(f"Could not read Chrome version from {chrome_path}: {str(e)}")
+        return None
+
+    def get_chrome_binary(self, discover: Callable[[], Optional[str]]) -> Optional[str]:
+        """
+        Return the Chrome binary path, discovering it only on a cache miss.
+
+        Args:
+            discover: Fallback that probes the system and returns a path or None
+
+        Returns:
+            Path to the Chrome binary, or None if none was found
+        """
+        with self._lock:
+            if self._chrome_resolved:
+                return self.chrome_path
+
+            data = self._load()
+            entry = data.get('chrome') or {}
+            cached_path = entry.get('path')
+
+            if cached_path and self._binary_signature(cached_path) == entry.get('signature'):
+                self.logger.info(f"Using cached Chrome at: {cached_path} (version {entry.get('version')})")
+                self.chrome_path = cached_path
+                self.chrome_version = entry.get('version')
+            else:
+                self.chrome_path = discover()
+                self.chrome_version = self._read_version(self.chrome_path) if self.chrome_path else None
+                if self.chrome_path:
+                    data['chrome'] = {
+                        'path': self.chrome_path,
+                        'version': self.chrome_version,
+                        'signature': self._binary_signature(self.chrome_path)
+                    }
+                    self._save()
+
+            self._chrome_resolved = True
+            return self.chrome_path
+
+    def get_driver_path(self, install: Callable[[], str]) -> str:
+        """
+        Return a ChromeDriver path matching the current Chrome version.
+
+        Args:
+            install: Fallback that downloads/locates the driver (e.g. ChromeDriverManager().install)
+
+        Returns:
+            Path to the ChromeDriver binary
+        """
+        with self._lock:
+            if self.driver_path and os.path.exists(self.driver_path):
+                return self.driver_path
+
+            data = self._load()
+            drivers = data.setdefault('drivers', {})
+            version_key = self.chrome_version or 'unknown'
+
+            cached_path = drivers.get(version_key)
+            if cached_path and os.path.exists(cached_path):
+                self.logger.info(f"Using cached ChromeDriver for Chrome {version_key}: {cached_path}")
+                self.driver_path = cached_path
+                return cached_path
+
+            self.driver_path = install()
+            # Only the current version's driver is worth keeping
+            data['drivers'] = {version_key: self.driver_path}
+            self._save()
+            self.logger.info(f"Resolved ChromeDriver for Chrome {version_key}: {self.driver_path}")
+            return self.driver_path
+
+
+_shared_cache: Optional[ChromePathCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_chrome_path_cache() -> ChromePathCache:
+    """Return the process-wide ChromePathCache."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ChromePathCache()
+        return _shared_cache
@@ -0,0 +1,116 @@
+"""
+Shared connectivity health cache for the VPS-optimized scrapers.
+Real requests record whether each host answered, so a healthy run needs no
+separate diagnostic probes and an unreachable host fails fast.
+"""
+
+import threading
+import time
+import logging
+from typing import Dict, Any, Optional
+from urllib.parse import urlparse
+
+
+class ConnectivityHealth:
+    """
+    Last known reachability of each host, with a short TTL.
+
+    A host is *reachable* when it returned any HTTP response (even an error
+    status) and *unreachable* when every attempt ended in a timeout or
+    connection error. Results expire after ``healthy_ttl`` / ``unhealthy_ttl``
+    seconds, after which the host is unknown again.
+    """
+
+    def __init__(self, healthy_ttl: float = 300.0, unhealthy_ttl: float = 60.0):
+        """
+        Args:
+            healthy_ttl: Seconds a successful response vouches for a host
+            unhealthy_ttl: Seconds a host that failed stays marked as down
+        """
+        self.healthy_ttl = healthy_ttl
+        self.unhealthy_ttl = unhealthy_ttl
+        self.logger = logging.getLogger("connectivity")
+        self._lock = threading.Lock()
+        # host -> (reachable, checked_at)
+        self._status: Dict[str, tuple] = {}
+
+        # Statistics
+        self.fast_failures = 0
+        self.probes_skipped = 0
+
+    @staticmethod
+    def _host(url_or_host: str) -> str:
+        """Normalise a URL or bare host to a lowercase host name."""
+        if '://' in url_or_host:
+            return urlparse(url_or_host).netloc.lower()
+        return url_or_host.lower()
+
+    def record(self, url_or_host: str, reachable: bool) -> None:
+        """
+        Record the outcome of a request.
+
+        Args:
+            url_or_host: URL that was requested (or its host)
+            reachable: True if the host sent back any response
+        """
+        host = self._host(url_or_host)
+        with self._lock:
+            previous = self._status.get(host)
+            self._status[host] = (reachable, time.monotonic())
+
+        if previous is not None and previous[0] != reachable:
+            self.logger.info(f"{host} is now {'reachable' if reachable else 'unreachable'}")
+
+    def status(self, url_or_host: str) -> Optional[bool]:
+        """
+        Cached reachability of a host.
+
+        Returns:
+            True or False while the last result is fresh, None if unknown or expired
+        """
+        host = self._host(url_or_host)
+        with self._lock:
+            entry = self._status.get(host)
+        if entry is None:
+            return None
+
+        reachable, checked_at = entry
+        ttl = self.healthy_ttl if reachable else self.unhealthy_ttl
+        if time.monotonic() - checked_at > ttl:
+            return None
+        return reachable
+
+    def is_down(self, url_or_host: str) -> bool:
+        """True if the host recently failed; requests to it should fail fast."""
+        down = self.status(url_or_host) is False
+        if down:
+            self.fast_failures += 1
+        return down
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get health statistics.
+
+        Returns:
+            dict: Current status per host, fast failures and probes skipped
+        """
+        with self._lock:
+            hosts = list(self._status)
+        return {
+            'hosts': {host: self.status(host) for host in hosts},
+            'fast_failures': self.fast_failures,
+            'probes_skipped': self.probes_skipped,
+        }
+
+
+_shared_health: Optional[ConnectivityHealth] = None
+_shared_health_lock = threading.Lock()
+
+
+def get_connectivity_health() -> ConnectivityHealth:
+    """Return the process-wide ConnectivityHealth."""
+    global _shared_health
+    with _shared_health_lock:
+        if _shared_health is None:
+            _shared_health = ConnectivityHealth()
+        return _shared_health
@@ -2,24 +2,39 @@
 END Clothing scraper implementation.
 """
 
-from typing import List, Optional
+from typing import Iterator, List, Optional
 import re
-from bs4 import BeautifulSoup
 from scrapers.base import BaseScraper, Product
+from scrapers.http_cache import NOT_MODIFIED
+from scrapers.parsing import parse_html, END_CLOTHING_STRAINER
+from scrapers.extraction import get_extraction_engine
+from scrapers.pricing import get_discount_threshold
+from scrapers.product_batch import ProductBatch
+from scrapers.page_fingerprint import card_region
+
+
+DISCOUNT_CLASS = "styles__DiscountSC-sc-d3b68a1e-7"
+CARD_START_PATTERN = re.compile(r'<a\b[^>]*\bdata-test-id=["\']ProductCard__ProductCardSC["\']', re.I)
 
 
 class EndClothingScraper(BaseScraper):
     """Scraper for END Clothing men's sale page."""
     
-    def __init__(self):
+    def __init__(self, notifier=None):
         super().__init__(
             name="END Clothing",
-            base_url="https://www.endclothing.com/gb/sale"
+            base_url="https://www.endclothing.com/gb/sale",
+            notifier=notifier
         )
+        # "lxml" (compiled XPath) or "bs4"; see scrapers.extraction
+        self.extraction_engine = get_extraction_engine("end")
+        self.discount_threshold = get_discount_threshold("end")
+        # One page every 3 seconds
+        self.rate_limiter.configure(self.base_url, rate=1 / 3)
     
-    def scrape_products(self) -> List[Product]:
-        """Scrape products from END Clothing sale page."""
-        products = []
+    def iter_products(self) -> Iterator[Product]:
+        """Scrape products from END Clothing sale page, yielding them page by page."""
+        products_found = 0
         total_products_scanned = 0
         pages_navigated = 0
         
@@ -41,18 +56,36 @@ class EndClothingScraper(BaseScraper):
                 
                 # Get page content
                 html_content = self.get_page(url)
+                if html_content is NOT_MODIFIED:
+                    # Same page as last run: its products were already handled
+                    page_total_scanned = self.http_cache.summary(url).get('scanned', 0)
+                    print(f"♻️  Page {page}: Unchanged since last run, skipping parse")
+                    if page_total_scanned == 0:
+                        break
+                    page += 1
+                    continue
                 if not html_content:
                     print(f"❌ Page {page}: Failed to load")
                     break
                 
-                # Parse products from HTML
-                page_products, page_total_scanned = self._parse_products_from_html(html_content, page)
-                products.extend(page_products)
+                # Parse products from HTML (or reuse last run's if the cards are unchanged)
+                page_products, page_total_scanned = self.parse_page(
+                    page, html_content, _card_region,
+                    lambda: self._parse_products_from_html(html_content, page)
+                )
+                # Release the page before handing products downstream
+                del html_content
+                # Only new or repriced products go downstream in change-detection mode
+                page_products = self.changed_products(page_products)
+                products_found += len(page_products)
                 total_products_scanned += page_total_scanned
                 
-                # Send notifications for high discount products
-                for product in page_products:
-                    self._send_notification(product)
+                # Send the page's notifications in one call, then hand its products downstream
+                notified = self._send_notifications(page_products)
+                yield from page_products
+                # Only skip this page next run once its alerts are out
+                if notified:
+                    self.remember_page(url, scanned=page_total_scanned)
                 
                 print(f"✅ Page {page}: Found {len(page_products)} high discount products (scanned {page_total_scanned} total products)")
                 
@@ -63,133 +96,126 @@ class EndClothingScraper(BaseScraper):
                 
                 # Move to next page
                 page += 1
-                
-                # Add delay between pages
-                import time
-                time.sleep(2)
             
             
             print(f"✅ END Clothing: Navigation Summary")
             print(f"   📄 Pages navigated: {pages_navigated}")
             print(f"   📦 Total products scanned: {total_products_scanned}")
-            print(f"   🔥 High discount products found: {len(products)}")
-            print(f"   📊 Success rate: {(len(products)/total_products_scanned*100):.1f}%" if total_products_scanned > 0 else "   📊 Success rate: 0%")
-            
-            return products
+            print(f"   🔥 High discount products found: {products_found}")
+            print(f"   📊 Success rate: {(products_found/total_products_scanned*100):.1f}%" if total_products_scanned > 0 else "   📊 Success rate: 0%")
             
         except Exception as e:
             self.logger.error(f"Error scraping END Clothing: {str(e)}")
-            return products
     
     def _parse_products_from_html(self, html_content: str, page_number: int) -> tuple[List[Product], int]:
         """Parse products from HTML content."""
-        products = []
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Find all product containers using the specific selector
-        product_containers = soup.find_all("a", {"data-test-id": "ProductCard__ProductCardSC"})
+        if self.extraction_engine == 'lxml':
+            # One XPath pass pulls every card's fields
+            cards = _get_card_extractor().extract(html_content)
+        else:
+            # Only build the product card anchors
+            soup = parse_html(html_content, END_CLOTHING_STRAINER)
+            
+            # Find all product containers using the specific selector
+            cards = soup.find_all("a", {"data-test-id": "ProductCard__ProductCardSC"})
         
-        print(f"📦 Page {page_number}: Found {len(product_containers)} product containers")
+        print(f"📦 Page {page_number}: Found {len(cards)} product containers")
         
-        for product_element in product_containers:
+        # Collect the page into columns; the threshold is applied to all rows at once
+        batch = ProductBatch(self.name)
+        for card in cards:
             try:
-                product = self.parse_product_data(product_element)
-                if product:
-                    products.append(product)
-                    print(f"   💰 Found: {product.name[:50]}... - {product.discount_percentage:.0f}% off (£{product.original_price:.0f} → £{product.sale_price:.0f})")
+                if self.extraction_engine == 'lxml':
+                    self._add_to_batch(batch, card)
                 else:
-                    # Only log high discounts, skip verbose logging for low discounts
-                    pass
+                    self._add_to_batch(batch, self._fields_from_element(card))
                     
             except Exception as e:
                 continue
         
-        return products, len(product_containers)
+        # Only log high discounts, skip verbose logging for low discounts
+        products = batch.high_discount_products(self.discount_threshold)
+        for product in products:
+            print(f"   💰 Found: {product.name[:50]}... - {product.discount_percentage:.0f}% off (£{product.original_price:.0f} → £{product.sale_price:.0f})")
+        
+        return products, len(cards)
     
-    def _send_notification(self, product: Product) -> None:
-        """Send Discord notification for a high discount product."""
+    def parse_product_data(self, product_element) -> Optional[Product]:
+        """Parse individual product data from HTML element."""
         try:
-            import os
-            from notifications.discord_notifier import DiscordNotifier
-            
-            webhook_url = os.environ.get('DISCORD_WEBHOOK_URL')
-            if not webhook_url:
-                print(f"⚠️  No webhook URL set, skipping notification")
-                return
-                
-            # Initialize notifier with idempotency enabled
-            notifier = DiscordNotifier(webhook_url, enable_idempotency=True)
-            
-            # Send notification (will automatically check for duplicates)
-            success = notifier.send_high_discount_alerts([product])
-            
-            if success:
-                print(f"📲 Notification sent: {product.name[:50]}... ({product.discount_percentage:.0f}% off)")
-            else:
-                print(f"❌ Failed to send notification for {product.name[:50]}...")
+            batch = ProductBatch(self.name)
+            self._add_to_batch(batch, self._fields_from_element(product_element))
+            products = batch.high_discount_products(self.discount_threshold)
+            return products[0] if products else None
             
         except Exception as e:
-            print(f"❌ Failed to send notification: {str(e)}")
+            self.logger.debug(f"Failed to parse product: {str(e)}")
+            return None
     
-    def parse_product_data(self, product_element) -> Optional[Product]:
-        """Parse individual product data from HTML element."""
+    @staticmethod
+    def _fields_from_element(product_element) -> dict:
+        """Read the raw card fields from a BeautifulSoup product card."""
+        discount_elem = product_element.find("span", {"class": DISCOUNT_CLASS})
+        img_elem = product_element.find('img')
+        
+        return {
+            'url': product_element.get("href"),
+            'discount_text': discount_elem.get_text(strip=True) if discount_elem else None,
+            'span_texts': [span.get_text(strip=True) for span in product_element.find_all('span')],
+            'text': product_element.get_text(),
+            'image_url': (img_elem.get('src') or img_elem.get('data-src')) if img_elem else None,
+        }
+    
+    def _add_to_batch(self, batch: ProductBatch, fields: dict) -> bool:
+        """
+        Append a product card to a batch from its raw fields.
+        
+        Both extraction engines produce the same fields (``url``,
+        ``discount_text``, ``span_texts``, ``text``, ``image_url``), so they
+        share this logic and yield identical products. The discount comes from
+        the card's "% off" label; the threshold is applied later over the batch.
+        
+        Returns:
+            bool: True if the card had a name, a discount label and valid prices
+        """
         try:
             # Extract product URL
-            product_url = product_element.get("href")
+            product_url = fields['url']
             if not product_url:
-                return None
+                return False
             
             if not product_url.startswith('http'):
                 product_url = 'https://www.endclothing.com' + product_url
             
             # Extract discount information using the specific selector
-            discount_elem = product_element.find("span", {"class": "styles__DiscountSC-sc-d3b68a1e-7"})
-            if not discount_elem:
-                return None
-            
-            discount_text = discount_elem.get_text(strip=True)
+            discount_text = fields['discount_text']
             if not discount_text:
-                return None
+                return False
             
             # Extract discount percentage from text (e.g., "40% off")
             discount_match = re.search(r'(\d+)% off', discount_text)
             if not discount_match:
-                return None
+                return False
             
             discount_percentage = float(discount_match.group(1))
             
-            # Only include products with ≥70% discount
-            if discount_percentage < 70.0:
-                return None
-            
             # Extract product name - look for the main product name span
-            # Based on the HTML structure, the product name appears to be in a span
-            name_elem = None
-            
-            # Try to find the product name span (usually the second span with substantial text)
-            spans = product_element.find_all('span')
-            for span in spans:
-                text = span.get_text(strip=True)
+            # (usually the second span with substantial text)
+            product_name = None
+            for text in fields['span_texts']:
                 # Look for spans that contain product names (longer text, not just labels)
                 if text and len(text) > 10 and len(text) < 100 and not text.endswith('% off') and not text.startswith('£'):
-                    name_elem = span
+                    product_name = text
                     break
             
-            if not name_elem:
-                return None
-            
-            product_name = name_elem.get_text(strip=True)
             if not product_name:
-                return None
-            
-            # Extract prices - look for price elements
-            price_elements = product_element.find_all(['span', 'div'], class_=re.compile(r'price'))
+                return False
             
             original_price = 0.0
             sale_price = 0.0
             
             # Look for price patterns in text
-            price_text = product_element.get_text()
+            price_text = fields['text']
             
             # Pattern 1: £199£11940% off (original price, sale price, discount)
             price_pattern = r'£(\d+)£(\d+)(\d+)% off'
@@ -209,28 +235,63 @@ class EndClothingScraper(BaseScraper):
             
             # Skip if we couldn't extract valid prices
             if original_price <= 0 or sale_price <= 0 or original_price <= sale_price:
-                return None
+                return False
             
             # Extract image
-            img_elem = product_element.find('img')
-            image_url = None
-            if img_elem:
-                image_url = img_elem.get('src') or img_elem.get('data-src')
-                if image_url and not image_url.startswith('http'):
-                    image_url = 'https://www.endclothing.com' + image_url
-            
-            product = Product(
+            image_url = fields['image_url']
+            if image_url and not image_url.startswith('http'):
+                image_url = 'https://www.endclothing.com' + image_url
+            
+            batch.append(
                 name=product_name,
                 original_price=original_price,
                 sale_price=sale_price,
-                discount_percentage=discount_percentage,
                 url=product_url,
                 image_url=image_url,
-                retailer=self.name
+                discount_percentage=discount_percentage
             )
-            
-            return product
+            return True
             
         except Exception as e:
             self.logger.debug(f"Failed to parse product: {str(e)}")
-            return None
+            return False
+
+
+_card_extractor = None
+
+
+def _get_card_extractor():
+    """Build the compiled XPath extractor for END product cards on first use."""
+    global _card_extractor
+    if _card_extractor is None:
+        from scrapers.extraction import XPathCardExtractor, element_text, has_class, first
+        from lxml import etree
+        
+        discount_xpath = etree.XPath(f".//span[{has_class(DISCOUNT_CLASS)}]")
+        span_xpath = etree.XPath(".//span")
+        img_xpath = etree.XPath(".//img")
+        
+        def discount_text(card):
+            span = first(discount_xpath(card))
+            return element_text(span, strip=True) if span is not None else None
+        
+        def image_url(card):
+            img = first(img_xpath(card))
+            return (img.get('src') or img.get('data-src')) if img is not None else None
+        
+        _card_extractor = XPathCardExtractor(
+            '//a[@data-test-id="ProductCard__ProductCardSC"]',
+            {
+                'url': lambda card: card.get('href'),
+                'discount_text': discount_text,
+                'span_texts': lambda card: [element_text(span, strip=True) for span in span_xpath(card)],
+                'text': element_text,
+                'image_url': image_url,
+            }
+        )
+    return _card_extractor
+
+
+def _card_region(html_content: str) -> str:
+    """Markup of the product cards, for page fingerprinting."""
+    return card_region(html_content, CARD_START_PATTERN, 'a')
@@ -0,0 +1,135 @@
+"""
+Selector-driven product card extraction built on compiled lxml XPath.
+A faster alternative to walking BeautifulSoup trees card by card.
+"""
+
+import os
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # lxml is optional; scrapers fall back to BeautifulSoup
+    lxml = None
+    etree = None
+
+
+# bs4's get_text() leaves out the contents of these tags
+NON_TEXT_TAGS = {'script', 'style', 'template'}
+
+FieldSpec = Union[str, Callable[[Any], Any]]
+
+
+def lxml_available() -> bool:
+    """Check whether the optional lxml dependency is installed."""
+    return etree is not None
+
+
+def get_extraction_engine(retailer_key: str) -> str:
+    """
+    Pick the card extraction engine for a retailer.
+
+    ``EXTRACTION_ENGINE_<RETAILER>`` (e.g. ``EXTRACTION_ENGINE_END``) wins over
+    ``EXTRACTION_ENGINE``; both accept ``lxml`` or ``bs4``. The default is
+    ``lxml`` when it is installed.
+
+    Args:
+        retailer_key: Short retailer key, e.g. "end" or "harrods"
+
+    Returns:
+        str: "lxml" or "bs4"
+    """
+    engine = os.environ.get(f'EXTRACTION_ENGINE_{retailer_key.upper()}') or os.environ.get('EXTRACTION_ENGINE')
+    engine = (engine or 'lxml').lower()
+    if engine == 'lxml' and not lxml_available():
+        return 'bs4'
+    return 'lxml' if engine == 'lxml' else 'bs4'
+
+
+def _iter_strings(element) -> Iterator[str]:
+    """Yield text nodes under an element the way bs4 does (no comments or script bodies)."""
+    if element.text and element.tag not in NON_TEXT_TAGS:
+        yield element.text
+    for child in element:
+        # Comments and processing instructions have a non-string tag
+        if isinstance(child.tag, str):
+            yield from _iter_strings(child)
+        if child.tail:
+            yield child.tail
+
+
+def element_text(element, separator: str = '', strip: bool = False) -> str:
+    """
+    lxml equivalent of BeautifulSoup's ``Tag.get_text``.
+
+    Args:
+        element: lxml element
+        separator: String placed between text nodes
+        strip: Strip each text node and drop empty ones
+
+    Returns:
+        str: Text content of the element
+    """
+    strings = _iter_strings(element)
+    if strip:
+        strings = (text.strip() for text in strings)
+        strings = (text for text in strings if text)
+    return separator.join(strings)
+
+
+def has_class(class_name: str) -> str:
+    """XPath predicate matching one class token, like bs4's ``class_=`` lookup."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+
+class XPathCardExtractor:
+    """
+    Pulls every field of every product card in a single pass over the page.
+
+    The card selector and each field selector are compiled once. A field is
+    either an XPath expression (evaluated relative to the card) or a callable
+    that receives the card element, for values that need post-processing.
+    """
+
+    def __init__(self, card_xpath: str, fields: Dict[str, FieldSpec]):
+        """
+        Args:
+            card_xpath: XPath selecting the card elements
+            fields: Field name -> XPath string or callable(card)
+        """
+        if etree is None:
+            raise RuntimeError("lxml is not installed - XPath extraction is unavailable")
+
+        self.card_xpath = etree.XPath(card_xpath)
+        self.fields = {
+            name: etree.XPath(spec) if isinstance(spec, str) else spec
+            for name, spec in fields.items()
+        }
+
+    @staticmethod
+    def parse(html_content: str):
+        """Parse a page into an lxml tree."""
+        return lxml.html.fromstring(html_content)
+
+    def extract(self, html_content: Optional[str] = None, tree=None) -> List[Dict[str, Any]]:
+        """
+        Extract field dicts for every card on a page.
+
+        Args:
+            html_content: Raw page HTML (ignored if ``tree`` is given)
+            tree: Already parsed lxml tree, to share one parse across extractors
+
+        Returns:
+            List of dicts, one per card, in document order
+        """
+        if tree is None:
+            tree = self.parse(html_content)
+        return [
+            {name: selector(card) for name, selector in self.fields.items()}
+            for card in self.card_xpath(tree)
+        ]
+
+
+def first(results: List[Any]) -> Optional[Any]:
+    """First XPath result or None."""
+    return results[0] if results else None
@@ -2,23 +2,27 @@
 VPS-optimized Flannels scraper with enhanced network handling.
 """
 
+import asyncio
 import json
+import os
 import re
 import time
 import logging
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, Iterator, List, Optional, Dict, Any
 from datetime import datetime
 
 from scrapers.vps_optimized_base import VPSOptimizedBaseScraper
 from scrapers.base import Product
-from notifications.discord_notifier import DiscordNotifier
+from scrapers.http_cache import NOT_MODIFIED
+from scrapers.pricing import get_discount_threshold
+from scrapers.product_batch import ProductBatch
 
 
 class FlannelsVPSScraper(VPSOptimizedBaseScraper):
     """VPS-optimized Flannels scraper with robust network handling."""
     
-    def __init__(self):
-        super().__init__("Flannels VPS")
+    def __init__(self, notifier=None):
+        super().__init__("Flannels VPS", notifier=notifier)
         
         # Flannels API endpoints
         self.base_url = "https://www.flannels.com/product/getforcategory"
@@ -39,42 +43,43 @@ class FlannelsVPSScraper(VPSOptimizedBaseScraper):
             "searchCategory": ""
         }
         
-        # Initialize Discord notifier
-        webhook_url = "https://discord.com/api/webhooks/1417784756954730596/oVMLzhto-F-0cEDNcvQ6e9NrapVyzQFVFpsxOR_4o8UytTkgAS0wxN8U8ivt6hYk1ppw"
-        self.discord_notifier = DiscordNotifier(webhook_url, enable_idempotency=True)
-        
         # VPS-specific settings
         self.max_pages = None  # No limit - scrape everything
-        self.page_delay = 3  # Delay between pages
+        self.page_delay = 3  # Minimum seconds between requests to Flannels
         self.retry_delay = 5  # Delay between retries
-    
-    def scrape_products(self) -> List[Product]:
-        """Scrape products with VPS-optimized error handling."""
-        products = []
-        total_products_scanned = 0
-        pages_navigated = 0
+        self.rate_limiter.configure(self.base_url, rate=1 / self.page_delay)
+        self.discount_threshold = get_discount_threshold("flannel")
         
-        print("🔍 Flannels VPS: Starting scraping...")
-        self.logger.info("Starting Flannels VPS scraping")
+        # Use the aiohttp engine when requested and installed
+        self.use_async = os.environ.get('SCRAPER_ASYNC', '').lower() in ('1', 'true', 'yes') and self.async_available()
         
-        # Test connectivity first
-        test_urls = [
+        self.test_urls = [
             "https://www.flannels.com",
             "https://www.google.com",
             "https://httpbin.org/get"
         ]
+    
+    def _build_page_url(self, page: int) -> str:
+        """Build the product API URL for a page."""
+        params = self.base_params.copy()
+        params["page"] = str(page)
+        return f"{self.base_url}?{'&'.join([f'{k}={v}' for k, v in params.items()])}"
+    
+    def iter_products(self) -> Iterator[Product]:
+        """Scrape products with VPS-optimized error handling, yielding them page by page."""
+        if self.use_async:
+            yield from self._iter_products_on_event_loop()
+            return
         
-        connectivity_results = self.test_connectivity(test_urls)
-        working_urls = [url for url, status in connectivity_results.items() if status]
-        
-        if not working_urls:
-            self.logger.error("❌ No connectivity to any test URLs - check VPS network settings")
-            print("❌ Network connectivity issues detected")
-            return products
+        products_found = 0
+        total_products_scanned = 0
+        pages_navigated = 0
         
-        self.logger.info(f"✅ Connectivity test passed: {len(working_urls)}/{len(test_urls)} URLs accessible")
-        print(f"✅ Network connectivity: {len(working_urls)}/{len(test_urls)} URLs accessible")
+        print("🔍 Flannels VPS: Starting scraping...")
+        self.logger.info("Starting Flannels VPS scraping")
         
+        # No up-front probe: the first page request doubles as the connectivity
+        # check, and test_urls are only tried to diagnose a failure
         try:
             page = 1
             
@@ -83,35 +88,48 @@ class FlannelsVPSScraper(VPSOptimizedBaseScraper):
                 pages_navigated += 1
                 
                 # Build URL with parameters
-                params = self.base_params.copy()
-                params["page"] = str(page)
-                
-                # Make request with enhanced error handling
-                url = f"{self.base_url}?{'&'.join([f'{k}={v}' for k, v in params.items()])}"
+                url = self._build_page_url(page)
                 
                 self.logger.info(f"Fetching page {page}: {url}")
                 
                 # Get JSON data with retry logic
                 json_data = self.get_json(url)
                 
-                if not json_data:
+                if not json_data and self.health.status(url) is not False:
                     self.logger.warning(f"Failed to get data for page {page}, retrying...")
                     time.sleep(self.retry_delay)
                     
                     # Try one more time
                     json_data = self.get_json(url)
-                    if not json_data:
-                        self.logger.error(f"Failed to get data for page {page} after retry, stopping")
+                
+                if not json_data:
+                    self.logger.error(f"Failed to get data for page {page} after retry, stopping")
+                    self._report_connectivity(self.test_connectivity(self.test_urls))
+                    break
+                
+                if json_data is NOT_MODIFIED:
+                    # Same page as last run: its products were already handled
+                    print(f"♻️  Page {page}: Unchanged since last run, skipping parse")
+                    if not self.http_cache.summary(url).get('scanned'):
                         break
+                    page += 1
+                    continue
                 
                 # Parse products from JSON
                 page_products, page_total_scanned = self._parse_products_from_json(json_data, page)
-                products.extend(page_products)
+                # Release the response before handing products downstream
+                del json_data
+                # Only new or repriced products go downstream in change-detection mode
+                page_products = self.changed_products(page_products)
+                products_found += len(page_products)
                 total_products_scanned += page_total_scanned
                 
-                # Send notifications for high discount products
-                for product in page_products:
-                    self._send_notification(product)
+                # Send the page's notifications in one call, then hand its products downstream
+                notified = self._send_notifications(page_products)
+                yield from page_products
+                # Only skip this page next run once its alerts are out
+                if notified:
+                    self.remember_page(url, scanned=page_total_scanned)
                 
                 print(f"✅ Page {page}: Found {len(page_products)} high discount products (scanned {page_total_scanned} total products)")
                 
@@ -120,25 +138,146 @@ class FlannelsVPSScraper(VPSOptimizedBaseScraper):
                     print(f"📄 Page {page}: No products found, stopping")
                     break
                 
-                # VPS-optimized delay between pages
-                print(f"⏳ Waiting {self.page_delay}s before next page...")
-                time.sleep(self.page_delay)
-                
                 page += 1
             
             # Print summary
             print(f"✅ Flannels VPS: Navigation Summary")
             print(f"   📄 Pages navigated: {pages_navigated}")
             print(f"   📦 Total products scanned: {total_products_scanned}")
-            print(f"   🔥 High discount products found: {len(products)}")
-            print(f"   📊 Success rate: {(len(products)/total_products_scanned*100):.1f}%" if total_products_scanned > 0 else "   📊 Success rate: 0%")
-            
-            return products
+            print(f"   🔥 High discount products found: {products_found}")
+            print(f"   📊 Success rate: {(products_found/total_products_scanned*100):.1f}%" if total_products_scanned > 0 else "   📊 Success rate: 0%")
             
         except Exception as e:
             self.logger.error(f"Error scraping Flannels VPS: {str(e)}")
             print(f"❌ Error: {str(e)}")
-            return products
+    
+    def _iter_products_on_event_loop(self) -> Iterator[Product]:
+        """
+        Stream the async scrape to synchronous callers.
+        
+        The async generator is driven one product at a time on a private
+        event loop, and the aiohttp session is always closed at the end.
+        """
+        loop = asyncio.new_event_loop()
+        products = self.aiter_products()
+        try:
+            while True:
+                try:
+                    product = loop.run_until_complete(products.__anext__())
+                except StopAsyncIteration:
+                    break
+                yield product
+        finally:
+            loop.run_until_complete(products.aclose())
+            loop.run_until_complete(self.close_async())
+            loop.close()
+    
+    async def _fetch_page_json_async(self, page: int) -> Optional[Dict[Any, Any]]:
+        """Fetch one page of the product API, retrying once after ``retry_delay``."""
+        url = self._build_page_url(page)
+        self.logger.info(f"Fetching page {page}: {url}")
+        
+        json_data = await self.get_json_async(url)
+        if not json_data and self.health.status(url) is not False:
+            self.logger.warning(f"Failed to get data for page {page}, retrying...")
+            await asyncio.sleep(self.retry_delay)
+            json_data = await self.get_json_async(url)
+        return json_data
+    
+    async def scrape_products_async(self) -> List[Product]:
+        """Scrape all products on the aiohttp engine."""
+        return [product async for product in self.aiter_products()]
+    
+    async def aiter_products(self) -> AsyncIterator[Product]:
+        """
+        Scrape products on the aiohttp engine, yielding them page by page.
+        
+        Pages are requested in windows of ``max_concurrency`` at a time and
+        processed in page order, so results and notifications match the
+        sequential path. The run stops at the first failed or empty page.
+        """
+        products_found = 0
+        total_products_scanned = 0
+        pages_navigated = 0
+        
+        print("🔍 Flannels VPS: Starting async scraping...")
+        self.logger.info("Starting Flannels VPS async scraping")
+        
+        # The first window of page requests doubles as the connectivity check
+        try:
+            page = 1
+            finished = False
+            
+            while not finished:
+                window = list(range(page, page + self.max_concurrency))
+                print(f"🔍 Flannels VPS Pages {window[0]}-{window[-1]}: Scraping...")
+                
+                results = await asyncio.gather(*(self._fetch_page_json_async(p) for p in window))
+                
+                # Process in page order, releasing each response once parsed
+                for index, window_page in enumerate(window):
+                    json_data, results[index] = results[index], None
+                    pages_navigated += 1
+                    
+                    if not json_data:
+                        self.logger.error(f"Failed to get data for page {window_page} after retry, stopping")
+                        self._report_connectivity(await self.test_connectivity_async(self.test_urls))
+                        finished = True
+                        break
+                    
+                    url = self._build_page_url(window_page)
+                    if json_data is NOT_MODIFIED:
+                        # Same page as last run: its products were already handled
+                        print(f"♻️  Page {window_page}: Unchanged since last run, skipping parse")
+                        if not self.http_cache.summary(url).get('scanned'):
+                            finished = True
+                            break
+                        continue
+                    
+                    page_products, page_total_scanned = self._parse_products_from_json(json_data, window_page)
+                    del json_data
+                    # Only new or repriced products go downstream in change-detection mode
+                    page_products = self.changed_products(page_products)
+                    products_found += len(page_products)
+                    total_products_scanned += page_total_scanned
+                    
+                    # Send the page's notifications in one call, then hand its products downstream
+                    notified = self._send_notifications(page_products)
+                    for product in page_products:
+                        yield product
+                    # Only skip this page next run once its alerts are out
+                    if notified:
+                        self.remember_page(url, scanned=page_total_scanned)
+                    
+                    print(f"✅ Page {window_page}: Found {len(page_products)} high discount products (scanned {page_total_scanned} total products)")
+                    
+                    if page_total_scanned == 0:
+                        print(f"📄 Page {window_page}: No products found, stopping")
+                        finished = True
+                        break
+                
+                page += len(window)
+            
+            # Print summary
+            print(f"✅ Flannels VPS: Navigation Summary")
+            print(f"   📄 Pages navigated: {pages_navigated}")
+            print(f"   📦 Total products scanned: {total_products_scanned}")
+            print(f"   🔥 High discount products found: {products_found}")
+            
+        except Exception as e:
+            self.logger.error(f"Error scraping Flannels VPS (async): {str(e)}")
+            print(f"❌ Error: {str(e)}")
+    
+    def _report_connectivity(self, connectivity_results: Dict[str, bool]) -> None:
+        """Print the outcome of the diagnostic probes run after a failed page."""
+        working_urls = [url for url, status in connectivity_results.items() if status]
+        
+        if not working_urls:
+            self.logger.error("❌ No connectivity to any test URLs - check VPS network settings")
+            print("❌ Network connectivity issues detected")
+        else:
+            self.logger.info(f"Connectivity check: {len(working_urls)}/{len(connectivity_results)} URLs accessible")
+            print(f"✅ Network connectivity: {len(working_urls)}/{len(connectivity_results)} URLs accessible")
     
     def _parse_products_from_json(self, json_data: Dict[Any, Any], page_number: int) -> tuple[List[Product], int]:
         """Parse products from JSON response with VPS-optimized error handling."""
@@ -161,6 +300,8 @@ class FlannelsVPSScraper(VPSOptimizedBaseScraper):
                 self.logger.debug(f"First product keys: {list(first_product.keys()) if isinstance(first_product, dict) else 'Not a dict'}")
                 self.logger.debug(f"First product sample: {str(first_product)[:200]}...")
             
+            # Collect the page into columns, then compute and filter discounts in one pass
+            batch = ProductBatch("Flannels", decimals=None)
             for i, product_data in enumerate(product_list):
                 try:
                     # Skip if product_data is not a dict
@@ -168,15 +309,16 @@ class FlannelsVPSScraper(VPSOptimizedBaseScraper):
                         self.logger.warning(f"Product {i} is not a dict: {type(product_data)}")
                         continue
                         
-                    product = self._parse_single_product(product_data)
-                    if product:
-                        products.append(product)
-                        print(f"   💰 Found: {product.name[:50]}... - {product.discount_percentage:.0f}% off (£{product.original_price:.0f} → £{product.sale_price:.0f})")
+                    self._add_to_batch(batch, product_data)
                         
                 except Exception as e:
                     self.logger.warning(f"Error parsing product {i} on page {page_number}: {str(e)}")
                     continue
             
+            products = batch.high_discount_products(self.discount_threshold)
+            for product in products:
+                print(f"   💰 Found: {product.name[:50]}... - {product.discount_percentage:.0f}% off (£{product.original_price:.0f} → £{product.sale_price:.0f})")
+            
             return products, total_scanned
             
         except Exception as e:
@@ -186,66 +328,46 @@ class FlannelsVPSScraper(VPSOptimizedBaseScraper):
     def _parse_single_product(self, product_data: Dict[Any, Any]) -> Optional[Product]:
         """Parse a single product with VPS-optimized error handling."""
         try:
-            # Debug: Print the structure of product_data
-            self.logger.debug(f"Product data type: {type(product_data)}")
-            self.logger.debug(f"Product data keys: {list(product_data.keys()) if isinstance(product_data, dict) else 'Not a dict'}")
-            
-            # Handle case where product_data might be a string or different structure
-            if not isinstance(product_data, dict):
-                self.logger.warning(f"Product data is not a dict: {type(product_data)}")
+            batch = ProductBatch("Flannels", decimals=None)
+            if not self._add_to_batch(batch, product_data):
                 return None
-            
-            # Extract product information with safe access
-            name = product_data.get('name', 'Unknown Product')
-            url = f"https://www.flannels.com{product_data.get('url', '')}"
-            
-            # Price information - handle different possible structures
-            price_data = product_data.get('price', {})
-            if isinstance(price_data, dict):
-                original_price = float(price_data.get('value', 0))
-                sale_price = float(price_data.get('salePrice', original_price))
-            else:
-                # If price is not a dict, try to extract from other fields
-                original_price = float(product_data.get('originalPrice', 0))
-                sale_price = float(product_data.get('salePrice', original_price))
-            
-            # Calculate discount percentage
-            if original_price > 0 and sale_price < original_price:
-                discount_percentage = ((original_price - sale_price) / original_price) * 100
-            else:
-                discount_percentage = 0
-            
-            # Debug: Log all discounts found
-            if discount_percentage > 0:
-                self.logger.debug(f"Product: {name[:30]}... - {discount_percentage:.1f}% off (£{original_price:.0f} → £{sale_price:.0f})")
-            
-            # Only return products with high discount (≥70%)
-            if discount_percentage >= 70:
-                return Product(
-                    name=name,
-                    original_price=original_price,
-                    sale_price=sale_price,
-                    discount_percentage=discount_percentage,
-                    url=url,
-                    retailer="Flannels"
-                )
-            
-            return None
+            products = batch.high_discount_products(self.discount_threshold)
+            return products[0] if products else None
             
         except Exception as e:
             self.logger.warning(f"Error parsing single product: {str(e)}")
             return None
     
-    def _send_notification(self, product: Product):
-        """Send notification for a product."""
-        try:
-            success = self.discord_notifier.send_high_discount_alerts([product])
-            if success:
-                print(f"📲 Notification sent: {product.name[:50]}... ({product.discount_percentage:.0f}% off)")
-            else:
-                self.logger.warning(f"Failed to send notification for {product.name}")
-        except Exception as e:
-            self.logger.error(f"Error sending notification for {product.name}: {str(e)}")
+    def _add_to_batch(self, batch: ProductBatch, product_data: Dict[Any, Any]) -> bool:
+        """
+        Append one product's name, URL and prices to a batch.
+        
+        The discount and the threshold filter are applied later over the whole batch.
+        
+        Returns:
+            bool: True if the product was added
+        """
+        # Handle case where product_data might be a string or different structure
+        if not isinstance(product_data, dict):
+            self.logger.warning(f"Product data is not a dict: {type(product_data)}")
+            return False
+        
+        # Extract product information with safe access
+        name = product_data.get('name', 'Unknown Product')
+        url = f"https://www.flannels.com{product_data.get('url', '')}"
+        
+        # Price information - handle different possible structures
+        price_data = product_data.get('price', {})
+        if isinstance(price_data, dict):
+            original_price = float(price_data.get('value', 0))
+            sale_price = float(price_data.get('salePrice', original_price))
+        else:
+            # If price is not a dict, try to extract from other fields
+            original_price = float(product_data.get('originalPrice', 0))
+            sale_price = float(product_data.get('salePrice', original_price))
+        
+        batch.append(name=name, original_price=original_price, sale_price=sale_price, url=url)
+        return True
     
     def get_network_stats(self) -> Dict[str, Any]:
         """Get network statistics for monitoring."""
@@ -255,5 +377,6 @@ class FlannelsVPSScraper(VPSOptimizedBaseScraper):
             "page_delay": self.page_delay,
             "retry_delay": self.retry_delay,
             "user_agents_count": len(self.user_agents),
-            "session_timeout": self.session.timeout
+            "session_timeout": self.session.timeout,
+            "connectivity": self.health.get_stats()
         }
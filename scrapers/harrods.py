@@ -2,25 +2,53 @@
 Harrods scraper implementation using JSON-LD + HTML parsing.
 """
 
-from typing import List, Optional
+from typing import Iterator, List, Optional
 from bs4 import BeautifulSoup
+import html
 import json
+import os
 import re
 from scrapers.base import BaseScraper, Product
+from scrapers.http_cache import NOT_MODIFIED
+from scrapers.parsing import parse_html, HARRODS_STRAINER
+from scrapers.extraction import get_extraction_engine
+from scrapers.pricing import get_discount_threshold
+from scrapers.product_batch import ProductBatch
+
+
+PRICE_PATTERN = re.compile(r'£([\d,]+(?:\.\d{2})?)')
+
+# Fast path: plain string scans over the raw page instead of a DOM
+JSON_LD_SCRIPT_PATTERN = re.compile(
+    r'<script\b[^>]*\btype=["\']application/ld\+json["\'][^>]*>(.*?)</script\s*>', re.S | re.I
+)
+PRODUCT_CARD_PATTERN = re.compile(
+    r'<article\b([^>]*\bdata-test-id=["\']product-item["\'][^>]*)>(.*?)</article\s*>', re.S | re.I
+)
+CARD_ID_PATTERN = re.compile(r'\bdata-product-card-id=["\']([^"\']*)["\']')
+# Markup whose text get_text() never returns
+NON_TEXT_PATTERN = re.compile(r'<!--.*?-->|<(script|style|template)\b.*?</\1\s*>', re.S | re.I)
+TAG_PATTERN = re.compile(r'<(?:[^>"\']|"[^"]*"|\'[^\']*\')*>')
 
 
 class HarrodsScraper(BaseScraper):
     """Scraper for Harrods men's sale page using JSON-LD and HTML parsing."""
     
-    def __init__(self):
+    def __init__(self, notifier=None):
         super().__init__(
             name="Harrods",
-            base_url="https://www.harrods.com/en-gb/sale/men"
+            base_url="https://www.harrods.com/en-gb/sale/men",
+            notifier=notifier
         )
+        # "lxml" (compiled XPath) or "bs4"; see scrapers.extraction
+        self.extraction_engine = get_extraction_engine("harrods")
+        self.discount_threshold = get_discount_threshold("harrods")
+        # Scan JSON-LD and card markup as text, without building a DOM
+        self.use_fast_path = os.environ.get('HARRODS_FAST_PATH', '1').lower() not in ('0', 'false', 'no')
     
-    def scrape_products(self) -> List[Product]:
-        """Scrape products from Harrods sale pages using pagination."""
-        products = []
+    def iter_products(self) -> Iterator[Product]:
+        """Scrape products from Harrods sale pages using pagination, yielding them page by page."""
+        products_found = 0
         
         try:
             page = 1
@@ -34,46 +62,45 @@ class HarrodsScraper(BaseScraper):
                 
                 # Get page content
                 html_content = self.get_page(page_url)
+                if html_content is NOT_MODIFIED:
+                    # Same page as last run: its products were already handled
+                    print(f"♻️  Page {page}: Unchanged since last run, skipping parse")
+                    if not self.http_cache.summary(page_url).get('scanned'):
+                        break
+                    page += 1
+                    continue
                 if not html_content:
                     print(f"❌ Page {page}: No content received")
                     self.logger.warning(f"No content received for page {page}")
                     break
                 
-                soup = BeautifulSoup(html_content, 'html.parser')
+                # Parse the page (or reuse last run's products if the cards are unchanged)
+                page_products, card_count = self.parse_page(
+                    page, html_content, _card_region,
+                    lambda: self._parse_page(html_content, page)
+                )
+                # Release the page before handing products downstream
+                del html_content
+                # Only new or repriced products go downstream in change-detection mode
+                page_products = self.changed_products(page_products)
+                products_found += len(page_products)
                 
-                # Extract JSON-LD data
-                json_ld_data = self._extract_json_ld_data(soup)
-                if not json_ld_data:
-                    print(f"❌ Page {page}: No JSON-LD data found, stopping pagination")
-                    self.logger.info(f"No JSON-LD data found on page {page}, stopping")
+                # Send the page's notifications in one call, then hand its products downstream
+                notified = self._send_notifications(page_products)
+                yield from page_products
+                # Only skip this page next run once its alerts are out
+                if notified:
+                    self.remember_page(page_url, scanned=card_count)
+                if not card_count:
                     break
                 
-                # Extract product elements from HTML
-                product_elements = soup.find_all('article', {'data-test-id': 'product-item'})
-                
-                if not product_elements:
-                    print(f"❌ Page {page}: No product elements found, stopping pagination")
-                    self.logger.info(f"No product elements found on page {page}, stopping")
-                    break
-                
-                print(f"📦 Page {page}: Found {len(product_elements)} total products")
-                self.logger.info(f"Found {len(product_elements)} products on page {page}")
-                
-                # Process each product by combining JSON-LD and HTML data
-                page_products = self._process_page_products(json_ld_data, product_elements)
-                products.extend(page_products)
-                
-                # Send notifications for high discount products
-                for product in page_products:
-                    self._send_notification(product)
-                
                 high_discount_count = len(page_products)
-                print(f"🔥 Page {page}: {high_discount_count} high discount products (≥70% off)")
+                print(f"🔥 Page {page}: {high_discount_count} high discount products (≥{self.discount_threshold:.0f}% off)")
                 self.logger.info(f"Processed {len(page_products)} high discount products from page {page}")
                 
                 # Check if this looks like the last page (fewer products than expected)
-                if len(product_elements) < 50:  # Harrods typically shows 60 per page
-                    print(f"📄 Page {page}: Appears to be last page ({len(product_elements)} products)")
+                if card_count < 50:  # Harrods typically shows 60 per page
+                    print(f"📄 Page {page}: Appears to be last page ({card_count} products)")
                 
                 # Check if we should continue (basic pagination limit)
                 page += 1
@@ -82,39 +109,105 @@ class HarrodsScraper(BaseScraper):
         except Exception as e:
             self.logger.error(f"Error scraping Harrods: {str(e)}")
             
-        self.logger.info(f"Successfully scraped {len(products)} products from Harrods")
-        return products
+        self.logger.info(f"Successfully scraped {products_found} products from Harrods")
     
-    def _send_notification(self, product: Product) -> None:
-        """Send Discord notification for a high discount product."""
-        try:
-            import os
-            from notifications.discord_notifier import DiscordNotifier
-            
-            webhook_url = os.environ.get('DISCORD_WEBHOOK_URL')
-            if not webhook_url:
-                print(f"⚠️  No webhook URL set, skipping notification")
-                return
-                
-            notifier = DiscordNotifier(webhook_url)
-            
-            # Create fancy title
-            title = f"🔥 {self.name} Flash Sale - {product.discount_percentage:.0f}% OFF!"
-            
-            notifier.send_high_discount_alerts([product])
-            print(f"📲 Notification sent: {product.name[:50]}... ({product.discount_percentage:.0f}% off)")
-            
-        except Exception as e:
-            print(f"❌ Failed to send notification: {str(e)}")
+    def _parse_page(self, html_content: str, page: int) -> tuple[List[Product], int]:
+        """
+        Parse one page by combining its JSON-LD and product card data.
+        
+        Returns:
+            tuple: (high discount products, product cards found); no cards means the last page was passed
+        """
+        json_ld_data, product_elements = self._extract_page(html_content)
+        if not json_ld_data:
+            print(f"❌ Page {page}: No JSON-LD data found, stopping pagination")
+            self.logger.info(f"No JSON-LD data found on page {page}, stopping")
+            return [], 0
+        
+        if not product_elements:
+            print(f"❌ Page {page}: No product elements found, stopping pagination")
+            self.logger.info(f"No product elements found on page {page}, stopping")
+            return [], 0
+        
+        card_count = len(product_elements)
+        print(f"📦 Page {page}: Found {card_count} total products")
+        self.logger.info(f"Found {card_count} products on page {page}")
+        
+        # Process each product by combining JSON-LD and HTML data
+        return self._process_page_products(json_ld_data, product_elements), card_count
+    
+    def _extract_page(self, html_content: str) -> tuple[Optional[List[dict]], List]:
+        """
+        Extract the JSON-LD items and product cards of a page.
+        
+        Tries the fast text scan first and falls back to DOM parsing with the
+        configured engine when it finds nothing (e.g. after a markup change).
+        
+        Returns:
+            tuple: (JSON-LD items or None, product cards)
+        """
+        if self.use_fast_path:
+            json_ld_data, product_elements = self._scan_page(html_content)
+            if json_ld_data and product_elements:
+                return json_ld_data, product_elements
+            self.logger.debug("Fast path found no products, falling back to DOM parsing")
+        
+        if self.extraction_engine == 'lxml':
+            # One lxml parse, then compiled XPath for scripts and cards
+            tree = _get_card_extractor().parse(html_content)
+            json_ld_data = self._parse_json_ld_scripts(_json_ld_xpath()(tree))
+            if not json_ld_data:
+                return None, []
+            return json_ld_data, _get_card_extractor().extract(tree=tree)
+        
+        # Only build product cards and JSON-LD scripts
+        soup = parse_html(html_content, HARRODS_STRAINER)
+        json_ld_data = self._extract_json_ld_data(soup)
+        if not json_ld_data:
+            return None, []
+        return json_ld_data, soup.find_all('article', {'data-test-id': 'product-item'})
+    
+    def _scan_page(self, html_content: str) -> tuple[Optional[List[dict]], List[dict]]:
+        """
+        Fast path: find the ItemList and card prices with string scans only.
+        
+        Script bodies are cut straight out of the page and handed to
+        ``json.loads``. Cards are found in one regex pass; only cards with a
+        JSON-LD entry have their markup reduced to text for the price lookup.
+        
+        Returns:
+            tuple: (JSON-LD items or None, card field dicts)
+        """
+        json_ld_data = self._parse_json_ld_scripts(JSON_LD_SCRIPT_PATTERN.findall(html_content))
+        if not json_ld_data:
+            return None, []
+        
+        wanted_ids = {item.get('sku') for item in json_ld_data}
+        cards = []
+        for match in PRODUCT_CARD_PATTERN.finditer(html_content):
+            id_match = CARD_ID_PATTERN.search(match.group(1))
+            product_id = html.unescape(id_match.group(1)) if id_match else None
+            cards.append({
+                'product_id': product_id,
+                'text': _markup_text(match.group(2)) if product_id in wanted_ids else None,
+            })
+        return json_ld_data, cards
     
     def _extract_json_ld_data(self, soup: BeautifulSoup) -> Optional[List[dict]]:
         """Extract product data from JSON-LD script tags."""
         try:
             json_ld_scripts = soup.find_all('script', type='application/ld+json')
-            
-            for script in json_ld_scripts:
+            return self._parse_json_ld_scripts([script.string for script in json_ld_scripts])
+        except Exception as e:
+            self.logger.error(f"Error extracting JSON-LD data: {str(e)}")
+            return None
+    
+    def _parse_json_ld_scripts(self, script_texts: List[str]) -> Optional[List[dict]]:
+        """Find the ItemList among JSON-LD script bodies and return its items."""
+        try:
+            for script_text in script_texts:
                 try:
-                    data = json.loads(script.string)
+                    data = json.loads(script_text)
                     if data.get('@type') == 'ItemList':
                         items = data.get('itemListElement', [])
                         if items:
@@ -129,7 +222,8 @@ class HarrodsScraper(BaseScraper):
     
     def _process_page_products(self, json_ld_items: List[dict], product_elements: List) -> List[Product]:
         """Process products by combining JSON-LD data with HTML elements."""
-        products = []
+        # Collect the page into columns; discounts and the threshold are applied to all rows at once
+        batch = ProductBatch(self.name)
         
         # Create a mapping of product IDs to JSON-LD data
         json_ld_map = {}
@@ -141,7 +235,11 @@ class HarrodsScraper(BaseScraper):
         # Process each HTML product element
         for element in product_elements:
             try:
-                product_id = element.get('data-product-card-id')
+                if isinstance(element, dict):
+                    # Field dict from the XPath extractor or the fast path
+                    product_id = element['product_id']
+                else:
+                    product_id = element.get('data-product-card-id')
                 if not product_id:
                     continue
                 
@@ -151,18 +249,40 @@ class HarrodsScraper(BaseScraper):
                     continue
                 
                 # Parse product using both data sources
-                product = self.parse_product_data(json_data, element)
-                if product:
-                    products.append(product)
+                if isinstance(element, dict):
+                    self._add_to_batch(batch, json_data, card_text=element['text'])
+                else:
+                    self._add_to_batch(batch, json_data, element)
                     
             except Exception as e:
                 self.logger.debug(f"Error processing product element: {str(e)}")
                 continue
         
+        products = batch.high_discount_products(self.discount_threshold)
+        for product in products:
+            self.logger.debug(f"Parsed high discount product: {product.name} ({product.discount_percentage:.1f}% off)")
         return products
     
-    def parse_product_data(self, json_data: dict, html_element) -> Optional[Product]:
-        """Parse product data combining JSON-LD and HTML sources."""
+    def parse_product_data(self, json_data: dict, html_element=None, card_text: Optional[str] = None) -> Optional[Product]:
+        """
+        Parse product data combining JSON-LD and HTML sources.
+        
+        The card is given either as a BeautifulSoup element or, from the lxml
+        engine, as its already extracted text.
+        """
+        batch = ProductBatch(self.name)
+        self._add_to_batch(batch, json_data, html_element, card_text)
+        products = batch.high_discount_products(self.discount_threshold)
+        return products[0] if products else None
+    
+    def _add_to_batch(self, batch: ProductBatch, json_data: dict, html_element=None,
+                      card_text: Optional[str] = None) -> bool:
+        """
+        Append one product to a batch from its JSON-LD entry and card.
+        
+        Returns:
+            bool: True if the product had a name, URL and a reduced price
+        """
         try:
             # Extract basic info from JSON-LD
             name = json_data.get('name', '').strip()
@@ -172,36 +292,32 @@ class HarrodsScraper(BaseScraper):
             # Combine brand and product name
             full_name = f"{brand_name} {name}".strip() if brand_name else name
             if not full_name:
-                return None
+                return False
             
             # Product URL from JSON-LD
             product_url = json_data.get('url', '')
             if not product_url:
-                return None
+                return False
             
             # Sale price from JSON-LD offers
             offers = json_data.get('offers', {})
             if not offers:
-                return None
+                return False
             
             price_spec = offers.get('priceSpecification', {})
             sale_price = price_spec.get('price')
             if not sale_price:
-                return None
+                return False
             
             sale_price = float(sale_price)
             
             # Original price from HTML element text
-            original_price = self._extract_original_price_from_html(html_element, sale_price)
+            if card_text is not None:
+                original_price = self._extract_original_price_from_text(card_text, sale_price)
+            else:
+                original_price = self._extract_original_price_from_html(html_element, sale_price)
             if not original_price or original_price <= sale_price:
-                return None
-            
-            # Calculate discount percentage
-            discount_percentage = self.calculate_discount_percentage(original_price, sale_price)
-            
-            # Only process products with ≥70% discount
-            if discount_percentage < 70.0:
-                return None
+                return False
             
             # Product image from JSON-LD
             image_url = json_data.get('image')
@@ -212,32 +328,35 @@ class HarrodsScraper(BaseScraper):
             if image_url and not image_url.startswith('http'):
                 image_url = 'https://www.harrods.com' + image_url
             
-            product = Product(
+            batch.append(
                 name=full_name,
                 original_price=original_price,
                 sale_price=sale_price,
-                discount_percentage=discount_percentage,
                 url=product_url,
-                image_url=image_url,
-                retailer=self.name
+                image_url=image_url
             )
-            
-            self.logger.debug(f"Parsed high discount product: {full_name} ({discount_percentage:.1f}% off)")
-            return product
+            return True
             
         except Exception as e:
             self.logger.debug(f"Failed to parse product data: {str(e)}")
-            return None
+            return False
     
     def _extract_original_price_from_html(self, html_element, sale_price: float) -> Optional[float]:
         """Extract original price from HTML element text."""
         try:
             # Get all text from the element
             text_content = html_element.get_text(separator=' ', strip=True)
+            return self._extract_original_price_from_text(text_content, sale_price)
             
+        except Exception as e:
+            self.logger.debug(f"Error extracting original price: {str(e)}")
+            return None
+    
+    def _extract_original_price_from_text(self, text_content: str, sale_price: float) -> Optional[float]:
+        """Extract original price from a product card's text."""
+        try:
             # Look for price patterns in the text
-            price_pattern = re.compile(r'£([\d,]+(?:\.\d{2})?)')
-            price_matches = price_pattern.findall(text_content)
+            price_matches = PRICE_PATTERN.findall(text_content)
             
             if not price_matches:
                 return None
@@ -262,3 +381,48 @@ class HarrodsScraper(BaseScraper):
         except Exception as e:
             self.logger.debug(f"Error extracting original price: {str(e)}")
             return None
+
+
+def _markup_text(markup: str) -> str:
+    """Text of a markup fragment, matching bs4's ``get_text(separator=' ', strip=True)``."""
+    markup = NON_TEXT_PATTERN.sub(' ', markup)
+    strings = (html.unescape(text).strip() for text in TAG_PATTERN.split(markup))
+    return ' '.join(text for text in strings if text)
+
+
+_card_extractor = None
+_json_ld = None
+
+
+def _json_ld_xpath():
+    """Compiled XPath returning the text of every JSON-LD script."""
+    global _json_ld
+    if _json_ld is None:
+        from lxml import etree
+        _json_ld = etree.XPath('//script[@type="application/ld+json"]/text()')
+    return _json_ld
+
+
+def _get_card_extractor():
+    """Build the compiled XPath extractor for Harrods product cards on first use."""
+    global _card_extractor
+    if _card_extractor is None:
+        from scrapers.extraction import XPathCardExtractor, element_text
+        
+        _card_extractor = XPathCardExtractor(
+            '//article[@data-test-id="product-item"]',
+            {
+                'product_id': lambda card: card.get('data-product-card-id'),
+                'text': lambda card: element_text(card, separator=' ', strip=True),
+            }
+        )
+    return _card_extractor
+
+
+def _card_region(html_content: str) -> str:
+    """JSON-LD and product card markup, for page fingerprinting."""
+    return ''.join(
+        match.group(0)
+        for pattern in (JSON_LD_SCRIPT_PATTERN, PRODUCT_CARD_PATTERN)
+        for match in pattern.finditer(html_content)
+    )
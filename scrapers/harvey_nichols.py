@@ -2,21 +2,38 @@
 Harvey Nichols scraper implementation using API endpoint.
 """
 
-from typing import List, Optional
+from typing import Iterator, List, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+import contextvars
 import json
-import time
+import os
 from scrapers.base import BaseScraper, Product
+from scrapers.http_cache import HTTPCache, NOT_MODIFIED
+from scrapers.pricing import get_discount_threshold
+from scrapers.product_batch import ProductBatch
 
 
 class HarveyNicholsScraper(BaseScraper):
     """Scraper for Harvey Nichols men's sale page using API."""
     
-    def __init__(self):
+    def __init__(self, notifier=None):
         super().__init__(
             name="Harvey Nichols",
-            base_url="https://www.harveynichols.com/sale/mens/"
+            base_url="https://www.harveynichols.com/sale/mens/",
+            notifier=notifier
         )
         self.api_base_url = "https://integrations.harveynichols.com/hn-fh/api/Product/ProductsPage"
+        
+        # Pages 2..N are fetched concurrently once numberOfPages is known
+        self.max_concurrency = max(1, int(os.environ.get('SCRAPER_CONCURRENCY', '4')))
+        # Be respectful to the API: one request per second on average,
+        # with short bursts allowed for the concurrent fan-out. The burst is
+        # fixed so raising the concurrency does not raise the request rate.
+        self.api_burst = 4
+        self.rate_limiter.configure(self.api_base_url, rate=1.0, burst=self.api_burst)
+        self.discount_threshold = get_discount_threshold("harvey")
     
     def setup_session(self):
         """Setup session with Harvey Nichols specific headers."""
@@ -38,125 +55,233 @@ class HarveyNicholsScraper(BaseScraper):
             'Sec-Fetch-Site': 'same-site',
         })
     
-    def scrape_products(self) -> List[Product]:
-        """Scrape products from Harvey Nichols using API endpoint."""
-        products = []
+    def iter_products(self) -> Iterator[Product]:
+        """
+        Scrape products from Harvey Nichols using API endpoint, yielding them page by page.
+        
+        Page 1 is fetched on its own to learn ``numberOfPages``; the remaining
+        pages are then requested concurrently (up to ``max_concurrency`` at once,
+        still paced by the per-host rate limiter) and processed in page order.
+        """
+        products_found = 0
         
         # Ensure session is set up
         if not hasattr(self, 'session') or self.session is None:
             self.setup_session()
         
         try:
-            page = 1
             self.logger.info("Starting Harvey Nichols API scraping with pagination")
             
-            while True:
-                print(f"🔍 Harvey Nichols Page {page}: API request")
-                self.logger.info(f"Fetching page {page} from Harvey Nichols API")
-                
-                # Build API payload matching the exact browser request
-                payload = {
-                    "region": "uk",
-                    "sort": 0,
-                    "page": page,
-                    "limit": 60,
-                    "keyword": "",
-                    "channel": "Desktop",
-                    "customerDepartment": "Mens",
-                    "customerType": "Public",
-                    "store": "",
-                    "customerTier": None,
-                    "filters": {
-                        "categories": "cp43",
-                        "dynamicCategoryId": "cp1033"
-                    },
-                    "pageType": 2,
-                    "rowSize": 4,
-                    "preview": False
-                }
+            data = self._fetch_page(1)
+            if data is None:
+                return
+            
+            if data is NOT_MODIFIED:
+                # Page 1 is the same as last run; its page count still drives the fan-out
+                total_pages = self._page_summary(1).get('pages', 0)
+                if not total_pages:
+                    return
+            else:
+                page_products = self._process_page(1, data)
+                if page_products is None:
+                    return
                 
-                try:
-                    # Make POST request to API
-                    response = self.session.post(
-                        self.api_base_url,
-                        json=payload,
-                        timeout=30
-                    )
-                    
-                    if response.status_code != 200:
-                        print(f"❌ Page {page}: API returned status {response.status_code}")
-                        self.logger.warning(f"API returned status {response.status_code} for page {page}")
-                        break
+                # Check if we've reached the last page
+                total_pages = data.get('numberOfPages', 0)
+                del data
+                products_found += len(page_products)
+                yield from page_products
+            
+            if total_pages <= 1:
+                print(f"📄 Page 1: Last page reached ({total_pages} total pages)")
+            else:
+                print(f"⚡ Harvey Nichols: Fetching pages 2-{total_pages} with up to {self.max_concurrency} concurrent requests")
+                for product in self._iter_remaining_pages(total_pages):
+                    products_found += 1
+                    yield product
                     
-                    data = response.json()
-                    page_products = data.get('products', [])
+        except Exception as e:
+            self.logger.error(f"Error scraping Harvey Nichols API: {str(e)}")
+            
+        self.logger.info(f"Successfully scraped {products_found} products from Harvey Nichols")
+    
+    def _iter_remaining_pages(self, total_pages: int) -> Iterator[Product]:
+        """
+        Fan out requests for pages 2..total_pages and yield their products in page order.
+        
+        At most ``max_concurrency`` pages are in flight or waiting to be
+        processed, so responses never pile up in memory.
+        """
+        pages = iter(range(2, total_pages + 1))
+        window = max(1, self.max_concurrency)
+        in_flight = deque()
+        
+        with ThreadPoolExecutor(max_workers=window, thread_name_prefix="harvey-nichols") as executor:
+            def submit(page):
+                # Run in a copy of the caller's context so fetch output lands in its stdout buffer
+                return executor.submit(contextvars.copy_context().run, self._fetch_page, page)
+            
+            try:
+                for page in islice(pages, window):
+                    in_flight.append((page, submit(page)))
+                
+                while in_flight:
+                    page, future = in_flight.popleft()
+                    data = future.result()
+                    if data is NOT_MODIFIED:
+                        page_products = [] if self._page_summary(page).get('scanned') else None
+                    else:
+                        page_products = self._process_page(page, data) if data is not None else None
+                    del data
                     
-                    if not page_products:
-                        print(f"❌ Page {page}: No products found, stopping pagination")
-                        self.logger.info(f"No products found on page {page}, stopping")
+                    if page_products is None:
+                        # Stop at the first failed or empty page, like the sequential crawl
                         break
                     
-                    print(f"📦 Page {page}: Found {len(page_products)} total products")
-                    self.logger.info(f"Found {len(page_products)} products on page {page}")
-                    
-                    page_high_discount_count = 0
-                    for product_data in page_products:
-                        product = self.parse_product_data(product_data)
-                        if product:
-                            products.append(product)
-                            page_high_discount_count += 1
-                            # Send notification immediately
-                            self._send_notification(product)
+                    # Keep the window full before handing this page downstream
+                    for next_page in islice(pages, 1):
+                        in_flight.append((next_page, submit(next_page)))
                     
-                    print(f"🔥 Page {page}: {page_high_discount_count} high discount products (≥70% off)")
-                    self.logger.info(f"Processed {page_high_discount_count} high discount products from page {page}")
+                    yield from page_products
                     
-                    # Check if we've reached the last page
-                    total_pages = data.get('numberOfPages', 0)
                     if page >= total_pages:
                         print(f"📄 Page {page}: Last page reached ({total_pages} total pages)")
-                        break
-                    
-                    # Continue until no more products
-                    
-                    page += 1
-                    time.sleep(1)  # Be respectful to the API
-                    
-                except Exception as e:
-                    print(f"❌ Page {page}: Error making API request - {str(e)}")
-                    self.logger.error(f"Error making API request for page {page}: {str(e)}")
-                    break
-                    
-        except Exception as e:
-            self.logger.error(f"Error scraping Harvey Nichols API: {str(e)}")
-            
-        self.logger.info(f"Successfully scraped {len(products)} products from Harvey Nichols")
-        return products
+            finally:
+                for _, pending in in_flight:
+                    pending.cancel()
+    
+    def _build_payload(self, page: int) -> dict:
+        """Build API payload matching the exact browser request."""
+        return {
+            "region": "uk",
+            "sort": 0,
+            "page": page,
+            "limit": 60,
+            "keyword": "",
+            "channel": "Desktop",
+            "customerDepartment": "Mens",
+            "customerType": "Public",
+            "store": "",
+            "customerTier": None,
+            "filters": {
+                "categories": "cp43",
+                "dynamicCategoryId": "cp1033"
+            },
+            "pageType": 2,
+            "rowSize": 4,
+            "preview": False
+        }
+    
+    def _cache_key(self, page: int) -> str:
+        """HTTP cache key of a page: the API URL plus its POST payload."""
+        return HTTPCache.key(self.api_base_url, self._build_payload(page))
+    
+    def _page_summary(self, page: int) -> dict:
+        """What was stored for a page the last time it was parsed."""
+        return self.http_cache.summary(self._cache_key(page))
     
-    def _send_notification(self, product: Product) -> None:
-        """Send Discord notification for a high discount product."""
+    def _fetch_page(self, page: int) -> Optional[dict]:
+        """
+        POST a single page request to the ProductsPage API.
+        
+        Args:
+            page: Page number to fetch
+            
+        Returns:
+            dict: Decoded API response, ``NOT_MODIFIED`` if the page is
+            unchanged since last run (HTTP cache only), or None if the request failed
+        """
+        print(f"🔍 Harvey Nichols Page {page}: API request")
+        self.logger.info(f"Fetching page {page} from Harvey Nichols API")
+        
         try:
-            import os
-            from notifications.discord_notifier import DiscordNotifier
+            cache_key = self._cache_key(page)
+            headers = self.http_cache.conditional_headers(cache_key) if self.http_cache is not None else None
             
-            webhook_url = os.environ.get('DISCORD_WEBHOOK_URL')
-            if not webhook_url:
-                print(f"⚠️  No webhook URL set, skipping notification")
-                return
-                
-            notifier = DiscordNotifier(webhook_url)
+            # Make POST request to API
+            self.rate_limiter.acquire(self.api_base_url)
+            response = self.session.post(
+                self.api_base_url,
+                json=self._build_payload(page),
+                headers=headers,
+                timeout=30
+            )
+            
+            if self.http_cache is not None and self.http_cache.is_unchanged(
+                cache_key, response.status_code, response.headers, response.content
+            ):
+                print(f"♻️  Page {page}: Unchanged since last run, skipping parse")
+                return NOT_MODIFIED
             
-            # Create fancy title
-            title = f"🔥 {self.name} Flash Sale - {product.discount_percentage:.0f}% OFF!"
+            if response.status_code != 200:
+                print(f"❌ Page {page}: API returned status {response.status_code}")
+                self.logger.warning(f"API returned status {response.status_code} for page {page}")
+                return None
             
-            notifier.send_high_discount_alerts([product])
-            print(f"📲 Notification sent: {product.name[:50]}... ({product.discount_percentage:.0f}% off)")
+            return response.json()
             
         except Exception as e:
-            print(f"❌ Failed to send notification: {str(e)}")
+            print(f"❌ Page {page}: Error making API request - {str(e)}")
+            self.logger.error(f"Error making API request for page {page}: {str(e)}")
+            return None
+    
+    def _process_page(self, page: int, data: dict) -> Optional[List[Product]]:
+        """
+        Parse one API page and send notifications for its high discount products.
+        
+        Args:
+            page: Page number
+            data: Decoded API response
+            
+        Returns:
+            List of high discount products, or None if the page had no products
+        """
+        page_products = data.get('products', [])
+        # Lets a later run skip this page (and still know the page count) if it is unchanged
+        summary = {'scanned': len(page_products), 'pages': data.get('numberOfPages', 0)}
+        
+        if not page_products:
+            self.remember_page(self._cache_key(page), **summary)
+            print(f"❌ Page {page}: No products found, stopping pagination")
+            self.logger.info(f"No products found on page {page}, stopping")
+            return None
+        
+        print(f"📦 Page {page}: Found {len(page_products)} total products")
+        self.logger.info(f"Found {len(page_products)} products on page {page}")
+        
+        # Collect the page into columns and filter it in one pass
+        batch = ProductBatch(self.name)
+        for product_data in page_products:
+            self._add_to_batch(batch, product_data)
+        
+        # Only new or repriced products go downstream in change-detection mode
+        products = self.changed_products(batch.high_discount_products(self.discount_threshold))
+        for product in products:
+            self.logger.debug(f"Parsed high discount product: {product.name} ({product.discount_percentage:.1f}% off)")
+        # Send the page's notifications immediately, in one call
+        notified = self._send_notifications(products)
+        # Only skip this page next run once its alerts are out
+        if notified:
+            self.remember_page(self._cache_key(page), **summary)
+        
+        print(f"🔥 Page {page}: {len(products)} high discount products (≥{self.discount_threshold:.0f}% off)")
+        self.logger.info(f"Processed {len(products)} high discount products from page {page}")
+        return products
     
     def parse_product_data(self, product_data: dict) -> Optional[Product]:
         """Parse individual product data from API response."""
+        batch = ProductBatch(self.name)
+        self._add_to_batch(batch, product_data)
+        products = batch.high_discount_products(self.discount_threshold)
+        return products[0] if products else None
+    
+    def _add_to_batch(self, batch: ProductBatch, product_data: dict) -> bool:
+        """
+        Append one API product to a batch; the discount filter runs later over the whole batch.
+        
+        Returns:
+            bool: True if the product had a name and valid reduced prices
+        """
         try:
             # Extract basic product information
             brand = product_data.get('brand', '').strip()
@@ -164,7 +289,7 @@ class HarveyNicholsScraper(BaseScraper):
             full_name = f"{brand} {name}".strip() if brand else name
             
             if not full_name:
-                return None
+                return False
             
             # Extract pricing information
             price_gbp = product_data.get('priceGBP', 0)
@@ -179,14 +304,7 @@ class HarveyNicholsScraper(BaseScraper):
             
             # Skip products without proper pricing or no discount
             if not (price_gbp > 0 and sale_price_gbp > 0 and price_gbp > sale_price_gbp):
-                return None
-            
-            # Calculate discount percentage
-            discount_percentage = self.calculate_discount_percentage(price_gbp, sale_price_gbp)
-            
-            # Only return products with high discounts (≥70%)
-            if discount_percentage < 70.0:
-                return None
+                return False
             
             # Extract product URL
             product_url = product_data.get('productUrl', '')
@@ -198,19 +316,15 @@ class HarveyNicholsScraper(BaseScraper):
             if image_url and not image_url.startswith('http'):
                 image_url = 'https://www.harveynichols.com' + image_url
             
-            product = Product(
+            batch.append(
                 name=full_name,
                 original_price=price_gbp,
                 sale_price=sale_price_gbp,
-                discount_percentage=discount_percentage,
                 url=product_url,
-                image_url=image_url,
-                retailer=self.name
+                image_url=image_url
             )
-            
-            self.logger.debug(f"Parsed high discount product: {full_name} ({discount_percentage:.1f}% off)")
-            return product
+            return True
             
         except Exception as e:
             self.logger.debug(f"Failed to parse product data: {str(e)}")
-            return None
+            return False
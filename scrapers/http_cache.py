@@ -0,0 +1,218 @@
+"""
+Opt-in HTTP cache for listing pages.
+Remembers each page's ETag/Last-Modified validators and body hash, so a page
+that has not changed since the last run can be skipped without parsing.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import logging
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+
+# Returned by the fetch helpers instead of a body when the page is unchanged
+class _NotModified:
+    def __repr__(self) -> str:
+        return "NOT_MODIFIED"
+
+
+NOT_MODIFIED = _NotModified()
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS http_cache (
+    cache_key TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    body_hash TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+"""
+
+
+class HTTPCache:
+    """
+    Per-URL validators, body hashes and page summaries in SQLite.
+
+    A fetch asks for ``conditional_headers`` and then checks the response
+    with ``is_unchanged``: a 304, or a 200 whose body hashes the same as last
+    time, means the page can be skipped. Scrapers record what they learned
+    from a parsed page (e.g. how many cards it had) with ``store``; only then
+    is the new hash committed, so a run that dies mid-page re-parses it next
+    time. The summary is what lets pagination carry on over skipped pages.
+    """
+
+    def __init__(self, storage_file: str = "http_cache.db"):
+        """
+        Args:
+            storage_file: Path of the SQLite database
+        """
+        import sqlite3
+
+        self.storage_file = storage_file
+        self.logger = logging.getLogger("http_cache")
+        self._lock = threading.Lock()
+        # cache_key -> (etag, last_modified, body_hash) of pages fetched but not yet stored
+        self._pending: Dict[str, tuple] = {}
+
+        self.conn = sqlite3.connect(storage_file, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+        # Statistics
+        self.not_modified = 0   # 304 responses
+        self.same_body = 0      # 200 responses identical to last run
+        self.changed = 0
+
+    @staticmethod
+    def key(url: str, payload: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Cache key for a request; POST payloads are part of the key.
+
+        Args:
+            url: Request URL
+            payload: JSON body of a POST request
+
+        Returns:
+            str: The URL, plus a digest of the payload if there is one
+        """
+        if payload is None:
+            return url
+        digest = hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+        return f"{url}#{digest}"
+
+    def _row(self, cache_key: str) -> Optional[tuple]:
+        with self._lock:
+            return self.conn.execute(
+                "SELECT etag, last_modified, body_hash, summary FROM http_cache WHERE cache_key = ?",
+                (cache_key,)
+            ).fetchone()
+
+    def conditional_headers(self, cache_key: str) -> Dict[str, str]:
+        """
+        ``If-None-Match`` / ``If-Modified-Since`` headers for a cached page.
+
+        Returns:
+            dict: Headers to add to the request (empty if the page is not cached)
+        """
+        row = self._row(cache_key)
+        headers = {}
+        if row is not None:
+            etag, last_modified = row[0], row[1]
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        return headers
+
+    def is_unchanged(self, cache_key: str, status_code: int, headers, content: bytes) -> bool:
+        """
+        Check a response against the cache.
+
+        Args:
+            cache_key: Key from ``key``
+            status_code: HTTP status of the response
+            headers: Response headers
+            content: Raw response body
+
+        Returns:
+            bool: True if the page is the same as when it was last stored
+            (always False for responses other than 200 and 304)
+        """
+        # Error responses say nothing about whether the page changed
+        if status_code not in (200, 304):
+            return False
+
+        row = self._row(cache_key)
+
+        if status_code == 304:
+            if row is None:
+                return False
+            self.not_modified += 1
+            return True
+
+        body_hash = hashlib.sha256(content).hexdigest()
+        if row is not None and row[2] == body_hash:
+            self.same_body += 1
+            return True
+
+        self.changed += 1
+        with self._lock:
+            self._pending[cache_key] = (headers.get('ETag'), headers.get('Last-Modified'), body_hash)
+        return False
+
+    def store(self, cache_key: str, **summary: Any) -> None:
+        """
+        Commit a freshly parsed page with a summary of what it contained.
+
+        Does nothing for pages that were not fetched through ``is_unchanged``
+        in this run (or were unchanged).
+
+        Args:
+            cache_key: Key from ``key``
+            **summary: JSON-serialisable facts about the page, e.g. ``scanned=60``
+        """
+        with self._lock:
+            pending = self._pending.pop(cache_key, None)
+            if pending is None:
+                return
+            try:
+                with self.conn:
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO http_cache VALUES (?, ?, ?, ?, ?, ?)",
+                        (cache_key, *pending, json.dumps(summary), datetime.now().isoformat())
+                    )
+            except Exception as e:
+                self.logger.error(f"Failed to store {cache_key} in HTTP cache: {str(e)}")
+
+    def summary(self, cache_key: str) -> Dict[str, Any]:
+        """
+        Summary stored for a page (empty if none).
+
+        Returns:
+            dict: The keyword arguments last passed to ``store``
+        """
+        row = self._row(cache_key)
+        return json.loads(row[3]) if row is not None else {}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: 304 responses, identical bodies and changed pages this run
+        """
+        return {
+            'not_modified': self.not_modified,
+            'same_body': self.same_body,
+            'changed': self.changed,
+        }
+
+
+_shared_cache: Optional[HTTPCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def http_cache_enabled() -> bool:
+    """Check whether the HTTP cache was turned on with ``HTTP_CACHE``."""
+    return os.environ.get('HTTP_CACHE', '').lower() in ('1', 'true', 'yes')
+
+
+def get_http_cache() -> Optional[HTTPCache]:
+    """
+    Return the process-wide HTTPCache, or None when ``HTTP_CACHE`` is off.
+
+    The database path comes from ``HTTP_CACHE_FILE`` (default ``http_cache.db``).
+    """
+    global _shared_cache
+    if not http_cache_enabled():
+        return None
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = HTTPCache(os.environ.get('HTTP_CACHE_FILE', 'http_cache.db'))
+        return _shared_cache
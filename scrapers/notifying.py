@@ -0,0 +1,112 @@
+"""
+Notification and page-bookkeeping helpers shared by every scraper base class.
+"""
+
+from typing import TYPE_CHECKING, List
+
+if TYPE_CHECKING:
+    from scrapers.base import Product
+
+
+class NotifyingMixin:
+    """
+    Sends high discount alerts through the run's shared notifier, and
+    records pages and prices once they are handled.
+
+    Classes using this set ``self.notifier`` (None to build one from
+    DISCORD_WEBHOOK_URL on first use), ``self.logger``, ``self.http_cache``
+    and ``self.product_state``.
+    """
+
+    notifier = None
+    http_cache = None
+    product_state = None
+
+    def get_notifier(self):
+        """
+        Get the Discord notifier for this scraper.
+
+        Uses the injected notifier when there is one; otherwise builds a single
+        notifier from DISCORD_WEBHOOK_URL and reuses it for the rest of the run.
+
+        Returns:
+            DiscordNotifier or None if no webhook URL is configured
+        """
+        if self.notifier is None:
+            import os
+            from notifications.discord_notifier import DiscordNotifier
+
+            webhook_url = os.environ.get('DISCORD_WEBHOOK_URL')
+            if not webhook_url:
+                return None
+            # Change detection records a product's prices once its alert is delivered
+            product_state = getattr(self, 'product_state', None)
+            self.notifier = DiscordNotifier(
+                webhook_url, enable_idempotency=True,
+                on_delivered=product_state.mark_delivered if product_state is not None else None
+            )
+        return self.notifier
+
+    def _send_notifications(self, products: List["Product"]) -> bool:
+        """
+        Send Discord notifications for a page of high discount products.
+
+        The whole page goes to the notifier in one call, so it is batched
+        into as few webhook messages as possible whether the notifier sends
+        inline or through the background pipeline.
+
+        Returns:
+            bool: True once every alert is delivered, or queued with an outbox
+            that replays it if the send fails; only then may the page be
+            remembered as handled
+        """
+        if not products:
+            return True
+
+        try:
+            notifier = self.get_notifier()
+            if notifier is None:
+                print(f"⚠️  No webhook URL set, skipping notifications")
+                return False
+
+            # Send notifications (will automatically check for duplicates)
+            success = notifier.send_high_discount_alerts(products)
+            queued = getattr(notifier, 'background', False)
+
+            if not success:
+                print(f"❌ Failed to send notifications for {len(products)} products")
+                return False
+            for product in products:
+                print(f"📲 Notification {'queued' if queued else 'sent'}: "
+                      f"{product.name[:50]}... ({product.discount_percentage:.0f}% off)")
+            # Without an outbox a queued alert that later fails is gone for good
+            return getattr(notifier, 'guarantees_delivery', False) if queued else True
+
+        except Exception as e:
+            print(f"❌ Failed to send notifications: {str(e)}")
+            return False
+
+    def remember_page(self, cache_key: str, **summary) -> None:
+        """
+        Record a parsed page in the HTTP cache (no-op when the cache is off).
+
+        Args:
+            cache_key: URL (or ``HTTPCache.key``) the page was fetched with
+            **summary: What a later run needs to skip the page, e.g. ``scanned=60``
+        """
+        if self.http_cache is not None:
+            self.http_cache.store(cache_key, **summary)
+
+    def changed_products(self, products: List["Product"]) -> List["Product"]:
+        """
+        Drop products whose prices are the same as last run (no-op unless ``CHANGES_ONLY`` is on).
+
+        Args:
+            products: A page of high discount products
+
+        Returns:
+            List[Product]: The new or repriced products
+        """
+        if self.product_state is None:
+            return products
+        return self.product_state.filter_changed(products)
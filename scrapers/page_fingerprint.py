@@ -0,0 +1,216 @@
+"""
+Page-content fingerprints for the HTML scrapers.
+A page whose product-card markup is the same as last run (once nonces and
+tracking tokens are stripped) reuses last run's parsed products instead of
+being parsed again.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import logging
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Pattern, Tuple
+
+from scrapers.base import Product
+
+
+# Bump when parsing changes so old fingerprints stop matching
+FINGERPRINT_VERSION = "1"
+
+# Per-request tokens that change on every load without changing the products
+VOLATILE_ATTRIBUTE_PATTERN = re.compile(
+    r'\s(?:nonce|data-nonce|data-csrf[\w-]*|data-request-id|data-trace-id|data-impression-id)'
+    r'=(?:"[^"]*"|\'[^\']*\')',
+    re.I
+)
+TRACKING_PARAM_PATTERN = re.compile(r'[?&](?:utm_\w+|gclid|fbclid|_ga|sid|sessionid)=[^&"\'\s>]*', re.I)
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def card_region(html_content: str, card_start: Pattern, tag: str) -> str:
+    """
+    Concatenate the markup of every product card on a page.
+
+    Each card runs from a ``card_start`` match to its balanced closing
+    ``</tag>``, so nested elements of the same tag stay inside the card.
+
+    Args:
+        html_content: Raw page HTML
+        card_start: Pattern matching a card's opening tag
+        tag: Tag name of the card element, e.g. "li"
+
+    Returns:
+        str: The cards' markup (empty if the page has none)
+    """
+    tag_pattern = re.compile(rf'<(/?){tag}\b', re.I)
+    cards = []
+    end = 0
+
+    for match in card_start.finditer(html_content):
+        if match.start() < end:
+            continue  # Nested inside the previous card
+        depth = 0
+        end = len(html_content)
+        for tag_match in tag_pattern.finditer(html_content, match.start()):
+            depth += -1 if tag_match.group(1) else 1
+            if depth == 0:
+                end = html_content.find('>', tag_match.end()) + 1 or len(html_content)
+                break
+        cards.append(html_content[match.start():end])
+
+    return ''.join(cards)
+
+
+def normalize_region(region: str) -> str:
+    """Strip nonces and tracking parameters and collapse whitespace."""
+    region = VOLATILE_ATTRIBUTE_PATTERN.sub('', region)
+    region = TRACKING_PARAM_PATTERN.sub('', region)
+    return WHITESPACE_PATTERN.sub(' ', region)
+
+
+def page_digest(region: str, *context: Any) -> str:
+    """
+    Digest of a normalized card region.
+
+    Args:
+        region: Card markup from ``card_region``
+        *context: Settings that change the parsed result (e.g. the discount threshold)
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    digest = hashlib.sha256(FINGERPRINT_VERSION.encode())
+    digest.update(repr(context).encode())
+    digest.update(normalize_region(region).encode())
+    return digest.hexdigest()
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS page_fingerprints (
+    retailer TEXT NOT NULL,
+    page_key TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    products TEXT NOT NULL,
+    scanned INTEGER NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (retailer, page_key)
+);
+"""
+
+
+class PageFingerprintStore:
+    """
+    Last run's digest and parsed products for every retailer page, in SQLite.
+
+    ``lookup`` returns the stored products when a page's digest is unchanged;
+    otherwise the scraper parses the page and ``save``s the result. Hits and
+    misses are counted per retailer.
+    """
+
+    def __init__(self, storage_file: str = "page_fingerprints.db"):
+        """
+        Args:
+            storage_file: Path of the SQLite database
+        """
+        import sqlite3
+
+        self.storage_file = storage_file
+        self.logger = logging.getLogger("page_fingerprint")
+        self._lock = threading.Lock()
+
+        self.conn = sqlite3.connect(storage_file, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+        # retailer -> {'hits': n, 'misses': n}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, retailer: str, outcome: str) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(retailer, {'hits': 0, 'misses': 0})
+            stats[outcome] += 1
+
+    def lookup(self, retailer: str, page_key: Any, digest: str) -> Optional[Tuple[List[Product], int]]:
+        """
+        Products stored for a page, if its digest is unchanged.
+
+        Returns:
+            tuple: (products, cards scanned), or None on a miss
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT digest, products, scanned FROM page_fingerprints WHERE retailer = ? AND page_key = ?",
+                (retailer, str(page_key))
+            ).fetchone()
+        if row is None or row[0] != digest:
+            self._count(retailer, 'misses')
+            return None
+        self._count(retailer, 'hits')
+
+        scraped_at = datetime.now()
+        products = [Product(**fields, scraped_at=scraped_at) for fields in json.loads(row[1])]
+        return products, row[2]
+
+    def save(self, retailer: str, page_key: Any, digest: str, products: List[Product], scanned: int) -> None:
+        """Store a freshly parsed page."""
+        serialized = json.dumps([
+            {
+                'name': product.name,
+                'original_price': product.original_price,
+                'sale_price': product.sale_price,
+                'discount_percentage': product.discount_percentage,
+                'url': product.url,
+                'image_url': product.image_url,
+                'retailer': product.retailer,
+            }
+            for product in products
+        ])
+        try:
+            with self._lock, self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO page_fingerprints VALUES (?, ?, ?, ?, ?, ?)",
+                    (retailer, str(page_key), digest, serialized, scanned, datetime.now().isoformat())
+                )
+        except Exception as e:
+            self.logger.error(f"Failed to store fingerprint for {retailer} page {page_key}: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get fingerprint statistics.
+
+        Returns:
+            dict: Hits, misses and hit rate (0-1) per retailer
+        """
+        with self._lock:
+            return {
+                retailer: {**stats, 'hit_rate': stats['hits'] / (stats['hits'] + stats['misses'])}
+                for retailer, stats in self._stats.items()
+            }
+
+
+_shared_store: Optional[PageFingerprintStore] = None
+_shared_store_lock = threading.Lock()
+
+
+def page_fingerprints_enabled() -> bool:
+    """Check whether fingerprinting was turned on with ``PAGE_FINGERPRINTS``."""
+    return os.environ.get('PAGE_FINGERPRINTS', '').lower() in ('1', 'true', 'yes')
+
+
+def get_page_fingerprints() -> Optional[PageFingerprintStore]:
+    """
+    Return the process-wide PageFingerprintStore, or None when ``PAGE_FINGERPRINTS`` is off.
+
+    The database path comes from ``PAGE_FINGERPRINTS_FILE`` (default ``page_fingerprints.db``).
+    """
+    global _shared_store
+    if not page_fingerprints_enabled():
+        return None
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = PageFingerprintStore(os.environ.get('PAGE_FINGERPRINTS_FILE', 'page_fingerprints.db'))
+        return _shared_store
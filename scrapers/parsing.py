@@ -0,0 +1,34 @@
+"""
+Shared HTML parsing helpers for the HTML-based scrapers.
+Uses the lxml backend and partial parsing so only product nodes are built.
+"""
+
+from typing import Optional
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:  # Fall back to the pure-Python parser
+    HTML_PARSER = 'html.parser'
+
+
+# Only the nodes each scraper actually reads. Everything outside them
+# (navigation, footers, inline CSS...) is skipped while parsing.
+HARRODS_STRAINER = SoupStrainer(['article', 'script'])  # product cards + JSON-LD
+END_CLOTHING_STRAINER = SoupStrainer('a', attrs={'data-test-id': 'ProductCard__ProductCardSC'})
+SELFRIDGES_STRAINER = SoupStrainer('li', attrs={'data-analytics-link-target': 'product_card_link'})
+
+
+def parse_html(html_content: str, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    """
+    Parse HTML with the fastest available backend.
+
+    Args:
+        html_content: Raw page HTML
+        parse_only: Strainer limiting which elements are built into the tree
+
+    Returns:
+        BeautifulSoup: Parsed (possibly partial) document
+    """
+    return BeautifulSoup(html_content, HTML_PARSER, parse_only=parse_only)
@@ -0,0 +1,147 @@
+"""
+Batch discount pricing for a page of products.
+Discounts are computed for whole price columns in one call (with NumPy when
+it is installed) and the alert threshold is applied as a mask.
+"""
+
+import logging
+import os
+from array import array
+from typing import List, Optional, Sequence
+
+from scrapers.base import HIGH_DISCOUNT_THRESHOLD
+
+logger = logging.getLogger("pricing")
+
+# NumPy is optional and takes ~100ms to import, so it is loaded on first use
+_np = None
+_np_loaded = False
+
+
+def _numpy():
+    """The numpy module, or None when it is not installed."""
+    global _np, _np_loaded
+    if not _np_loaded:
+        try:
+            import numpy
+            _np = numpy
+        except ImportError:  # Fall back to plain Python loops
+            _np = None
+        _np_loaded = True
+    return _np
+
+
+def numpy_available() -> bool:
+    """Check whether the optional NumPy dependency is installed."""
+    return _numpy() is not None
+
+
+def get_discount_threshold(retailer_key: Optional[str] = None) -> float:
+    """
+    Minimum discount (in percent) a product needs to be reported.
+
+    ``DISCOUNT_THRESHOLD_<RETAILER>`` (e.g. ``DISCOUNT_THRESHOLD_END``) wins
+    over ``DISCOUNT_THRESHOLD``; without either the default is 70.
+
+    Args:
+        retailer_key: Short retailer key, e.g. "end" or "harvey"
+
+    Returns:
+        float: Threshold percentage
+    """
+    names = [f'DISCOUNT_THRESHOLD_{retailer_key.upper()}'] if retailer_key else []
+    names.append('DISCOUNT_THRESHOLD')
+
+    for name in names:
+        value = os.environ.get(name)
+        if not value:
+            continue
+        try:
+            return float(value)
+        except ValueError:
+            logger.warning(f"Ignoring invalid {name}={value!r}")
+    return HIGH_DISCOUNT_THRESHOLD
+
+
+def compute_discounts(original_prices: array, sale_prices: array, known: array,
+                      decimals: Optional[int] = 2) -> array:
+    """
+    Discount percentage for every row of a page.
+
+    Args:
+        original_prices: ``array('d')`` of prices before discount
+        sale_prices: ``array('d')`` of current prices
+        known: ``array('d')`` of discounts already read from the page (NaN where unknown)
+        decimals: Rounding applied to computed discounts (None keeps full precision)
+
+    Returns:
+        array: ``array('d')`` of discounts; known values are kept as they are
+    """
+    np = _numpy()
+    if np is not None:
+        # Zero-copy views over the array buffers
+        original = np.frombuffer(original_prices, dtype=np.float64)
+        sale = np.frombuffer(sale_prices, dtype=np.float64)
+        current = np.frombuffer(known, dtype=np.float64)
+
+        # Same operation order as the scalar path, so results match exactly
+        computed = np.zeros_like(original)
+        np.divide(original - sale, original, out=computed, where=original > 0)
+        computed *= 100
+        if decimals is not None:
+            rounded = np.round(computed, decimals)
+            # np.round and round() can disagree on values sitting on a half;
+            # settle those few with round() so both paths match exactly
+            scaled = computed * 10.0 ** decimals
+            for index in np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6):
+                rounded[index] = round(float(computed[index]), decimals)
+            computed = rounded
+
+        result = array('d')
+        result.frombytes(np.where(np.isnan(current), computed, current).tobytes())
+        return result
+
+    def discount(original: float, sale: float, current: float) -> float:
+        if current == current:  # Already known (NaN != NaN)
+            return current
+        if original <= 0:
+            return 0.0
+        value = (original - sale) / original * 100
+        return round(value, decimals) if decimals is not None else value
+
+    return array('d', map(discount, original_prices, sale_prices, known))
+
+
+def high_discount_mask(original_prices: array, sale_prices: array, discounts: array,
+                       threshold: float = HIGH_DISCOUNT_THRESHOLD) -> Sequence[bool]:
+    """
+    Flag rows that are genuinely reduced and meet the threshold.
+
+    Args:
+        original_prices: ``array('d')`` of prices before discount
+        sale_prices: ``array('d')`` of current prices
+        discounts: ``array('d')`` from ``compute_discounts``
+        threshold: Minimum discount percentage
+
+    Returns:
+        One flag per row (a NumPy bool array when NumPy is installed)
+    """
+    np = _numpy()
+    if np is not None:
+        original = np.frombuffer(original_prices, dtype=np.float64)
+        sale = np.frombuffer(sale_prices, dtype=np.float64)
+        discount = np.frombuffer(discounts, dtype=np.float64)
+        return (original > 0) & (original > sale) & (discount >= threshold)
+
+    return [
+        original > 0 and original > sale and discount >= threshold
+        for original, sale, discount in zip(original_prices, sale_prices, discounts)
+    ]
+
+
+def surviving_indices(mask: Sequence[bool]) -> List[int]:
+    """Row indices where the mask is set, in order."""
+    np = _numpy()
+    if np is not None and isinstance(mask, np.ndarray):
+        return np.flatnonzero(mask).tolist()
+    return [index for index, keep in enumerate(mask) if keep]
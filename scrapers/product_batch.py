@@ -0,0 +1,148 @@
+"""
+Columnar storage for a page of scraped products.
+Prices and discounts live in flat arrays so the discount maths and the
+high-discount filter run over whole columns (see scrapers.pricing).
+"""
+
+import sys
+from array import array
+from datetime import datetime
+from typing import Iterator, List, Optional, Sequence
+
+from scrapers.base import Product, HIGH_DISCOUNT_THRESHOLD
+from scrapers import pricing
+
+
+# Marks a row whose discount has not been computed yet
+_MISSING = float('nan')
+
+
+class ProductBatch:
+    """
+    One page (or more) of products stored column by column.
+
+    Prices and discounts are ``array('d')`` columns, the retailer of each row
+    is a small integer into a shared table, and names and URLs are interned,
+    so a batch of thousands of rows costs a fraction of the equivalent
+    ``Product`` objects. Only rows that pass the filter are turned into
+    ``Product`` instances.
+    """
+
+    __slots__ = ('scraped_at', 'decimals', 'names', 'urls', 'image_urls', 'original_prices',
+                 'sale_prices', 'discounts', 'retailer_ids', 'retailers', '_retailer_index')
+
+    def __init__(self, retailer: str = "", scraped_at: Optional[datetime] = None, decimals: Optional[int] = 2):
+        """
+        Args:
+            retailer: Default retailer for rows appended without one
+            scraped_at: Timestamp shared by every row (defaults to now)
+            decimals: Rounding applied to computed discounts (None keeps full precision)
+        """
+        self.scraped_at = scraped_at or datetime.now()
+        self.decimals = decimals
+        self.names: List[str] = []
+        self.urls: List[str] = []
+        self.image_urls: List[Optional[str]] = []
+        self.original_prices = array('d')
+        self.sale_prices = array('d')
+        self.discounts = array('d')
+        self.retailer_ids = array('H')
+        self.retailers: List[str] = []
+        self._retailer_index = {}
+        self._retailer_id(retailer)
+
+    def _retailer_id(self, retailer: str) -> int:
+        retailer_id = self._retailer_index.get(retailer)
+        if retailer_id is None:
+            retailer_id = self._retailer_index[retailer] = len(self.retailers)
+            self.retailers.append(sys.intern(retailer))
+        return retailer_id
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def append(self, name: str, original_price: float, sale_price: float, url: str,
+               image_url: Optional[str] = None, discount_percentage: Optional[float] = None,
+               retailer: Optional[str] = None) -> None:
+        """
+        Add a row.
+
+        Args:
+            name: Product name
+            original_price: Price before discount
+            sale_price: Current price
+            url: Product URL
+            image_url: Product image URL
+            discount_percentage: Discount shown by the retailer; computed from
+                the prices by ``compute_discounts`` when omitted
+            retailer: Retailer name (defaults to the batch retailer)
+        """
+        # Convert first so a bad value cannot leave the columns misaligned
+        name, url = sys.intern(str(name)), sys.intern(str(url))
+        original_price, sale_price = float(original_price), float(sale_price)
+        discount = _MISSING if discount_percentage is None else float(discount_percentage)
+        retailer_id = 0 if retailer is None else self._retailer_id(retailer)
+
+        self.names.append(name)
+        self.urls.append(url)
+        self.image_urls.append(image_url)
+        self.original_prices.append(original_price)
+        self.sale_prices.append(sale_price)
+        self.discounts.append(discount)
+        self.retailer_ids.append(retailer_id)
+
+    def compute_discounts(self) -> array:
+        """
+        Fill in the discount of every row that does not have one yet.
+
+        Returns:
+            array: The discount column
+        """
+        self.discounts = pricing.compute_discounts(
+            self.original_prices, self.sale_prices, self.discounts, self.decimals
+        )
+        return self.discounts
+
+    def high_discount_mask(self, threshold: float = HIGH_DISCOUNT_THRESHOLD) -> Sequence[bool]:
+        """
+        Rows that are genuinely reduced and meet the discount threshold.
+
+        Args:
+            threshold: Minimum discount percentage
+
+        Returns:
+            One flag per row (a NumPy bool array when NumPy is installed)
+        """
+        self.compute_discounts()
+        return pricing.high_discount_mask(self.original_prices, self.sale_prices, self.discounts, threshold)
+
+    def product(self, index: int) -> Product:
+        """Materialize one row as a Product."""
+        return Product(
+            name=self.names[index],
+            original_price=self.original_prices[index],
+            sale_price=self.sale_prices[index],
+            discount_percentage=self.discounts[index],
+            url=self.urls[index],
+            image_url=self.image_urls[index],
+            retailer=self.retailers[self.retailer_ids[index]],
+            scraped_at=self.scraped_at
+        )
+
+    def __iter__(self) -> Iterator[Product]:
+        """Materialize every row (discounts are computed first)."""
+        self.compute_discounts()
+        return (self.product(index) for index in range(len(self)))
+
+    def high_discount_products(self, threshold: float = HIGH_DISCOUNT_THRESHOLD) -> List[Product]:
+        """
+        Products that pass ``high_discount_mask``, in row order.
+
+        Args:
+            threshold: Minimum discount percentage
+
+        Returns:
+            List[Product]: Materialized high discount products
+        """
+        mask = self.high_discount_mask(threshold)
+        return [self.product(index) for index in pricing.surviving_indices(mask)]
@@ -0,0 +1,203 @@
+"""
+Per-product price state for change-detection runs.
+Remembers the last original and sale price of every product, so a run can
+pass on only the products that are new or whose price moved.
+"""
+
+import os
+import threading
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from scrapers.base import Product
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS product_state (
+    product_id TEXT PRIMARY KEY,
+    retailer TEXT NOT NULL,
+    original_price REAL NOT NULL,
+    sale_price REAL NOT NULL,
+    first_seen_at TEXT NOT NULL,
+    changed_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_product_state_retailer ON product_state (retailer);
+"""
+
+# SQLite's default limit on parameters per statement is 999
+_LOOKUP_CHUNK = 500
+
+
+def product_id(product: Product) -> str:
+    """
+    Canonical ID of a product: its retailer plus its URL without query or fragment.
+
+    Args:
+        product: Scraped product
+
+    Returns:
+        str: e.g. "Harrods|https://www.harrods.com/en-gb/p/some-shirt-123"
+    """
+    parts = urlsplit(product.url.strip())
+    url = urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'), '', ''))
+    return f"{product.retailer}|{url}"
+
+
+def _prices(product: Product) -> tuple:
+    """(original, sale) price rounded to pence, as compared and stored."""
+    return round(product.original_price, 2), round(product.sale_price, 2)
+
+
+class ProductStateStore:
+    """
+    Last seen prices per product in SQLite.
+
+    ``filter_changed`` looks a page of products up in one query and returns
+    the ones that are new or whose original/sale price differs from the
+    stored one. It writes nothing: a product's prices are recorded by
+    ``mark_delivered`` once its alert has been delivered, so an alert that
+    fails (or is still queued when the run ends) comes up again next run.
+    Only delivered rows are written, so a steady-state run does work
+    proportional to what changed rather than to the catalog.
+    """
+
+    def __init__(self, storage_file: str = "product_state.db"):
+        """
+        Args:
+            storage_file: Path of the SQLite database
+        """
+        import sqlite3
+
+        self.storage_file = storage_file
+        self.logger = logging.getLogger("product_state")
+        self._lock = threading.Lock()
+
+        self.conn = sqlite3.connect(storage_file, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+        # retailer -> {'new': n, 'changed': n, 'unchanged': n}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _stored_prices(self, product_ids: List[str]) -> Dict[str, tuple]:
+        stored = {}
+        for start in range(0, len(product_ids), _LOOKUP_CHUNK):
+            chunk = product_ids[start:start + _LOOKUP_CHUNK]
+            rows = self.conn.execute(
+                f"SELECT product_id, original_price, sale_price FROM product_state "
+                f"WHERE product_id IN ({','.join('?' * len(chunk))})",
+                chunk
+            ).fetchall()
+            stored.update((row[0], (row[1], row[2])) for row in rows)
+        return stored
+
+    def filter_changed(self, products: List[Product]) -> List[Product]:
+        """
+        Keep the products that are new or whose prices changed.
+
+        Args:
+            products: A page of products
+
+        Returns:
+            List[Product]: The new or changed products, in their original order
+        """
+        if not products:
+            return []
+
+        # Last occurrence wins if a page lists the same product twice
+        by_id = {product_id(product): product for product in products}
+
+        with self._lock:
+            try:
+                stored = self._stored_prices(list(by_id))
+            except Exception as e:
+                # Pass everything on rather than silently dropping products
+                self.logger.error(f"Failed to read product state: {str(e)}")
+                return products
+
+            changed_ids = set()
+            new_count = 0
+            for pid, product in by_id.items():
+                previous = stored.get(pid)
+                if previous is None:
+                    new_count += 1
+                elif (round(previous[0], 2), round(previous[1], 2)) == _prices(product):
+                    continue
+                changed_ids.add(pid)
+
+            stats = self._stats.setdefault(products[0].retailer, {'new': 0, 'changed': 0, 'unchanged': 0})
+            stats['new'] += new_count
+            stats['changed'] += len(changed_ids) - new_count
+            stats['unchanged'] += len(by_id) - len(changed_ids)
+
+        emitted = set()
+        result = []
+        for product in products:
+            pid = product_id(product)
+            if pid in changed_ids and pid not in emitted:
+                emitted.add(pid)
+                result.append(product)
+        return result
+
+    def mark_delivered(self, products: List[Product]) -> None:
+        """
+        Record the prices of products whose alerts were delivered.
+
+        Args:
+            products: Products the notifier delivered (or had already delivered)
+        """
+        if not products:
+            return
+
+        now = datetime.now().isoformat()
+        rows = {product_id(product): (product.retailer, *_prices(product)) for product in products}
+        try:
+            with self._lock, self.conn:
+                self.conn.executemany(
+                    "INSERT INTO product_state VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (product_id) DO UPDATE SET "
+                    "original_price = excluded.original_price, sale_price = excluded.sale_price, "
+                    "changed_at = excluded.changed_at",
+                    [(pid, *row, now, now) for pid, row in rows.items()]
+                )
+        except Exception as e:
+            # The products come up as changed again next run, so nothing is lost
+            self.logger.error(f"Failed to update product state: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get change-detection statistics.
+
+        Returns:
+            dict: New, changed and unchanged products per retailer
+        """
+        with self._lock:
+            return {retailer: dict(stats) for retailer, stats in self._stats.items()}
+
+
+_shared_store: Optional[ProductStateStore] = None
+_shared_store_lock = threading.Lock()
+
+
+def changes_only_enabled() -> bool:
+    """Check whether change detection was turned on with ``CHANGES_ONLY``."""
+    return os.environ.get('CHANGES_ONLY', '').lower() in ('1', 'true', 'yes')
+
+
+def get_product_state() -> Optional[ProductStateStore]:
+    """
+    Return the process-wide ProductStateStore, or None when ``CHANGES_ONLY`` is off.
+
+    The database path comes from ``PRODUCT_STATE_FILE`` (default ``product_state.db``).
+    """
+    global _shared_store
+    if not changes_only_enabled():
+        return None
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = ProductStateStore(os.environ.get('PRODUCT_STATE_FILE', 'product_state.db'))
+        return _shared_store
@@ -0,0 +1,182 @@
+"""
+Shared per-host rate limiting for all scraper fetch paths.
+Token buckets replace the fixed sleeps that used to sit in front of every request.
+"""
+
+import random
+import threading
+import time
+import logging
+from typing import Dict, Any, Optional
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """
+    Token bucket with optional jitter on waits.
+
+    Holds up to ``burst`` tokens and refills at ``rate`` tokens per second.
+    A request only waits when the bucket is empty; time spent parsing
+    between requests counts towards the refill.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, jitter: float = 0.0):
+        self.rate = rate
+        self.burst = burst
+        self.jitter = jitter
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+        # Statistics
+        self.requests = 0
+        self.waits = 0
+        self.wait_time = 0.0
+
+    def reserve(self) -> float:
+        """
+        Take one token, returning how long the caller must wait for it.
+
+        Tokens may go negative, which reserves future capacity so concurrent
+        callers queue up behind each other instead of all waking at once.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+
+            self.tokens -= 1
+            wait = 0.0
+            if self.tokens < 0:
+                wait = -self.tokens / self.rate
+                if self.jitter:
+                    wait += random.uniform(0, self.jitter)
+
+            self.requests += 1
+            if wait > 0:
+                self.waits += 1
+                self.wait_time += wait
+            return wait
+
+
+class HostRateLimiter:
+    """
+    Registry of token buckets keyed by host.
+
+    Retailers configure their own host once (usually in ``__init__``); hosts
+    that were never configured fall back to the default of one request per
+    second.
+    """
+
+    def __init__(self, default_rate: float = 1.0, default_burst: int = 1):
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.logger = logging.getLogger("rate_limiter")
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _host(url_or_host: str) -> str:
+        """Normalise a URL or bare host to a lowercase host name."""
+        if '://' in url_or_host:
+            return urlparse(url_or_host).netloc.lower()
+        return url_or_host.lower()
+
+    def configure(self, url_or_host: str, rate: float, burst: int = 1, jitter: float = 0.0) -> None:
+        """
+        Set the request budget for a host.
+
+        Args:
+            url_or_host: Host name, or any URL on that host
+            rate: Sustained requests per second
+            burst: Requests allowed back to back before waiting
+            jitter: Maximum random seconds added to each wait
+        """
+        host = self._host(url_or_host)
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                self._buckets[host] = TokenBucket(rate, burst, jitter)
+            else:
+                # Keep the current token count so reconfiguring doesn't reset pacing
+                with bucket.lock:
+                    bucket.rate = rate
+                    bucket.burst = burst
+                    bucket.jitter = jitter
+                    bucket.tokens = min(bucket.tokens, burst)
+        self.logger.debug(f"Rate limit for {host}: {rate:.2f} req/s, burst {burst}, jitter {jitter:.1f}s")
+
+    def _get_bucket(self, host: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.default_rate, self.default_burst)
+                self._buckets[host] = bucket
+            return bucket
+
+    def acquire(self, url_or_host: str) -> float:
+        """
+        Block until a request to the given host is allowed.
+
+        Args:
+            url_or_host: Host name, or the URL about to be requested
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        host = self._host(url_or_host)
+        wait = self._get_bucket(host).reserve()
+        if wait > 0:
+            self.logger.debug(f"Rate limit: waiting {wait:.1f}s for {host}")
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, url_or_host: str) -> float:
+        """
+        Async counterpart of ``acquire`` that yields to the event loop while waiting.
+
+        Args:
+            url_or_host: Host name, or the URL about to be requested
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        import asyncio
+        
+        host = self._host(url_or_host)
+        wait = self._get_bucket(host).reserve()
+        if wait > 0:
+            self.logger.debug(f"Rate limit: waiting {wait:.1f}s for {host}")
+            await asyncio.sleep(wait)
+        return wait
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get per-host request and wait statistics.
+
+        Returns:
+            dict: Host -> requests, waits and total seconds spent waiting
+        """
+        with self._lock:
+            return {
+                host: {
+                    'requests': bucket.requests,
+                    'waits': bucket.waits,
+                    'wait_time': bucket.wait_time,
+                    'rate': bucket.rate,
+                }
+                for host, bucket in self._buckets.items()
+            }
+
+
+_shared_limiter: Optional[HostRateLimiter] = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> HostRateLimiter:
+    """Return the process-wide HostRateLimiter."""
+    global _shared_limiter
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            _shared_limiter = HostRateLimiter()
+        return _shared_limiter
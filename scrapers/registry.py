@@ -0,0 +1,32 @@
+"""
+Retailer registry: maps CLI keys to scraper modules.
+Scraper modules are only imported when their retailer is selected, so a
+run of one retailer does not pay for the others' dependencies (Selenium,
+aiohttp, lxml...).
+"""
+
+import importlib
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Retailer:
+    """A scraper that can be selected from the command line."""
+    key: str           # CLI flag, e.g. "harvey" for --harvey
+    name: str          # Display name
+    module: str        # Module that defines the scraper
+    class_name: str    # Scraper class in that module
+
+    def load(self):
+        """Import the scraper module and return the scraper class."""
+        return getattr(importlib.import_module(self.module), self.class_name)
+
+
+# In run order
+RETAILERS = [
+    Retailer("flannel", "Flannels VPS", "scrapers.flannels_vps", "FlannelsVPSScraper"),
+    Retailer("harrods", "Harrods", "scrapers.harrods", "HarrodsScraper"),
+    Retailer("harvey", "Harvey Nichols", "scrapers.harvey_nichols", "HarveyNicholsScraper"),
+    Retailer("selfridges", "Selfridges VPS", "scrapers.selfridges_vps", "SelfridgesVpsScraper"),
+    Retailer("end", "END Clothing", "scrapers.end_clothing", "EndClothingScraper"),
+]
@@ -2,28 +2,51 @@
 VPS-optimized Selfridges scraper implementation using Selenium with better Chrome handling.
 """
 
-from typing import List, Optional
-from bs4 import BeautifulSoup
+from typing import Iterator, List, Optional
 import time
 import random
 import os
+import re
 import subprocess
 from scrapers.base import BaseScraper, Product
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+from scrapers.browser_manager import BrowserManager
+from scrapers.chrome_paths import get_chrome_path_cache
+from scrapers.parsing import parse_html, SELFRIDGES_STRAINER
+from scrapers.pricing import get_discount_threshold
+from scrapers.product_batch import ProductBatch
+from scrapers.page_fingerprint import card_region
+
+
+CARD_START_PATTERN = re.compile(r'<li\b[^>]*\bdata-analytics-link-target=["\']product_card_link["\']', re.I)
 
 
 class SelfridgesVpsScraper(BaseScraper):
     """VPS-optimized scraper for Selfridges men's sale page using Selenium."""
     
-    def __init__(self):
+    def __init__(self, notifier=None):
         super().__init__(
             name="Selfridges VPS",
-            base_url="https://www.selfridges.com/GB/en/cat/mens/on_sale/"
+            base_url="https://www.selfridges.com/GB/en/cat/mens/on_sale/",
+            notifier=notifier
         )
-        self.chrome_path = self._find_chrome_binary()
+        self.discount_threshold = get_discount_threshold("selfridges")
+        # Chrome/ChromeDriver paths are resolved once and cached across runs
+        self.chrome_paths = get_chrome_path_cache()
+        self.chrome_path = self.chrome_paths.get_chrome_binary(self._find_chrome_binary)
+        
+        # Relaunch Chrome after this many pages to keep memory in check
+        self.max_pages_per_browser = int(os.environ.get('SELENIUM_MAX_PAGES_PER_BROWSER', '20'))
+        self.browser_manager = None
+        
+        # One page every 8-15 seconds to stay under Selfridges' bot detection
+        self.rate_limiter.configure(self.base_url, rate=1 / 8, jitter=7.0)
+        
+        # Readiness detection for the product grid
+        self.product_card_selector = 'li[data-analytics-link-target="product_card_link"]'
+        self.ready_max_wait = float(os.environ.get('SELENIUM_READY_TIMEOUT', '20'))
+        self.ready_stable_window = 1.5  # Seconds the card count must stay unchanged
+        self.ready_poll_interval = 0.25
+        self.page_wait_times = {}  # page number -> seconds spent waiting for the grid
     
     def _find_chrome_binary(self) -> str:
         """Find Chrome binary on the system."""
@@ -63,47 +86,81 @@ class SelfridgesVpsScraper(BaseScraper):
         self.logger.warning("Chrome not found, will try default")
         return None
     
-    def scrape_products(self) -> List[Product]:
-        """Scrape products from Selfridges using VPS-optimized Selenium."""
+    def iter_products(self) -> Iterator[Product]:
+        """Scrape products from Selfridges using VPS-optimized Selenium, yielding them page by page."""
         print("🔍 Selfridges VPS: Starting scraping with Selenium...")
         self.logger.info("Starting Selfridges VPS scraping")
         
-        products = []
+        products_found = 0
         page = 1
         
-        while True:
-            print(f"🔍 Selfridges VPS Page {page}: Scraping...")
-            
-            # Get HTML content using VPS-optimized browser
-            html_content = self._get_page_with_selenium(page)
-            if not html_content:
-                print(f"❌ Page {page}: Failed to load")
-                break
-            
-            # Parse products from HTML
-            page_products = self._parse_products_from_html(html_content, page)
-            products.extend(page_products)
-            
-            # Send notifications for high discount products
-            for product in page_products:
-                self._send_notification(product)
-            
-            print(f"✅ Page {page}: Found {len(page_products)} high discount products")
-            
-            # Stop if no products found (end of results)
-            if not page_products:
-                print(f"📄 Page {page}: No products found, stopping")
-                break
-            
-            # Delay between pages
-            time.sleep(random.uniform(8, 15))
-            page += 1
+        # One warm browser for the whole scrape
+        self.browser_manager = BrowserManager(
+            self._create_vps_browser,
+            max_pages_per_browser=self.max_pages_per_browser,
+            name=self.name
+        )
         
-        print(f"✅ Selfridges VPS: Total {len(products)} high discount products found")
-        return products
+        try:
+            while True:
+                print(f"🔍 Selfridges VPS Page {page}: Scraping...")
+                
+                # Get HTML content using VPS-optimized browser
+                html_content = self._get_page_with_selenium(page)
+                if not html_content:
+                    print(f"❌ Page {page}: Failed to load")
+                    break
+                
+                # Parse products from HTML (or reuse last run's if the cards are unchanged)
+                page_products, _ = self.parse_page(
+                    page, html_content, _card_region,
+                    lambda: self._parse_page(html_content, page)
+                )
+                # Release the page before handing products downstream
+                del html_content
+                # Only new or repriced products go downstream in change-detection mode
+                changed_products = self.changed_products(page_products)
+                products_found += len(changed_products)
+                
+                # Send the page's notifications in one call, then hand its products downstream
+                self._send_notifications(changed_products)
+                yield from changed_products
+                
+                print(f"✅ Page {page}: Found {len(changed_products)} high discount products")
+                
+                # Stop if no products found (end of results)
+                if not page_products:
+                    print(f"📄 Page {page}: No products found, stopping")
+                    break
+                
+                page += 1
+        finally:
+            self.browser_manager.close()
+            self._print_browser_stats()
+        
+        print(f"✅ Selfridges VPS: Total {products_found} high discount products found")
+    
+    def _print_browser_stats(self) -> None:
+        """Report time spent launching Chrome versus loading pages."""
+        stats = self.browser_manager.get_stats()
+        print(f"🤖 Selfridges VPS: Browser Summary")
+        print(f"   🚀 Browser launches: {stats['launches']} ({stats['launch_time']:.1f}s total, {stats['avg_launch_time']:.1f}s avg)")
+        print(f"   🌐 Page loads: {stats['navigations']} ({stats['navigation_time']:.1f}s total, {stats['avg_navigation_time']:.1f}s avg)")
+        if stats['crashes']:
+            print(f"   💥 Browser crashes: {stats['crashes']}")
+        if self.page_wait_times:
+            total_wait = sum(self.page_wait_times.values())
+            print(f"   ⏱️  Grid wait: {total_wait:.1f}s total, {total_wait / len(self.page_wait_times):.1f}s avg per page")
+        self.logger.info(f"Browser stats: {stats}")
     
-    def _create_vps_browser(self) -> webdriver.Chrome:
-        """Create a VPS-optimized Chrome browser instance."""
+    def _create_vps_browser(self):
+        """Create a VPS-optimized Chrome browser instance (a ``webdriver.Chrome``)."""
+        # Imported here so importing this module does not load the Selenium stack
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+        from webdriver_manager.chrome import ChromeDriverManager
+        
         options = Options()
         
         # VPS-optimized options
@@ -138,7 +195,8 @@ class SelfridgesVpsScraper(BaseScraper):
         
         try:
             # Try to use ChromeDriverManager first
-            service = Service(ChromeDriverManager().install())
+            driver_path = self.chrome_paths.get_driver_path(lambda: ChromeDriverManager().install())
+            service = Service(driver_path)
             driver = webdriver.Chrome(service=service, options=options)
         except Exception as e:
             self.logger.warning(f"ChromeDriverManager failed: {e}, trying direct Chrome")
@@ -154,35 +212,88 @@ class SelfridgesVpsScraper(BaseScraper):
         return driver
     
     def _get_page_with_selenium(self, page_number: int) -> Optional[str]:
-        """Get page HTML content using VPS-optimized browser session."""
-        driver = None
+        """Get page HTML content using the shared warm browser session."""
+        if self.browser_manager is None:
+            self.browser_manager = BrowserManager(
+                self._create_vps_browser,
+                max_pages_per_browser=self.max_pages_per_browser,
+                name=self.name
+            )
+        
+        url = f"{self.base_url}?pn={page_number}" if page_number > 1 else self.base_url
+        self.rate_limiter.acquire(url)
+        
         try:
-            driver = self._create_vps_browser()
-            url = f"{self.base_url}?pn={page_number}" if page_number > 1 else self.base_url
-            
-            self.logger.info(f"Loading page: {url}")
-            driver.get(url)
-            
-            # Wait for page to load with longer timeout for VPS
-            time.sleep(10)
-            
-            html_content = driver.page_source
-            return html_content
+            with self.browser_manager.page() as driver:
+                self.logger.info(f"Loading page: {url}")
+                driver.get(url)
+                
+                # Wait until the product grid has rendered and stopped growing
+                wait_time, card_count = self._wait_for_product_grid(driver)
+                self.page_wait_times[page_number] = wait_time
+                print(f"⏱️  Page {page_number}: Grid ready after {wait_time:.1f}s ({card_count} cards)")
+                
+                html_content = driver.page_source
+                return html_content
             
         except Exception as e:
             self.logger.error(f"Selenium error on page {page_number}: {str(e)}")
             return None
-        finally:
-            if driver:
-                try:
-                    driver.quit()
-                except Exception:
-                    pass
+    
+    def _wait_for_product_grid(self, driver) -> tuple[float, int]:
+        """
+        Wait until product cards are present and their count has settled.
+        
+        Polls the number of product cards and returns once it is non-zero and
+        unchanged for ``ready_stable_window`` seconds, or once
+        ``ready_max_wait`` seconds have passed.
+        
+        Args:
+            driver: WebDriver that has just navigated to a listing page
+            
+        Returns:
+            Tuple of (seconds waited, last observed card count)
+        """
+        from selenium.webdriver.common.by import By
+        
+        start_time = time.time()
+        deadline = start_time + self.ready_max_wait
+        last_count = -1
+        stable_since = start_time
+        
+        while True:
+            now = time.time()
+            try:
+                count = len(driver.find_elements(By.CSS_SELECTOR, self.product_card_selector))
+            except Exception as e:
+                self.logger.debug(f"Error counting product cards: {str(e)}")
+                count = 0
+            
+            if count != last_count:
+                last_count = count
+                stable_since = now
+            elif count > 0 and now - stable_since >= self.ready_stable_window:
+                break
+            
+            if now >= deadline:
+                self.logger.warning(f"Product grid not stable after {self.ready_max_wait:.0f}s ({count} cards)")
+                break
+            
+            time.sleep(self.ready_poll_interval)
+        
+        return time.time() - start_time, max(last_count, 0)
+    
+    def _parse_page(self, html_content: str, page_number: int) -> tuple[List[Product], int]:
+        """Parse one page; returns (high discount products, products kept) for ``parse_page``."""
+        products = self._parse_products_from_html(html_content, page_number)
+        return products, len(products)
     
     def _parse_products_from_html(self, html_content: str, page_number: int) -> List[Product]:
         """Parse products from HTML content."""
-        products = []
-        soup = BeautifulSoup(html_content, 'html.parser')
+        # Collect the page into columns; discounts and the threshold are applied to all rows at once
+        batch = ProductBatch(self.name)
+        # Only build the product card list items
+        soup = parse_html(html_content, SELFRIDGES_STRAINER)
         
         # Find all product containers
         product_containers = soup.find_all('li', {'data-analytics-link-target': 'product_card_link'})
@@ -231,54 +342,34 @@ class SelfridgesVpsScraper(BaseScraper):
                 if original_price <= 0 or discount_price <= 0 or original_price <= discount_price:
                     continue
                 
-                # Calculate discount
-                discount_percentage = self.calculate_discount_percentage(original_price, discount_price)
+                # Extract image
+                img_elem = product_element.find('img')
+                image_url = None
+                if img_elem:
+                    image_url = img_elem.get('src')
+                    if image_url and image_url.startswith('//'):
+                        image_url = 'https:' + image_url
                 
-                # Only include products with ≥70% discount
-                if discount_percentage >= 70.0:
-                    # Extract image
-                    img_elem = product_element.find('img')
-                    image_url = None
-                    if img_elem:
-                        image_url = img_elem.get('src')
-                        if image_url and image_url.startswith('//'):
-                            image_url = 'https:' + image_url
-                    
-                    product = Product(
-                        name=full_name,
-                        original_price=original_price,
-                        sale_price=discount_price,
-                        discount_percentage=discount_percentage,
-                        url=product_url,
-                        image_url=image_url,
-                        retailer=self.name
-                    )
-                    products.append(product)
+                batch.append(
+                    name=full_name,
+                    original_price=original_price,
+                    sale_price=discount_price,
+                    url=product_url,
+                    image_url=image_url
+                )
                     
             except Exception as e:
                 continue
         
-        return products
-    
-    def _send_notification(self, product: Product) -> None:
-        """Send Discord notification for a high discount product."""
-        try:
-            from notifications.discord_notifier import DiscordNotifier
-            
-            webhook_url = os.environ.get('DISCORD_WEBHOOK_URL')
-            if not webhook_url:
-                print(f"⚠️  No webhook URL set, skipping notification")
-                return
-                
-            notifier = DiscordNotifier(webhook_url)
-            notifier.send_high_discount_alerts([product])
-            print(f"📲 Notification sent: {product.name[:50]}... ({product.discount_percentage:.0f}% off)")
-            
-        except Exception as e:
-            print(f"❌ Failed to send notification: {str(e)}")
+        return batch.high_discount_products(self.discount_threshold)
     
     def parse_product_data(self, product_element) -> Optional[Product]:
         """Parse individual product data from HTML element (required by base class)."""
         # This method is not used in the Selenium-based approach,
         # but is required by the abstract base class
         return None
+
+
+def _card_region(html_content: str) -> str:
+    """Markup of the product cards, for page fingerprinting."""
+    return card_region(html_content, CARD_START_PATTERN, 'li')
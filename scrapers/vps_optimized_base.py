@@ -3,26 +3,60 @@ VPS-optimized base scraper with enhanced network handling.
 Includes retry logic, user agent rotation, and timeout management.
 """
 
+import asyncio
+import json
 import requests
 import time
 import random
+import os
 import logging
-from typing import Optional, Dict, Any
+from typing import Iterator, List, Optional, Dict, Any
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 
+from scrapers.base import Product
+from scrapers.rate_limiter import get_rate_limiter
+from scrapers.connectivity import get_connectivity_health
+from scrapers.http_cache import get_http_cache, NOT_MODIFIED
+from scrapers.product_state import get_product_state
+from scrapers.notifying import NotifyingMixin
 
-class VPSOptimizedBaseScraper:
+try:
+    import aiohttp
+except ImportError:  # Async support is optional
+    aiohttp = None
+
+
+class VPSOptimizedBaseScraper(NotifyingMixin):
     """Base scraper optimized for VPS deployment with robust network handling."""
     
-    def __init__(self, scraper_name: str):
+    def __init__(self, scraper_name: str, notifier=None):
         self.scraper_name = scraper_name
         self.logger = logging.getLogger(f"scraper.{scraper_name}")
+        # Shared DiscordNotifier injected by run_scrapers (created lazily if absent)
+        self.notifier = notifier
         
         # Enhanced session with retry logic
         self.session = self._create_optimized_session()
         
+        # Shared per-host pacing
+        self.rate_limiter = get_rate_limiter()
+        
+        # Shared per-host reachability, recorded by every request
+        self.health = get_connectivity_health()
+        
+        # Opt-in conditional GET cache (HTTP_CACHE=1); None when disabled
+        self.http_cache = get_http_cache()
+        # Opt-in change detection (CHANGES_ONLY=1): only new or repriced products go downstream
+        self.product_state = get_product_state()
+        
+        # Async engine (created lazily inside the running event loop)
+        # Requests in flight at once on the async path
+        self.max_concurrency = max(1, int(os.environ.get('SCRAPER_CONCURRENCY', '4')))
+        self._async_session = None
+        self._async_semaphore = None
+        
         # User agent rotation
         self.user_agents = [
             'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -67,7 +101,8 @@ class VPSOptimizedBaseScraper:
         """Get a random user agent to avoid detection."""
         return random.choice(self.user_agents)
     
-    def _make_request(self, url: str, max_retries: int = 3, delay: float = 2.0) -> Optional[requests.Response]:
+    def _make_request(self, url: str, max_retries: int = 3, delay: float = 2.0,
+                      use_cache: bool = False) -> Optional[requests.Response]:
         """
         Make a request with enhanced error handling and retry logic.
         
@@ -75,18 +110,32 @@ class VPSOptimizedBaseScraper:
             url: URL to request
             max_retries: Maximum number of retries
             delay: Initial delay between retries
+            use_cache: Make the request conditional when the HTTP cache is enabled
             
         Returns:
-            Response object or None if all retries failed
+            Response object, ``NOT_MODIFIED`` if the page is unchanged since it
+            was last stored, or None if all retries failed
         """
+        cache = self.http_cache if use_cache else None
+        
+        if self.health.is_down(url):
+            self.logger.warning(f"Skipping {url}: host was unreachable moments ago")
+            return None
+        
+        network_failure = False  # Last attempt ended in a timeout or connection error
         for attempt in range(max_retries + 1):
             try:
                 # Rotate user agent
                 headers = self.headers.copy()
                 headers['User-Agent'] = self._get_random_user_agent()
+                if cache is not None:
+                    headers.update(cache.conditional_headers(url))
                 
                 self.logger.info(f"Attempt {attempt + 1}/{max_retries + 1}: Fetching {url}")
                 
+                # Wait for this host's request budget
+                self.rate_limiter.acquire(url)
+                
                 # Make request with timeout
                 response = self.session.get(
                     url, 
@@ -95,6 +144,12 @@ class VPSOptimizedBaseScraper:
                     allow_redirects=True,
                     verify=True
                 )
+                network_failure = False
+                self.health.record(url, True)
+                
+                if cache is not None and cache.is_unchanged(url, response.status_code, response.headers, response.content):
+                    self.logger.info(f"Unchanged since last run: {url}")
+                    return NOT_MODIFIED
                 
                 # Check if response is successful
                 if response.status_code == 200:
@@ -115,6 +170,7 @@ class VPSOptimizedBaseScraper:
                         return None
                         
             except requests.exceptions.Timeout as e:
+                network_failure = True
                 self.logger.warning(f"Timeout on attempt {attempt + 1}: {str(e)}")
                 if attempt < max_retries:
                     wait_time = delay * (2 ** attempt) + random.uniform(2, 5)
@@ -124,6 +180,7 @@ class VPSOptimizedBaseScraper:
                     self.logger.error(f"All retries failed due to timeout for {url}")
                     
             except requests.exceptions.ConnectionError as e:
+                network_failure = True
                 self.logger.warning(f"Connection error on attempt {attempt + 1}: {str(e)}")
                 if attempt < max_retries:
                     wait_time = delay * (2 ** attempt) + random.uniform(3, 8)
@@ -133,6 +190,7 @@ class VPSOptimizedBaseScraper:
                     self.logger.error(f"All retries failed due to connection error for {url}")
                     
             except requests.exceptions.RequestException as e:
+                network_failure = False
                 self.logger.error(f"Request error on attempt {attempt + 1}: {str(e)}")
                 if attempt < max_retries:
                     wait_time = delay * (2 ** attempt)
@@ -142,6 +200,7 @@ class VPSOptimizedBaseScraper:
                     self.logger.error(f"All retries failed for {url}: {str(e)}")
                     
             except Exception as e:
+                network_failure = False
                 self.logger.error(f"Unexpected error on attempt {attempt + 1}: {str(e)}")
                 if attempt < max_retries:
                     wait_time = delay * (2 ** attempt)
@@ -149,9 +208,32 @@ class VPSOptimizedBaseScraper:
                 else:
                     self.logger.error(f"All retries failed for {url}: {str(e)}")
         
+        if network_failure:
+            self.health.record(url, False)
         self.logger.error(f"Failed to fetch {url} after {max_retries + 1} attempts")
         return None
     
+    def iter_products(self) -> Iterator[Product]:
+        """
+        Scrape products, yielding them as each page is parsed.
+        
+        Subclasses implement this; responses should be released per page so
+        memory stays flat however many pages a sale has.
+        
+        Yields:
+            Product: Scraped products with discount information
+        """
+        raise NotImplementedError
+    
+    def scrape_products(self) -> List[Product]:
+        """
+        Scrape all products.
+        
+        Returns:
+            List[Product]: List of scraped products with discount information
+        """
+        return list(self.iter_products())
+    
     def get_page(self, url: str) -> Optional[str]:
         """
         Get page content with VPS-optimized error handling.
@@ -160,10 +242,12 @@ class VPSOptimizedBaseScraper:
             url: URL to fetch
             
         Returns:
-            HTML content as string or None if failed
+            HTML content as string, ``NOT_MODIFIED``, or None if failed
         """
         try:
-            response = self._make_request(url)
+            response = self._make_request(url, use_cache=True)
+            if response is NOT_MODIFIED:
+                return NOT_MODIFIED
             if response:
                 return response.text
             else:
@@ -182,10 +266,12 @@ class VPSOptimizedBaseScraper:
             url: URL to fetch
             
         Returns:
-            JSON data as dict or None if failed
+            JSON data as dict, ``NOT_MODIFIED``, or None if failed
         """
         try:
-            response = self._make_request(url)
+            response = self._make_request(url, use_cache=True)
+            if response is NOT_MODIFIED:
+                return NOT_MODIFIED
             if response:
                 return response.json()
             else:
@@ -200,6 +286,9 @@ class VPSOptimizedBaseScraper:
         """
         Test connectivity to multiple URLs to diagnose network issues.
         
+        Hosts that answered (or failed) within the health cache TTL are not
+        probed again; their cached status is reported instead.
+        
         Args:
             test_urls: List of URLs to test
             
@@ -209,6 +298,13 @@ class VPSOptimizedBaseScraper:
         results = {}
         
         for url in test_urls:
+            cached = self.health.status(url)
+            if cached is not None:
+                self.health.probes_skipped += 1
+                results[url] = cached
+                self.logger.info(f"{'✅' if cached else '❌'} {url} - {'Reachable' if cached else 'Unreachable'} (cached)")
+                continue
+            
             self.logger.info(f"Testing connectivity to {url}")
             response = self._make_request(url, max_retries=1, delay=1.0)
             results[url] = response is not None
@@ -219,3 +315,208 @@ class VPSOptimizedBaseScraper:
                 self.logger.warning(f"❌ {url} - Connection failed")
         
         return results
+    
+    @staticmethod
+    def async_available() -> bool:
+        """Check whether the optional aiohttp dependency is installed."""
+        return aiohttp is not None
+    
+    async def _get_async_session(self):
+        """Get the aiohttp session for the current event loop, creating it on first use."""
+        if aiohttp is None:
+            raise RuntimeError("aiohttp is not installed - async fetching is unavailable")
+        
+        if self._async_session is None or self._async_session.closed:
+            timeout = aiohttp.ClientTimeout(sock_connect=15, sock_read=90)
+            self._async_session = aiohttp.ClientSession(timeout=timeout)
+            self._async_semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._async_session
+    
+    async def close_async(self) -> None:
+        """Close the aiohttp session."""
+        if self._async_session is not None and not self._async_session.closed:
+            await self._async_session.close()
+        self._async_session = None
+        self._async_semaphore = None
+    
+    async def _make_request_async(self, url: str, max_retries: int = 3, delay: float = 2.0,
+                                  use_cache: bool = False) -> Optional[str]:
+        """
+        Async counterpart of ``_make_request`` with the same retry and backoff policy.
+        
+        Backoff waits use ``asyncio.sleep`` so other requests keep flowing, and
+        at most ``max_concurrency`` requests are in flight at once.
+        
+        Args:
+            url: URL to request
+            max_retries: Maximum number of retries
+            delay: Initial delay between retries
+            use_cache: Make the request conditional when the HTTP cache is enabled
+            
+        Returns:
+            Response body, ``NOT_MODIFIED`` if the page is unchanged since it
+            was last stored, or None if all retries failed
+        """
+        cache = self.http_cache if use_cache else None
+        
+        if self.health.is_down(url):
+            self.logger.warning(f"Skipping {url}: host was unreachable moments ago")
+            return None
+        
+        session = await self._get_async_session()
+        
+        network_failure = False  # Last attempt ended in a timeout or connection error
+        for attempt in range(max_retries + 1):
+            try:
+                # Rotate user agent
+                headers = self.headers.copy()
+                headers['User-Agent'] = self._get_random_user_agent()
+                if cache is not None:
+                    headers.update(cache.conditional_headers(url))
+                
+                self.logger.info(f"Attempt {attempt + 1}/{max_retries + 1}: Fetching {url} (async)")
+                
+                async with self._async_semaphore:
+                    # Wait for this host's request budget
+                    await self.rate_limiter.acquire_async(url)
+                    
+                    async with session.get(url, headers=headers, allow_redirects=True) as response:
+                        status = response.status
+                        content = await response.read() if status == 200 else b''
+                        body = content.decode(response.get_encoding()) if status == 200 else None
+                        unchanged = cache is not None and cache.is_unchanged(url, status, response.headers, content)
+                network_failure = False
+                self.health.record(url, True)
+                
+                if unchanged:
+                    self.logger.info(f"Unchanged since last run: {url}")
+                    return NOT_MODIFIED
+                
+                # Check if response is successful
+                if status == 200:
+                    self.logger.info(f"Successfully fetched {url} (Status: {status})")
+                    return body
+                else:
+                    self.logger.warning(f"HTTP {status} for {url}")
+                    if status in [429, 503, 504]:  # Rate limited or server error
+                        wait_time = delay * (2 ** attempt) + random.uniform(1, 3)
+                        self.logger.info(f"Rate limited, waiting {wait_time:.1f}s before retry")
+                        await asyncio.sleep(wait_time)
+                        continue
+                    elif status == 403:  # Forbidden
+                        self.logger.warning(f"Access forbidden for {url}, trying different user agent")
+                        continue
+                    else:
+                        self.logger.error(f"HTTP {status} for {url}")
+                        return None
+                        
+            except asyncio.TimeoutError as e:
+                network_failure = True
+                self.logger.warning(f"Timeout on attempt {attempt + 1}: {str(e)}")
+                if attempt < max_retries:
+                    wait_time = delay * (2 ** attempt) + random.uniform(2, 5)
+                    self.logger.info(f"Retrying in {wait_time:.1f}s...")
+                    await asyncio.sleep(wait_time)
+                else:
+                    self.logger.error(f"All retries failed due to timeout for {url}")
+                    
+            except aiohttp.ClientConnectionError as e:
+                network_failure = True
+                self.logger.warning(f"Connection error on attempt {attempt + 1}: {str(e)}")
+                if attempt < max_retries:
+                    wait_time = delay * (2 ** attempt) + random.uniform(3, 8)
+                    self.logger.info(f"Retrying in {wait_time:.1f}s...")
+                    await asyncio.sleep(wait_time)
+                else:
+                    self.logger.error(f"All retries failed due to connection error for {url}")
+                    
+            except Exception as e:
+                network_failure = False
+                self.logger.error(f"Request error on attempt {attempt + 1}: {str(e)}")
+                if attempt < max_retries:
+                    wait_time = delay * (2 ** attempt)
+                    self.logger.info(f"Retrying in {wait_time:.1f}s...")
+                    await asyncio.sleep(wait_time)
+                else:
+                    self.logger.error(f"All retries failed for {url}: {str(e)}")
+        
+        if network_failure:
+            self.health.record(url, False)
+        self.logger.error(f"Failed to fetch {url} after {max_retries + 1} attempts")
+        return None
+    
+    async def test_connectivity_async(self, test_urls: list[str]) -> Dict[str, bool]:
+        """
+        Async counterpart of ``test_connectivity``; uncached URLs are probed concurrently.
+        
+        Args:
+            test_urls: List of URLs to test
+            
+        Returns:
+            Dictionary mapping URLs to connectivity status
+        """
+        results = {}
+        to_probe = []
+        
+        for url in test_urls:
+            cached = self.health.status(url)
+            if cached is None:
+                to_probe.append(url)
+            else:
+                self.health.probes_skipped += 1
+                results[url] = cached
+        
+        probes = await asyncio.gather(*(
+            self._make_request_async(url, max_retries=1, delay=1.0) for url in to_probe
+        ))
+        for url, body in zip(to_probe, probes):
+            results[url] = body is not None
+            if body is not None:
+                self.logger.info(f"✅ {url} - Connected successfully")
+            else:
+                self.logger.warning(f"❌ {url} - Connection failed")
+        
+        # Keep the caller's order
+        return {url: results[url] for url in test_urls}
+    
+    async def get_page_async(self, url: str) -> Optional[str]:
+        """
+        Async counterpart of ``get_page``.
+        
+        Args:
+            url: URL to fetch
+            
+        Returns:
+            HTML content as string, ``NOT_MODIFIED``, or None if failed
+        """
+        try:
+            content = await self._make_request_async(url, use_cache=True)
+            if content is None:
+                self.logger.error(f"Failed to get page content for {url}")
+            return content
+        except Exception as e:
+            self.logger.error(f"Error getting page {url}: {str(e)}")
+            return None
+    
+    async def get_json_async(self, url: str) -> Optional[Dict[Any, Any]]:
+        """
+        Async counterpart of ``get_json``.
+        
+        Args:
+            url: URL to fetch
+            
+        Returns:
+            JSON data as dict, ``NOT_MODIFIED``, or None if failed
+        """
+        try:
+            content = await self._make_request_async(url, use_cache=True)
+            if content is NOT_MODIFIED:
+                return NOT_MODIFIED
+            if content is not None:
+                return json.loads(content)
+            else:
+                self.logger.error(f"Failed to get JSON data for {url}")
+                return None
+        except Exception as e:
+            self.logger.error(f"Error getting JSON from {url}: {str(e)}")
+            return None